@@ -0,0 +1,64 @@
+import re
+from typing import List, Optional, Dict, Any
+
+# Порядок задает int8-код категории в колонках каталога
+CATEGORIES: List[str] = [
+    "layer1", "layer2", "stablecoin", "defi", "meme", "gaming", "nft",
+    "metaverse", "web3", "infrastructure", "dao", "privacy", "other"
+]
+CATEGORY_CODES: Dict[str, int] = {category: code for code, category in enumerate(CATEGORIES)}
+UNKNOWN_CATEGORY_CODE = -1
+
+STABLECOIN_SYMBOLS = {'USDT', 'USDC', 'DAI', 'BUSD', 'FRAX', 'TUSD', 'FDUSD', 'LUSD', 'SUSD'}
+LAYER1_SYMBOLS = {'BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'AVAX', 'MATIC', 'DOT', 'ATOM', 'NEAR', 'FTM', 'ALGO', 'HBAR', 'XTZ'}
+LAYER2_SYMBOLS = {'ARB', 'OP', 'LRC', 'IMX', 'METIS'}
+
+# Ключевые слова в названии, в порядке приоритета категорий (подстроки, как и раньше)
+NAME_KEYWORDS = [
+    ("layer2", ['layer 2', 'l2', 'arbitrum', 'optimism', 'polygon']),
+    ("defi", ['defi', 'swap', 'finance', 'lending', 'protocol', 'yield', 'liquidity']),
+    ("meme", ['meme', 'doge', 'shib', 'pepe', 'floki', 'wojak']),
+    ("gaming", ['game', 'gaming', 'play', 'metaverse', 'virtual']),
+    ("nft", ['nft', 'collectible', 'art', 'token']),
+    ("metaverse", ['metaverse', 'virtual reality', 'vr', 'ar', 'augmented']),
+    ("web3", ['web3', 'decentralized', 'infrastructure', 'protocol']),
+    ("dao", ['dao', 'governance', 'voting']),
+    ("privacy", ['privacy', 'anonymous', 'private', 'confidential']),
+    ("infrastructure", ['oracle', 'data', 'network', 'node', 'validator']),
+]
+
+# Один проход регуляркой: lookahead находит совпадения с каждой позиции (в том числе перекрывающиеся),
+# группа с меньшим номером - категория с большим приоритетом
+_NAME_PATTERN = re.compile("(?=(?:" + "|".join(
+    f"(?P<k{priority}>{'|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))})"
+    for priority, (_, words) in enumerate(NAME_KEYWORDS)
+) + "))")
+
+def classify_name(name: str) -> str:
+    best = len(NAME_KEYWORDS)
+    for match in _NAME_PATTERN.finditer(name.lower()):
+        best = min(best, int(match.lastgroup[1:]))
+        if best == 0:
+            break
+    return NAME_KEYWORDS[best][0] if best < len(NAME_KEYWORDS) else "other"
+
+def get_token_category(token_stat: Dict[str, Any], token_data: Optional[Dict[str, Any]]) -> str:
+    """
+    Категория токена. Заданная в админке token_category важнее автоматической классификации.
+    """
+    if token_data and token_data.get('token_category'):
+        return token_data['token_category']
+    if token_stat.get('token_category'):
+        return token_stat['token_category']
+
+    symbol = str(token_stat.get('symbol', '')).upper()
+    if symbol in STABLECOIN_SYMBOLS:
+        return "stablecoin"
+    if symbol in LAYER1_SYMBOLS:
+        return "layer1"
+    if symbol in LAYER2_SYMBOLS:
+        return "layer2"
+    return classify_name(str(token_stat.get('coin_name', '')))
+
+def category_code(category: str) -> int:
+    return CATEGORY_CODES.get(category, UNKNOWN_CATEGORY_CODE)
@@ -1,7 +1,10 @@
 from .base import BaseDynamoDBConnector
+from .bulk_writer import BulkWriter
+from .throttling import DynamoDBThrottledError, throttle_wait
 from .repositories.user import UserRepository
 from .repositories.otp import OTPRepository
 from .repositories.generic import GenericRepository
+from .repositories.async_generic import AsyncGenericRepository, run_in_db_executor
 
 def get_db_connector():
     from .connector import get_db_connector as _get_db_connector
@@ -19,6 +22,10 @@ def get_generic_repository(table_name: str):
     from .connector import get_generic_repository as _get_generic_repository
     return _get_generic_repository(table_name)
 
+def get_async_generic_repository(table_name: str):
+    from .connector import get_async_generic_repository as _get_async_generic_repository
+    return _get_async_generic_repository(table_name)
+
 def get_connector():
     from .connector import connector
     return connector
@@ -27,14 +34,20 @@ connector = property(lambda self: get_connector())
 
 __all__ = [
     'BaseDynamoDBConnector',
+    'BulkWriter',
+    'DynamoDBThrottledError',
+    'throttle_wait',
     
     'UserRepository',
     'OTPRepository', 
     'GenericRepository',
+    'AsyncGenericRepository',
+    'run_in_db_executor',
     
     'get_db_connector',
     'get_user_repository',
     'get_otp_repository',
     'get_generic_repository',
+    'get_async_generic_repository',
     'get_connector'
 ]
\ No newline at end of file
@@ -1,11 +1,24 @@
 # app/core/database/base.py - ИСПРАВЛЕННАЯ ВЕРСИЯ
 
-import boto3
+import contextvars
+import queue
+import random
+import threading
+import time
 from botocore.exceptions import ClientError
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Iterator
 from datetime import datetime
 
 from app.core.security.config import settings
+from . import client_pool
+from .throttling import call_with_throttling
+
+# Общий ограниченный пул потоков для сегментов параллельного Scan
+_scan_executor = ThreadPoolExecutor(
+    max_workers=settings.DYNAMODB_SCAN_WORKERS,
+    thread_name_prefix="dynamodb-scan"
+)
 
 class BaseDynamoDBConnector:
     def __init__(self):
@@ -24,36 +37,24 @@ class BaseDynamoDBConnector:
     
     def _init_clients(self):
         try:
-            self.client = boto3.client(
-                'dynamodb',
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION
-            )
-            
-            self.dynamodb = boto3.resource(
-                'dynamodb',
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION
-            )
-            
-            self._test_connection()
-            
+            self.client = client_pool.get_dynamodb_client()
+            self.dynamodb = client_pool.get_dynamodb_resource()
         except Exception as e:
             print(f"[ERROR][DynamoDB] - Ошибка инициализации: {e}")
             raise e
     
     def _test_connection(self):
         try:
-            list(self.dynamodb.tables.all())
+            client_pool.ensure_connection()
         except Exception as e:
             print(f"[ERROR][DynamoDB] - Тест подключения: {e}")
             raise e
     
     def get_table(self, table_name: str):
         if table_name not in self._tables:
-            self._tables[table_name] = self.dynamodb.Table(table_name)
+            if self.dynamodb is None:
+                raise RuntimeError(f"DynamoDB клиент не инициализирован для {table_name}")
+            self._tables[table_name] = client_pool.get_table(table_name)
         return self._tables[table_name]
     
     def table_exists(self, table_name: str) -> bool:
@@ -98,6 +99,30 @@ class BaseDynamoDBConnector:
         
         return update_expression, expression_attribute_names, expression_attribute_values
     
+    def _build_projection_expression(self, attributes: List[str]) -> tuple:
+        """
+        Создает ProjectionExpression с плейсхолдерами имен.
+        Список зарезервированных слов DynamoDB намного шире reserved_keywords,
+        поэтому в проекции экранируем все поля, а не только известные.
+        Плейсхолдер - по номеру поля: '-' или '.' в имени в плейсхолдере недопустимы.
+        """
+        projection_parts = []
+        expression_attribute_names = {}
+        
+        for index, field in enumerate(dict.fromkeys(attributes)):
+            name_placeholder = f"#p{index}"
+            expression_attribute_names[name_placeholder] = field
+            projection_parts.append(name_placeholder)
+        
+        return ", ".join(projection_parts), expression_attribute_names
+    
+    def _apply_projection(self, params: Dict[str, Any], attributes: List[str] = None) -> Dict[str, Any]:
+        if attributes:
+            projection_expression, attr_names = self._build_projection_expression(attributes)
+            params['ProjectionExpression'] = projection_expression
+            params['ExpressionAttributeNames'] = attr_names
+        return params
+    
     def create_item(self, table_name: str, item: Dict[str, Any]) -> Dict[str, Any]:
         try:
             if 'created_at' not in item:
@@ -106,22 +131,62 @@ class BaseDynamoDBConnector:
                 item['updated_at'] = datetime.utcnow().isoformat()
             
             table = self.get_table(table_name)
-            table.put_item(Item=item)
+            call_with_throttling(table_name, 'put_item', table.put_item, Item=item)
             return item
             
         except ClientError as e:
             print(f"[ERROR][DynamoDB] - Ошибка создания в {table_name}: {e}")
             raise e
     
-    def get_item(self, table_name: str, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def get_item(self, table_name: str, key: Dict[str, Any],
+                 attributes: List[str] = None) -> Optional[Dict[str, Any]]:
         try:
             table = self.get_table(table_name)
-            response = table.get_item(Key=key)
+            response = call_with_throttling(
+                table_name, 'get_item', table.get_item,
+                **self._apply_projection({'Key': key}, attributes)
+            )
             return response.get('Item')
         except ClientError as e:
             print(f"[ERROR][DynamoDB] - Ошибка получения из {table_name}: {e}")
             return None
     
+    def batch_get_items(self, table_name: str, keys: List[Dict[str, Any]],
+                        attributes: List[str] = None, max_retries: int = 5) -> List[Dict[str, Any]]:
+        """
+        BatchGetItem пачками по 100 ключей с повтором UnprocessedKeys
+        и экспоненциальной задержкой. Порядок элементов не гарантируется.
+        """
+        items = []
+        batch_size = 100
+        
+        for i in range(0, len(keys), batch_size):
+            request_items = {table_name: self._apply_projection({'Keys': keys[i:i + batch_size]}, attributes)}
+            attempt = 0
+            
+            while request_items:
+                try:
+                    response = call_with_throttling(
+                        table_name, 'batch_get_item', self.dynamodb.batch_get_item,
+                        RequestItems=request_items
+                    )
+                except ClientError as e:
+                    print(f"[ERROR][DynamoDB] - Ошибка batch_get из {table_name}: {e}")
+                    break
+                
+                items.extend(response.get('Responses', {}).get(table_name, []))
+                request_items = response.get('UnprocessedKeys') or {}
+                
+                if request_items:
+                    attempt += 1
+                    if attempt > max_retries:
+                        unprocessed = len(request_items.get(table_name, {}).get('Keys', []))
+                        print(f"[WARNING][DynamoDB] - batch_get {table_name}: {unprocessed} ключей не обработано")
+                        break
+                    time.sleep(min(0.05 * 2 ** attempt, 2.0) * random.uniform(0.5, 1.0))
+        
+        return items
+    
     def update_item(self, table_name: str, key: Dict[str, Any], 
                    updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         try:
@@ -147,7 +212,7 @@ class BaseDynamoDBConnector:
             if attr_names:
                 update_params['ExpressionAttributeNames'] = attr_names
             
-            response = table.update_item(**update_params)
+            response = call_with_throttling(table_name, 'update_item', table.update_item, **update_params)
             return response.get('Attributes')
             
         except ClientError as e:
@@ -158,48 +223,167 @@ class BaseDynamoDBConnector:
     def delete_item(self, table_name: str, key: Dict[str, Any]) -> bool:
         try:
             table = self.get_table(table_name)
-            table.delete_item(Key=key)
+            call_with_throttling(table_name, 'delete_item', table.delete_item, Key=key)
             return True
         except ClientError as e:
             print(f"[ERROR][DynamoDB] - Ошибка удаления из {table_name}: {e}")
             return False
     
-    def query_items(self, table_name: str, key_condition: Any, 
-                   index_name: str = None, filter_expression: Any = None, 
-                   limit: int = None) -> List[Dict[str, Any]]:
+    def query_iter(self, table_name: str, key_condition: Any,
+                   index_name: str = None, filter_expression: Any = None,
+                   page_size: int = None, max_items: int = None,
+                   attributes: List[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Постраничный Query: идет по LastEvaluatedKey и отдает элементы по одному.
+        page_size - подсказка для Limit одной страницы, max_items - общий лимит элементов,
+        attributes - список полей для ProjectionExpression.
+        """
+        query_params = self._apply_projection({'KeyConditionExpression': key_condition}, attributes)
+        
+        if index_name:
+            query_params['IndexName'] = index_name
+        if filter_expression:
+            query_params['FilterExpression'] = filter_expression
+        
+        yield from self._paginate(table_name, 'query', query_params, page_size, max_items)
+    
+    def scan_iter(self, table_name: str, filter_expression: Any = None,
+                  page_size: int = None, max_items: int = None,
+                  attributes: List[str] = None, strict: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Постраничный Scan: идет по LastEvaluatedKey и отдает элементы по одному,
+        держа в памяти не больше одной страницы (до 1 MB).
+        strict - ClientError посреди пагинации пробрасывается, а не обрывает выдачу молча.
+        """
+        scan_params = self._apply_projection({}, attributes)
+        if filter_expression:
+            scan_params['FilterExpression'] = filter_expression
+        
+        yield from self._paginate(table_name, 'scan', scan_params, page_size, max_items, strict)
+    
+    def parallel_scan_iter(self, table_name: str, total_segments: int,
+                           filter_expression: Any = None, page_size: int = None,
+                           max_items: int = None, attributes: List[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Параллельный Scan через Segment/TotalSegments на общем пуле потоков.
+        Страницы сегментов отдаются по мере поступления, порядок не гарантируется.
+        Любая ошибка сегмента пробрасывается читателю - неполный скан не выдается за полный.
+        """
+        if total_segments <= 1:
+            yield from self.scan_iter(table_name, filter_expression, page_size, max_items, attributes, strict=True)
+            return
+        if max_items is not None and max_items <= 0:
+            return
+        
+        pages = queue.Queue(maxsize=total_segments * 2)
+        stop = threading.Event()
+        
+        def put_page(page) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(page, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def scan_segment(segment: int):
+            try:
+                scan_params = self._apply_projection(
+                    {'Segment': segment, 'TotalSegments': total_segments},
+                    attributes
+                )
+                if filter_expression:
+                    scan_params['FilterExpression'] = filter_expression
+                for page in self._iter_pages(table_name, 'scan', scan_params, page_size, strict=True):
+                    if not put_page(page):
+                        return
+            except Exception as e:
+                # Ошибку сегмента (например throttling) отдаем читателю, а не теряем в пуле
+                put_page(e)
+            finally:
+                put_page(None)
+        
+        # Каждому сегменту своя копия контекста, чтобы метрики знали роут запроса
+        for segment in range(total_segments):
+            _scan_executor.submit(contextvars.copy_context().run, scan_segment, segment)
+        
+        finished = 0
+        returned = 0
         try:
-            table = self.get_table(table_name)
-            
-            query_params = {'KeyConditionExpression': key_condition}
+            while finished < total_segments:
+                page = pages.get()
+                if page is None:
+                    finished += 1
+                    continue
+                if isinstance(page, Exception):
+                    raise page
+                for item in page:
+                    yield item
+                    returned += 1
+                    if max_items is not None and returned >= max_items:
+                        return
+        finally:
+            stop.set()
+    
+    def _iter_pages(self, table_name: str, operation: str, params: Dict[str, Any],
+                    page_size: int = None, strict: bool = False) -> Iterator[List[Dict[str, Any]]]:
+        request = getattr(self.get_table(table_name), operation)
+        params = dict(params)
+        if page_size:
+            params['Limit'] = page_size
+        
+        while True:
+            page_params = dict(params)
+            if 'ExpressionAttributeNames' in page_params:
+                # boto3 дописывает в этот словарь свои плейсхолдеры фильтра
+                page_params['ExpressionAttributeNames'] = dict(page_params['ExpressionAttributeNames'])
             
-            if index_name:
-                query_params['IndexName'] = index_name
-            if filter_expression:
-                query_params['FilterExpression'] = filter_expression
-            if limit:
-                query_params['Limit'] = limit
+            try:
+                response = call_with_throttling(table_name, operation, request, **page_params)
+            except ClientError as e:
+                print(f"[ERROR][DynamoDB] - Ошибка {operation} {table_name}: {e}")
+                if strict:
+                    raise
+                return
             
-            response = table.query(**query_params)
-            return response.get('Items', [])
+            yield response.get('Items', [])
             
-        except ClientError as e:
-            print(f"[ERROR][DynamoDB] - Ошибка запроса к {table_name}: {e}")
-            return []
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+            params['ExclusiveStartKey'] = last_key
+    
+    def _paginate(self, table_name: str, operation: str, params: Dict[str, Any],
+                  page_size: int = None, max_items: int = None, strict: bool = False) -> Iterator[Dict[str, Any]]:
+        if max_items is not None and max_items <= 0:
+            return
+        
+        returned = 0
+        for page in self._iter_pages(table_name, operation, params, page_size or max_items, strict):
+            for item in page:
+                yield item
+                returned += 1
+                if max_items is not None and returned >= max_items:
+                    return
+    
+    def query_items(self, table_name: str, key_condition: Any, 
+                   index_name: str = None, filter_expression: Any = None, 
+                   limit: int = None, attributes: List[str] = None) -> List[Dict[str, Any]]:
+        return list(self.query_iter(
+            table_name,
+            key_condition,
+            index_name=index_name,
+            filter_expression=filter_expression,
+            max_items=limit,
+            attributes=attributes
+        ))
     
     def scan_items(self, table_name: str, filter_expression: Any = None, 
-                  limit: int = None) -> List[Dict[str, Any]]:
-        try:
-            table = self.get_table(table_name)
-            
-            scan_params = {}
-            if filter_expression:
-                scan_params['FilterExpression'] = filter_expression                
-            if limit:
-                scan_params['Limit'] = limit
-            
-            response = table.scan(**scan_params)
-            return response.get('Items', [])
-            
-        except ClientError as e:
-            print(f"[ERROR][DynamoDB] - Ошибка сканирования {table_name}: {e}")
-            return []
\ No newline at end of file
+                  limit: int = None, attributes: List[str] = None) -> List[Dict[str, Any]]:
+        return list(self.scan_iter(
+            table_name,
+            filter_expression=filter_expression,
+            max_items=limit,
+            attributes=attributes
+        ))
@@ -0,0 +1,108 @@
+import contextvars
+import json
+import math
+import random
+import threading
+import time
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from app.core.security.config import settings
+from .throttling import DynamoDBThrottledError, TokenBucket, call_with_throttling, throttle_wait
+
+BATCH_SIZE = 25
+
+def estimate_write_units(request: Dict[str, Any]) -> int:
+    # 1 WCU = запись до 1 KB; размер оцениваем по JSON, для лимита этого достаточно
+    if 'PutRequest' in request:
+        size = len(json.dumps(request['PutRequest']['Item'], default=str))
+        return max(1, math.ceil(size / 1024))
+    return 1
+
+class BulkWriter:
+    def __init__(self, dynamodb, table_name: str, workers: int = None,
+                 max_wcu: Optional[float] = None, max_retries: int = 8):
+        self.dynamodb = dynamodb
+        self.table_name = table_name
+        self.workers = workers or settings.DYNAMODB_BULK_WORKERS
+        # Явный лимит поверх общего bucket таблицы, почти без burst - ровная нагрузка
+        self.limiter = TokenBucket(max_wcu, burst_seconds=1) if max_wcu else None
+        self.max_retries = max_retries
+
+        self._lock = threading.Lock()
+        self._written = 0
+        self._retried = 0
+        self._failed = 0
+
+    def write(self, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Пишет WriteRequest'ы пачками по 25 в несколько потоков.
+        Возвращает отчет: written, retried, failed, elapsed, items_per_sec.
+        """
+        started = time.monotonic()
+        chunks = [requests[i:i + BATCH_SIZE] for i in range(0, len(requests), BATCH_SIZE)]
+
+        if chunks:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks)),
+                                    thread_name_prefix="dynamodb-bulk") as executor:
+                # Копия контекста на каждую пачку - метрики пишутся с роутом вызывающего,
+                # а bulk-загрузка ждет токены таблицы сколько нужно вместо быстрого отказа
+                with throttle_wait(float('inf')):
+                    contexts = [contextvars.copy_context() for _ in chunks]
+                list(executor.map(lambda ctx, chunk: ctx.run(self._write_chunk, chunk), contexts, chunks))
+
+        elapsed = time.monotonic() - started
+        report = {
+            'table_name': self.table_name,
+            'total': len(requests),
+            'written': self._written,
+            'retried': self._retried,
+            'failed': self._failed,
+            'elapsed': round(elapsed, 3),
+            'items_per_sec': round(self._written / elapsed, 1) if elapsed > 0 else float(self._written)
+        }
+
+        if self._failed:
+            print(f"[ERROR][DynamoDB] - bulk запись в {self.table_name}: не записано {self._failed} из {len(requests)}")
+        print(f"[INFO][DynamoDB] - bulk запись в {self.table_name}: {report['written']} за {report['elapsed']}s "
+              f"({report['items_per_sec']}/s), повторов: {report['retried']}")
+        return report
+
+    def _write_chunk(self, chunk: List[Dict[str, Any]]):
+        pending = chunk
+
+        for attempt in range(self.max_retries + 1):
+            units = sum(estimate_write_units(request) for request in pending)
+            if self.limiter:
+                self.limiter.acquire(units)
+
+            try:
+                response = call_with_throttling(
+                    self.table_name, 'batch_write_item', self.dynamodb.batch_write_item,
+                    units=units, RequestItems={self.table_name: pending}
+                )
+            except (ClientError, DynamoDBThrottledError) as e:
+                print(f"[ERROR][DynamoDB] - Ошибка batch_write_item в {self.table_name}: {e}")
+                self._count(failed=len(pending))
+                return
+
+            unprocessed = response.get('UnprocessedItems', {}).get(self.table_name, [])
+            self._count(written=len(pending) - len(unprocessed))
+            if not unprocessed:
+                return
+
+            if attempt == self.max_retries:
+                break
+
+            self._count(retried=len(unprocessed))
+            pending = unprocessed
+            time.sleep(min(0.05 * (2 ** attempt), 5.0) * random.uniform(0.5, 1.0))
+
+        self._count(failed=len(unprocessed))
+
+    def _count(self, written: int = 0, retried: int = 0, failed: int = 0):
+        with self._lock:
+            self._written += written
+            self._retried += retried
+            self._failed += failed
@@ -0,0 +1,62 @@
+import threading
+import boto3
+from botocore.config import Config
+
+from app.core.security.config import settings
+
+# Один boto3 resource (и его client) на процесс: все репозитории делят
+# пул HTTP-соединений вместо того, чтобы создавать свой на каждую таблицу
+_lock = threading.RLock()
+_resource = None
+_tables = {}
+_connection_checked = False
+
+def _build_config() -> Config:
+    return Config(
+        max_pool_connections=settings.DYNAMODB_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=5,
+        read_timeout=10,
+        # Повторы throttling и временных ошибок (5xx, обрыв соединения, таймаут) делает
+        # call_with_throttling (token bucket + backoff); встроенные повторы botocore
+        # прятали бы throttling от адаптивного bucket
+        retries={'max_attempts': 1, 'mode': 'standard'}
+    )
+
+def get_dynamodb_resource():
+    global _resource
+    if _resource is None:
+        with _lock:
+            if _resource is None:
+                _resource = boto3.resource(
+                    'dynamodb',
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    region_name=settings.AWS_REGION,
+                    config=_build_config()
+                )
+    return _resource
+
+def get_dynamodb_client():
+    return get_dynamodb_resource().meta.client
+
+def get_table(table_name: str):
+    table = _tables.get(table_name)
+    if table is None:
+        table = get_dynamodb_resource().Table(table_name)
+        _tables[table_name] = table
+    return table
+
+def ensure_connection():
+    """
+    Проверка доступности DynamoDB - один раз на процесс, при первом обращении.
+    """
+    global _connection_checked
+    if _connection_checked:
+        return
+
+    with _lock:
+        if _connection_checked:
+            return
+        get_dynamodb_client().list_tables(Limit=1)
+        _connection_checked = True
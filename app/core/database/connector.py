@@ -4,6 +4,7 @@ from app.core.database.repositories.otp import OTPRepository
 from .base import BaseDynamoDBConnector
 from .repositories.user import UserRepository
 from .repositories.generic import GenericRepository
+from .repositories.async_generic import AsyncGenericRepository
 
 class DynamoDBConnector(BaseDynamoDBConnector):
     def __init__(self):
@@ -11,12 +12,14 @@ class DynamoDBConnector(BaseDynamoDBConnector):
         self.users: Optional[UserRepository] = None
         self.otp: Optional[OTPRepository] = None
         self._generic_repositories: Dict[str, GenericRepository] = {}
+        self._async_repositories: Dict[str, AsyncGenericRepository] = {}
     
     def initiate_connection(self) -> 'DynamoDBConnector':
         if self._initialized:
             return self
         
         self._init_clients()
+        self._test_connection()
         self._init_repositories()
         self._initialized = True
         return self
@@ -48,6 +51,12 @@ class DynamoDBConnector(BaseDynamoDBConnector):
         
         return self._generic_repositories[table_name]
     
+    def get_async_repository(self, table_name: str) -> AsyncGenericRepository:
+        if table_name not in self._async_repositories:
+            self._async_repositories[table_name] = AsyncGenericRepository(self.get_repository(table_name))
+        
+        return self._async_repositories[table_name]
+    
     def get_system_info(self) -> Dict[str, Any]:
         try:
             all_tables = list(self.dynamodb.tables.all())
@@ -56,7 +65,12 @@ class DynamoDBConnector(BaseDynamoDBConnector):
             repo_info = {
                 'users': bool(self.users),
                 'otp': bool(self.otp),
-                'generic_repositories': list(self._generic_repositories.keys())
+                'generic_repositories': list(self._generic_repositories.keys()),
+                'scan_fallbacks': {
+                    name: repo.scan_fallbacks
+                    for name, repo in self._generic_repositories.items()
+                    if repo.scan_fallbacks
+                }
             }
             
             return {
@@ -103,4 +117,8 @@ def get_otp_repository() -> OTPRepository:
 
 def get_generic_repository(table_name: str) -> GenericRepository:
     conn = get_db_connector()
-    return conn.get_repository(table_name) if conn else None
\ No newline at end of file
+    return conn.get_repository(table_name) if conn else None
+
+def get_async_generic_repository(table_name: str) -> AsyncGenericRepository:
+    conn = get_db_connector()
+    return conn.get_async_repository(table_name) if conn else None
@@ -0,0 +1,174 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+# ASGI scope текущего запроса: выставляется middleware в app.main и протягивается в потоки пулов.
+# Роутер дописывает в scope найденный route, поэтому шаблон пути читаем в момент вызова
+current_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("dynamodb_current_scope", default=None)
+
+# RCU по таблицам внутри measure_read_capacity() - например, за одну пересборку каталога.
+# Как и current_scope, протягивается в потоки пулов вместе с контекстом
+_read_capacity: ContextVar[Optional[Dict[str, float]]] = ContextVar("dynamodb_read_capacity", default=None)
+
+@contextmanager
+def measure_read_capacity():
+    consumed: Dict[str, float] = {}
+    token = _read_capacity.set(consumed)
+    try:
+        yield consumed
+    finally:
+        _read_capacity.reset(token)
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+READ_OPERATIONS = {'get_item', 'query', 'scan', 'batch_get_item'}
+
+class DynamoDBMetrics:
+    """
+    Счетчики по (таблица, операция, роут): число вызовов и ошибок, гистограмма латентности,
+    прочитано (ScannedCount) против возвращено (Count) и потраченные RCU/WCU.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[tuple, Dict[str, Any]] = {}
+        self._started_at = datetime.utcnow()
+
+    def record(self, table_name: str, operation: str, latency: float,
+               response: Optional[Dict[str, Any]] = None, error: bool = False):
+        key = (table_name, operation, current_route())
+        scanned, returned = self._item_counts(response)
+        capacity = consumed_capacity(response, table_name) or 0.0
+        meter = _read_capacity.get()
+
+        with self._lock:
+            if meter is not None and operation in READ_OPERATIONS:
+                meter[table_name] = meter.get(table_name, 0.0) + capacity
+            stat = self._stats.get(key)
+            if stat is None:
+                stat = self._stats[key] = {
+                    'calls': 0,
+                    'errors': 0,
+                    'latency_total_ms': 0.0,
+                    'latency_max_ms': 0.0,
+                    'latency_buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                    'items_scanned': 0,
+                    'items_returned': 0,
+                    'rcu': 0.0,
+                    'wcu': 0.0
+                }
+
+            latency_ms = latency * 1000
+            stat['calls'] += 1
+            stat['errors'] += int(error)
+            stat['latency_total_ms'] += latency_ms
+            stat['latency_max_ms'] = max(stat['latency_max_ms'], latency_ms)
+            stat['latency_buckets'][self._bucket_index(latency_ms)] += 1
+            stat['items_scanned'] += scanned
+            stat['items_returned'] += returned
+            if operation in READ_OPERATIONS:
+                stat['rcu'] += capacity
+            else:
+                stat['wcu'] += capacity
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = [(key, dict(stat, latency_buckets=list(stat['latency_buckets'])))
+                    for key, stat in self._stats.items()]
+
+        operations = []
+        tables: Dict[str, Dict[str, float]] = {}
+        for (table_name, operation, route), stat in rows:
+            histogram = {f"le_{bound}ms": count for bound, count in zip(LATENCY_BUCKETS_MS, stat['latency_buckets'])}
+            histogram['inf'] = stat['latency_buckets'][-1]
+            operations.append({
+                'table': table_name,
+                'operation': operation,
+                'route': route,
+                'calls': stat['calls'],
+                'errors': stat['errors'],
+                'latency_avg_ms': round(stat['latency_total_ms'] / stat['calls'], 2),
+                'latency_max_ms': round(stat['latency_max_ms'], 2),
+                'latency_histogram': histogram,
+                'items_scanned': stat['items_scanned'],
+                'items_returned': stat['items_returned'],
+                'scan_efficiency': round(stat['items_returned'] / stat['items_scanned'], 3) if stat['items_scanned'] else None,
+                'rcu': round(stat['rcu'], 2),
+                'wcu': round(stat['wcu'], 2)
+            })
+
+            totals = tables.setdefault(table_name, {'calls': 0, 'rcu': 0.0, 'wcu': 0.0})
+            totals['calls'] += stat['calls']
+            totals['rcu'] = round(totals['rcu'] + stat['rcu'], 2)
+            totals['wcu'] = round(totals['wcu'] + stat['wcu'], 2)
+
+        operations.sort(key=lambda row: row['rcu'] + row['wcu'], reverse=True)
+        return {
+            'since': self._started_at.isoformat(),
+            'tables': tables,
+            'operations': operations
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._started_at = datetime.utcnow()
+
+    def _bucket_index(self, latency_ms: float) -> int:
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                return index
+        return len(LATENCY_BUCKETS_MS)
+
+    def _item_counts(self, response: Optional[Dict[str, Any]]) -> tuple:
+        if not response:
+            return 0, 0
+        if 'Count' in response:
+            return response.get('ScannedCount', response['Count']), response['Count']
+        if 'Item' in response:
+            return 1, 1
+        if 'Responses' in response:
+            returned = sum(len(items) for items in response['Responses'].values())
+            return returned, returned
+        return 0, 0
+
+def consumed_capacity(response: Optional[Dict[str, Any]], table_name: str) -> Optional[float]:
+    """
+    CapacityUnits таблицы из ответа (dict для одиночных операций, list для batch).
+    None, если DynamoDB не вернул ConsumedCapacity.
+    """
+    consumed = response.get('ConsumedCapacity') if response else None
+    if not consumed:
+        return None
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return sum(
+        float(entry.get('CapacityUnits', 0))
+        for entry in consumed
+        if entry.get('TableName', table_name) == table_name
+    )
+
+def current_route() -> str:
+    scope = current_scope.get()
+    if scope is None:
+        return "-"
+    route = scope.get('route')
+    return f"{scope.get('method', '')} {getattr(route, 'path', None) or '<unmatched>'}"
+
+db_metrics = DynamoDBMetrics()
+
+def call_with_metrics(table_name: str, operation: str, request, **params) -> Dict[str, Any]:
+    """
+    Выполняет вызов boto3 с ReturnConsumedCapacity=TOTAL и записывает метрики.
+    """
+    params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+    started = time.perf_counter()
+    try:
+        response = request(**params)
+    except Exception:
+        db_metrics.record(table_name, operation, time.perf_counter() - started, error=True)
+        raise
+    db_metrics.record(table_name, operation, time.perf_counter() - started, response)
+    return response
@@ -1,9 +1,11 @@
 from .user import UserRepository
 from app.core.database.repositories.otp import OTPRepository  
 from .generic import GenericRepository
+from .async_generic import AsyncGenericRepository
 
 __all__ = [
     'UserRepository',
     'OTPRepository',
-    'GenericRepository'
+    'GenericRepository',
+    'AsyncGenericRepository'
 ]
\ No newline at end of file
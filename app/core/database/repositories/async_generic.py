@@ -0,0 +1,112 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Dict, Any, Optional, List, AsyncIterator, Callable, Iterator
+
+from app.core.security.config import settings
+from .generic import GenericRepository
+
+# Выделенный ограниченный пул для блокирующих вызовов boto3,
+# чтобы запросы к DynamoDB не останавливали event loop uvicorn
+_db_executor = ThreadPoolExecutor(
+    max_workers=settings.DYNAMODB_ASYNC_WORKERS,
+    thread_name_prefix="dynamodb-async"
+)
+
+async def run_in_db_executor(func: Callable, *args, **kwargs) -> Any:
+    # run_in_executor не переносит contextvars - копируем контекст запроса (роут для метрик)
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_db_executor, partial(context.run, func, *args, **kwargs))
+
+class AsyncGenericRepository:
+    def __init__(self, repository: GenericRepository):
+        self.repository = repository
+        self.table_name = repository.table_name
+
+    async def create(self, data: Dict[str, Any], auto_id: bool = True) -> Dict[str, Any]:
+        return await run_in_db_executor(self.repository.create, data, auto_id)
+
+    async def get_by_id(self, item_id: str, attributes: List[str] = None) -> Optional[Dict[str, Any]]:
+        return await run_in_db_executor(self.repository.get_by_id, item_id, attributes)
+
+    async def update_by_id(self, item_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await run_in_db_executor(self.repository.update_by_id, item_id, updates)
+
+    async def delete_by_id(self, item_id: str) -> bool:
+        return await run_in_db_executor(self.repository.delete_by_id, item_id)
+
+    async def query(self, key_condition: Any, index_name: str = None,
+                    filter_expression: Any = None, limit: int = None,
+                    attributes: List[str] = None) -> List[Dict[str, Any]]:
+        return await run_in_db_executor(
+            self.repository.query_items,
+            self.table_name,
+            key_condition,
+            index_name=index_name,
+            filter_expression=filter_expression,
+            limit=limit,
+            attributes=attributes
+        )
+
+    async def find_by_field(self, field_name: str, field_value: Any,
+                            index_name: str = None, attributes: List[str] = None) -> List[Dict[str, Any]]:
+        return await run_in_db_executor(
+            self.repository.find_by_field, field_name, field_value, index_name, attributes
+        )
+
+    async def list_all(self, limit: int = None, attributes: List[str] = None) -> List[Dict[str, Any]]:
+        return await run_in_db_executor(self.repository.list_all, limit, attributes)
+
+    async def scan_iter(self, filter_expression: Any = None, page_size: int = None,
+                        max_items: int = None, attributes: List[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        iterator = self.repository.scan_iter(
+            self.table_name,
+            filter_expression=filter_expression,
+            page_size=page_size,
+            max_items=max_items,
+            attributes=attributes
+        )
+        async for item in self._drain(iterator, page_size):
+            yield item
+
+    async def iter_all(self, page_size: int = None, max_items: int = None,
+                       attributes: List[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        iterator = self.repository.iter_all(page_size=page_size, max_items=max_items, attributes=attributes)
+        async for item in self._drain(iterator, page_size):
+            yield item
+
+    async def get_many(self, item_ids: List[str], attributes: List[str] = None) -> List[Dict[str, Any]]:
+        return await run_in_db_executor(self.repository.get_many, item_ids, attributes)
+
+    async def batch_get(self, item_ids: List[str], attributes: List[str] = None) -> List[Dict[str, Any]]:
+        return await self.get_many(item_ids, attributes)
+
+    async def bulk_create(self, items: List[Dict[str, Any]], auto_id: bool = True, **options) -> Dict[str, Any]:
+        return await run_in_db_executor(self.repository.bulk_create, items, auto_id, **options)
+
+    async def bulk_upsert(self, items: List[Dict[str, Any]], **options) -> Dict[str, Any]:
+        return await run_in_db_executor(self.repository.bulk_upsert, items, **options)
+
+    async def bulk_delete(self, item_ids: List[str], **options) -> Dict[str, Any]:
+        return await run_in_db_executor(self.repository.bulk_delete, item_ids, **options)
+
+    async def _drain(self, iterator: Iterator[Dict[str, Any]], chunk_size: int = None) -> AsyncIterator[Dict[str, Any]]:
+        # Забираем элементы пачками в пуле, чтобы не платить за переключение потока на каждый элемент
+        chunk_size = chunk_size or 100
+        try:
+            while True:
+                chunk = await run_in_db_executor(lambda: list(islice(iterator, chunk_size)))
+                if not chunk:
+                    return
+                for item in chunk:
+                    yield item
+        finally:
+            try:
+                iterator.close()
+            except ValueError:
+                # Отмена пришла, пока поток пула внутри next(): генератор закроется,
+                # когда поток его отпустит и сборщик мусора заберет ссылку
+                pass
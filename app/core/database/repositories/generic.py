@@ -1,22 +1,48 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Tuple
 from boto3.dynamodb.conditions import Key, Attr
 import uuid
 from datetime import datetime
 
 from ..base import BaseDynamoDBConnector
+from ..bulk_writer import BulkWriter
+from ..throttling import call_with_throttling
+from ..table_schemas import get_table_schema, find_index_for_field, get_provisioned_capacity
 
 class GenericRepository(BaseDynamoDBConnector):
-    def __init__(self, table_name: str):
+    def __init__(self, table_name: str, scan_segments: int = None):
         super().__init__()
         self.table_name = table_name
+        
+        if scan_segments is None:
+            schema = get_table_schema(table_name)
+            scan_segments = getattr(schema, 'scan_segments', 1)
+        self.scan_segments = scan_segments
+        self.scan_fallbacks: Dict[str, int] = {}
     
     def create(self, data: Dict[str, Any], auto_id: bool = True) -> Dict[str, Any]:
         if auto_id and 'id' not in data:
             data['id'] = str(uuid.uuid4())
         return self.create_item(self.table_name, data)
     
-    def get_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
-        return self.get_item(self.table_name, {'id': item_id})
+    def get_by_id(self, item_id: str, attributes: List[str] = None) -> Optional[Dict[str, Any]]:
+        return self.get_item(self.table_name, {'id': item_id}, attributes=attributes)
+    
+    def get_many(self, item_ids: List[str], attributes: List[str] = None) -> List[Dict[str, Any]]:
+        unique_ids = list(dict.fromkeys(item_id for item_id in item_ids if item_id))
+        if not unique_ids:
+            return []
+        
+        # id нужен всегда - по нему восстанавливаем порядок запроса
+        if attributes and 'id' not in attributes:
+            attributes = ['id'] + list(attributes)
+        
+        items = self.batch_get_items(
+            self.table_name,
+            [{'id': item_id} for item_id in unique_ids],
+            attributes=attributes
+        )
+        items_by_id = {item['id']: item for item in items}
+        return [items_by_id[item_id] for item_id in unique_ids if item_id in items_by_id]
     
     def update_by_id(self, item_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         return self.update_item(self.table_name, {'id': item_id}, updates)
@@ -24,37 +50,84 @@ class GenericRepository(BaseDynamoDBConnector):
     def delete_by_id(self, item_id: str) -> bool:
         return self.delete_item(self.table_name, {'id': item_id})
     
-    def list_all(self, limit: int = None) -> List[Dict[str, Any]]:
-        return self.scan_items(self.table_name, limit=limit)
+    def iter_all(self, page_size: int = None, max_items: int = None,
+                 attributes: List[str] = None) -> Iterator[Dict[str, Any]]:
+        return self.parallel_scan_iter(
+            self.table_name,
+            self.scan_segments,
+            page_size=page_size,
+            max_items=max_items,
+            attributes=attributes
+        )
+    
+    def list_all(self, limit: int = None, attributes: List[str] = None) -> List[Dict[str, Any]]:
+        return list(self.iter_all(max_items=limit, attributes=attributes))
     
     def find_by_field(self, field_name: str, field_value: Any, 
-                     index_name: str = None) -> List[Dict[str, Any]]:
+                     index_name: str = None, attributes: List[str] = None) -> List[Dict[str, Any]]:
+        if not index_name:
+            index_name = find_index_for_field(self.table_name, field_name)
+        
         if index_name:
-            return self.query_items(
+            return list(self.query_iter(
                 self.table_name,
                 key_condition=Key(field_name).eq(field_value),
-                index_name=index_name
-            )
+                index_name=index_name,
+                attributes=attributes
+            ))
         else:
-            return self.scan_items(
+            self._warn_scan_fallback(field_name)
+            return list(self.scan_iter(
                 self.table_name,
-                filter_expression=Attr(field_name).eq(field_value)
-            )
+                filter_expression=Attr(field_name).eq(field_value),
+                attributes=attributes
+            ))
     
     def find_by_multiple_fields(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # Если одно из полей покрыто GSI - делаем Query по нему, остальные поля идут в фильтр
+        for field, value in filters.items():
+            index_name = find_index_for_field(self.table_name, field)
+            if index_name:
+                rest = [Attr(f).eq(v) for f, v in filters.items() if f != field]
+                return list(self.query_iter(
+                    self.table_name,
+                    key_condition=Key(field).eq(value),
+                    index_name=index_name,
+                    filter_expression=self._combine_filters(rest)
+                ))
+        
+        self._warn_scan_fallback(', '.join(filters.keys()))
         filter_expressions = [Attr(field).eq(value) for field, value in filters.items()]
+        return self.scan_items(self.table_name, filter_expression=self._combine_filters(filter_expressions))
+    
+    def _combine_filters(self, filter_expressions: List[Any]) -> Any:
+        if not filter_expressions:
+            return None
         combined_filter = filter_expressions[0]
         for expr in filter_expressions[1:]:
             combined_filter = combined_filter & expr
-        
-        return self.scan_items(self.table_name, filter_expression=combined_filter)
+        return combined_filter
+    
+    def _warn_scan_fallback(self, field_name: str):
+        self.scan_fallbacks[field_name] = self.scan_fallbacks.get(field_name, 0) + 1
+        print(f"[WARNING][DynamoDB] - {self.table_name}: нет GSI для '{field_name}', поиск через полный Scan "
+              f"(раз: {self.scan_fallbacks[field_name]})")
     
     def count_total(self) -> int:
-        response = self.get_table(self.table_name).scan(Select='COUNT')
-        return response.get('Count', 0)
+        table = self.get_table(self.table_name)
+        scan_params = {'Select': 'COUNT'}
+        total = 0
+        
+        while True:
+            response = call_with_throttling(self.table_name, 'scan', table.scan, **scan_params)
+            total += response.get('Count', 0)
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return total
+            scan_params['ExclusiveStartKey'] = last_key
     
     def get_stats(self) -> Dict[str, Any]:
-        items = self.scan_items(self.table_name)
+        items = self.list_all()
         
         if not items:
             return {
@@ -80,26 +153,76 @@ class GenericRepository(BaseDynamoDBConnector):
             'analysis_timestamp': datetime.utcnow().isoformat()
         }
     
-    def bulk_create(self, items: List[Dict[str, Any]], auto_id: bool = True) -> bool:
-        if auto_id:
-            for item in items:
-                if 'id' not in item:
-                    item['id'] = str(uuid.uuid4())
+    def bulk_create(self, items: List[Dict[str, Any]], auto_id: bool = True,
+                    workers: int = None, max_wcu: float = None,
+                    cap_to_provisioned: bool = False) -> Dict[str, Any]:
+        """
+        Возвращает отчет BulkWriter (written, failed, ...). Словарь всегда истинный -
+        успех проверяется по report['failed'] == 0, а не по `if repo.bulk_create(...)`.
+        Записи без id (при auto_id=False) не пишутся и считаются в failed.
+        """
+        now = datetime.utcnow().isoformat()
+        for item in items:
+            if auto_id and 'id' not in item:
+                item['id'] = str(uuid.uuid4())
+            item.setdefault('created_at', now)
+            item.setdefault('updated_at', now)
+        
+        keyed, missing = self._dedupe_by_id(items)
+        return self._bulk_write(
+            [{'PutRequest': {'Item': item}} for item in keyed],
+            workers, max_wcu, cap_to_provisioned, rejected=missing
+        )
+    
+    def bulk_upsert(self, items: List[Dict[str, Any]], workers: int = None,
+                    max_wcu: float = None, cap_to_provisioned: bool = False) -> Dict[str, Any]:
+        """
+        Отчет как у bulk_create: записи без id не пишутся и считаются в failed.
+        """
+        now = datetime.utcnow().isoformat()
+        for item in items:
+            item.setdefault('created_at', now)
+            item['updated_at'] = now
+        
+        keyed, missing = self._dedupe_by_id(items)
+        return self._bulk_write(
+            [{'PutRequest': {'Item': item}} for item in keyed],
+            workers, max_wcu, cap_to_provisioned, rejected=missing
+        )
+    
+    def bulk_delete(self, item_ids: List[str], workers: int = None,
+                    max_wcu: float = None, cap_to_provisioned: bool = False) -> Dict[str, Any]:
+        unique_ids = list(dict.fromkeys(item_id for item_id in item_ids if item_id))
+        return self._bulk_write(
+            [{'DeleteRequest': {'Key': {'id': item_id}}} for item_id in unique_ids],
+            workers, max_wcu, cap_to_provisioned
+        )
+    
+    def _dedupe_by_id(self, items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        # DynamoDB отклоняет пачку с повторяющимся ключом - оставляем последнюю версию.
+        # Записи без id отбрасываем заранее, иначе BatchWriteItem упадет на всей пачке
+        by_id: Dict[Any, Dict[str, Any]] = {}
+        missing = 0
+        for item in items:
+            if item.get('id') in (None, ''):
+                missing += 1
+                continue
+            by_id[item['id']] = item
+        return list(by_id.values()), missing
+    
+    def _bulk_write(self, requests: List[Dict[str, Any]], workers: int = None,
+                    max_wcu: float = None, cap_to_provisioned: bool = False,
+                    rejected: int = 0) -> Dict[str, Any]:
+        if self.dynamodb is None:
+            raise RuntimeError("DynamoDB не инициализирован")
+        
+        if max_wcu is None and cap_to_provisioned:
+            max_wcu = get_provisioned_capacity(self.table_name, 'WriteCapacityUnits')
         
-        try:
-            batch_size = 25
-            for i in range(0, len(items), batch_size):
-                batch = items[i:i + batch_size]
-                table = self.get_table(self.table_name)
-                
-                with table.batch_writer() as batch_writer:
-                    for item in batch:
-                        if 'created_at' not in item:
-                            item['created_at'] = datetime.utcnow().isoformat()
-                        if 'updated_at' not in item:
-                            item['updated_at'] = datetime.utcnow().isoformat()
-                        batch_writer.put_item(Item=item)
-            return True
-        except Exception as e:
-            print(f"[ERROR][DynamoDB] - Ошибка bulk_create в {self.table_name}: {e}")
-            return False
\ No newline at end of file
+        writer = BulkWriter(self.dynamodb, self.table_name, workers=workers, max_wcu=max_wcu)
+        report = writer.write(requests)
+        if rejected:
+            print(f"[ERROR][DynamoDB] - bulk запись в {self.table_name}: пропущено {rejected} записей без id")
+            report['total'] += rejected
+            report['failed'] += rejected
+        return report
@@ -6,6 +6,7 @@ from datetime import datetime, timezone
 import uuid
 
 from ..base import BaseDynamoDBConnector
+from ..throttling import call_with_throttling
 
 class UserRepository(BaseDynamoDBConnector):
     def __init__(self, table_name: str = "users"):
@@ -157,7 +158,7 @@ class UserRepository(BaseDynamoDBConnector):
             print(f"[DEBUG][UserRepo] - AttributeNames: {attr_names}")
             print(f"[DEBUG][UserRepo] - AttributeValues: {list(attr_values.keys())}")
             
-            response = table.update_item(**update_params)
+            response = call_with_throttling(self.table_name, 'update_item', table.update_item, **update_params)
             
             return response.get('Attributes')
             
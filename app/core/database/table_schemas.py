@@ -160,6 +160,9 @@ class TokensSchema:
         'WriteCapacityUnits': 10
     }
     
+    # Число сегментов для параллельного Scan всей таблицы
+    scan_segments = 4
+    
     global_secondary_indexes = [
         {
             'IndexName': 'symbol-index',
@@ -225,6 +228,9 @@ class TokenStatsSchema:
         'WriteCapacityUnits': 10
     }
     
+    # Число сегментов для параллельного Scan всей таблицы
+    scan_segments = 8
+    
     global_secondary_indexes = [
         {
             'IndexName': 'symbol-index',
@@ -678,3 +684,40 @@ exchanges_schema = ExchangesSchema()
 exchange_stats_schema = ExchangeStatsSchema()
 wallets_schema = WalletsSchema()
 conductors_schema = ConductorsSchema()
+
+
+table_schemas_registry = {
+    schema.table_name: schema
+    for schema in (
+        roadmaps_schema, security_audit_schema, people_schema, platform_schema,
+        users_schema, otp_schema, tokens_schema, token_stats_schema,
+        exchanges_schema, exchange_stats_schema, wallets_schema, conductors_schema
+    )
+}
+
+def get_table_schema(table_name: str):
+    return table_schemas_registry.get(table_name)
+
+def find_index_for_field(table_name: str, field_name: str):
+    """
+    Ищет GSI, у которого HASH-ключ совпадает с полем и проекция ALL,
+    чтобы Query вернул те же полные элементы, что и Scan.
+    """
+    schema = get_table_schema(table_name)
+    if not schema:
+        return None
+    
+    for index in getattr(schema, 'global_secondary_indexes', []):
+        if index.get('Projection', {}).get('ProjectionType') != 'ALL':
+            continue
+        for key in index.get('KeySchema', []):
+            if key['KeyType'] == 'HASH' and key['AttributeName'] == field_name:
+                return index['IndexName']
+    
+    return None
+
+def get_provisioned_capacity(table_name: str, capacity: str = 'WriteCapacityUnits'):
+    schema = get_table_schema(table_name)
+    if not schema:
+        return None
+    return getattr(schema, 'provisioned_throughput', {}).get(capacity)
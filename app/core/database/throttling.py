@@ -0,0 +1,192 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+from typing import Dict, Any, Optional
+
+from app.core.security.config import settings
+from .metrics import call_with_metrics, consumed_capacity
+from .table_schemas import get_provisioned_capacity
+
+THROTTLE_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded'
+}
+
+# Временные ошибки сервиса: встроенные повторы botocore выключены, повторяем здесь с тем же backoff
+TRANSIENT_ERROR_CODES = {
+    'InternalServerError',
+    'InternalFailure',
+    'ServiceUnavailable'
+}
+
+WRITE_OPERATIONS = {'put_item', 'update_item', 'delete_item', 'batch_write_item'}
+
+# Сколько можно ждать токены в текущем контексте. Запросы API ждут недолго и получают 503,
+# фоновые задачи и bulk-загрузка ставят большее значение через throttle_wait()
+_max_wait: ContextVar[Optional[float]] = ContextVar("dynamodb_throttle_max_wait", default=None)
+
+@contextmanager
+def throttle_wait(seconds: float):
+    token = _max_wait.set(seconds)
+    try:
+        yield
+    finally:
+        _max_wait.reset(token)
+
+class DynamoDBThrottledError(Exception):
+    """
+    Таблица не успевает по provisioned throughput: клиентский лимит исчерпан
+    или DynamoDB продолжает отвечать throttling после повторов.
+    """
+    def __init__(self, table_name: str, operation: str, retry_after: float = 1.0):
+        self.table_name = table_name
+        self.operation = operation
+        self.retry_after = retry_after
+        super().__init__(f"DynamoDB throttling: {table_name}.{operation}, повторить через {retry_after:.1f}s")
+
+class TokenBucket:
+    """
+    Клиентский token bucket на capacity units в секунду.
+    Баланс может уйти в минус: реальный расход (ConsumedCapacity) списывается после вызова,
+    и следующие запросы ждут, пока долг не погасится.
+    При throttling скорость адаптивно снижается вдвое и затем плавно возвращается к базовой.
+    """
+    def __init__(self, rate: float, burst_seconds: float = None):
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = self.base_rate * (burst_seconds or settings.DYNAMODB_BURST_SECONDS)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, units: float = 1.0, max_wait: float = float('inf')) -> float:
+        """
+        Забирает units, при нехватке ждет пополнения.
+        Если ожидание больше max_wait - ничего не списывает и возвращает нужную задержку.
+        Возвращает 0, если токены получены.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= min(units, self.capacity):
+                    self.tokens -= units
+                    return 0.0
+                wait = (min(units, self.capacity) - self.tokens) / self.rate
+
+            if wait > max_wait:
+                return wait
+            time.sleep(wait)
+
+    def settle(self, estimated: float, consumed: float):
+        # Доначисляем разницу между оценкой и фактическим ConsumedCapacity
+        with self._lock:
+            self.tokens -= consumed - estimated
+
+    def on_throttle(self):
+        with self._lock:
+            self.rate = max(self.base_rate * 0.1, self.rate * 0.5)
+            self.tokens = min(self.tokens, 0.0)
+
+    def on_success(self):
+        if self.rate < self.base_rate:
+            with self._lock:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+_buckets: Dict[tuple, Optional[TokenBucket]] = {}
+_buckets_lock = threading.Lock()
+
+def get_bucket(table_name: str, operation: str) -> Optional[TokenBucket]:
+    if not settings.DYNAMODB_CLIENT_THROTTLING:
+        return None
+    capacity = 'WriteCapacityUnits' if operation in WRITE_OPERATIONS else 'ReadCapacityUnits'
+    key = (table_name, capacity)
+    if key not in _buckets:
+        with _buckets_lock:
+            if key not in _buckets:
+                rate = get_provisioned_capacity(table_name, capacity)
+                _buckets[key] = TokenBucket(rate) if rate else None
+    return _buckets[key]
+
+def paced_interval(min_seconds: float, consumed: Dict[str, float]) -> float:
+    """
+    Пауза фоновой задачи после прохода, потратившего consumed RCU по таблицам:
+    в среднем она берет не больше DYNAMODB_BACKGROUND_READ_SHARE от provisioned RCU каждой таблицы.
+    """
+    interval = float(min_seconds)
+    share = settings.DYNAMODB_BACKGROUND_READ_SHARE
+    for table_name, units in consumed.items():
+        rate = get_provisioned_capacity(table_name, 'ReadCapacityUnits')
+        if rate and share > 0:
+            interval = max(interval, units / (rate * share))
+    return interval
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, (BotoConnectionError, HTTPClientError)):
+        return True
+    response = getattr(error, 'response', None) or {}
+    code = response.get('Error', {}).get('Code')
+    status = response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+    return code in TRANSIENT_ERROR_CODES or status >= 500
+
+def call_with_throttling(table_name: str, operation: str, request,
+                         units: float = 1.0, **params) -> Dict[str, Any]:
+    """
+    Вызов DynamoDB через token bucket таблицы с адаптивным повтором throttling.
+    units - оценка расхода до вызова, после вызова списывается фактический ConsumedCapacity.
+    Если токены не дождались или повторы кончились - DynamoDBThrottledError.
+    Временные ошибки (5xx, обрыв соединения, таймаут) повторяются с тем же backoff,
+    после последней попытки пробрасывается исходная ошибка.
+    """
+    max_wait = _max_wait.get()
+    if max_wait is None:
+        max_wait = settings.DYNAMODB_THROTTLE_MAX_WAIT
+    bucket = get_bucket(table_name, operation)
+    max_retries = settings.DYNAMODB_THROTTLE_RETRIES
+
+    for attempt in range(max_retries + 1):
+        if bucket:
+            wait = bucket.acquire(units, max_wait)
+            if wait:
+                raise DynamoDBThrottledError(table_name, operation, wait)
+
+        try:
+            response = call_with_metrics(table_name, operation, request, **params)
+        except (ClientError, BotoConnectionError, HTTPClientError) as e:
+            code = e.response.get('Error', {}).get('Code') if isinstance(e, ClientError) else None
+            if code in THROTTLE_ERROR_CODES:
+                if bucket:
+                    bucket.on_throttle()
+                if attempt == max_retries:
+                    break
+                reason = "throttling"
+            elif _is_transient(e):
+                # Емкость не израсходована - возвращаем оценку в bucket
+                if bucket:
+                    bucket.settle(units, 0.0)
+                if attempt == max_retries:
+                    raise
+                reason = f"временная ошибка {code or type(e).__name__}"
+            else:
+                raise
+            delay = min(0.1 * (2 ** attempt), 3.0)
+            print(f"[WARNING][DynamoDB] - {reason} {table_name}.{operation}, попытка {attempt + 1}/{max_retries}")
+            time.sleep(random.uniform(0, delay))
+            continue
+
+        if bucket:
+            bucket.on_success()
+            consumed = consumed_capacity(response, table_name)
+            if consumed is not None:
+                bucket.settle(units, consumed)
+        return response
+
+    raise DynamoDBThrottledError(table_name, operation, min(0.1 * (2 ** max_retries), 3.0))
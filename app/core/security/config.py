@@ -61,6 +61,58 @@ class Settings:
     def DYNAMODB_OTP_TABLE(self) -> str:
         return _dynaconf.get("dynamodb_otp_table", "")
     
+    @property
+    def DYNAMODB_MAX_POOL_CONNECTIONS(self) -> int:
+        return _dynaconf.get("dynamodb_max_pool_connections", 64)
+    
+    @property
+    def DYNAMODB_SCAN_WORKERS(self) -> int:
+        return _dynaconf.get("dynamodb_scan_workers", 16)
+    
+    @property
+    def DYNAMODB_ASYNC_WORKERS(self) -> int:
+        return _dynaconf.get("dynamodb_async_workers", 32)
+    
+    @property
+    def DYNAMODB_BULK_WORKERS(self) -> int:
+        return _dynaconf.get("dynamodb_bulk_workers", 8)
+    
+    @property
+    def DYNAMODB_CLIENT_THROTTLING(self) -> bool:
+        return _dynaconf.get("dynamodb_client_throttling", True)
+    
+    @property
+    def DYNAMODB_BURST_SECONDS(self) -> float:
+        return _dynaconf.get("dynamodb_burst_seconds", 300)
+    
+    @property
+    def DYNAMODB_THROTTLE_MAX_WAIT(self) -> float:
+        return _dynaconf.get("dynamodb_throttle_max_wait", 2.0)
+    
+    @property
+    def DYNAMODB_THROTTLE_RETRIES(self) -> int:
+        return _dynaconf.get("dynamodb_throttle_retries", 5)
+    
+    @property
+    def DYNAMODB_BACKGROUND_READ_SHARE(self) -> float:
+        return _dynaconf.get("dynamodb_background_read_share", 0.2)
+    
+    @property
+    def TOKEN_CATALOG_REFRESH_SECONDS(self) -> int:
+        return _dynaconf.get("token_catalog_refresh_seconds", 60)
+    
+    @property
+    def EXCHANGE_CATALOG_REFRESH_SECONDS(self) -> int:
+        return _dynaconf.get("exchange_catalog_refresh_seconds", 300)
+    
+    @property
+    def TOKEN_DETAIL_DEADLINE_SECONDS(self) -> float:
+        return _dynaconf.get("token_detail_deadline_seconds", 1.5)
+    
+    @property
+    def TOKEN_RESPONSE_CACHE_MB(self) -> int:
+        return _dynaconf.get("token_response_cache_mb", 32)
+    
     @property
     def GOOGLE_CLIENT_ID(self) -> str:
         return _dynaconf.get("google_client_id", "")
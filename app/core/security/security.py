@@ -85,8 +85,9 @@ async def get_current_user(
         raise credentials_exception
     
     from app.core.database.crud.user import get_user
+    from app.core.database.repositories.async_generic import run_in_db_executor
     
-    user = get_user(user_id)
+    user = await run_in_db_executor(get_user, user_id)
     if user is None:
         print(f"Пользователь с ID {user_id} не найден в DynamoDB")
         raise credentials_exception
@@ -110,8 +111,9 @@ async def get_current_user_optional(
         return None
     
     from app.core.database.crud.user import get_user
+    from app.core.database.repositories.async_generic import run_in_db_executor
     
-    user = get_user(user_id)
+    user = await run_in_db_executor(get_user, user_id)
     if user is None or not user.get('is_active', True):
         return None
     
@@ -128,8 +130,9 @@ def format_utc_time(dt: datetime) -> str:
 
 async def get_admin_user(current_user = Depends(get_current_user)):
     from app.core.database.crud.user import get_user
+    from app.core.database.repositories.async_generic import run_in_db_executor
     
-    fresh_user = get_user(current_user['id'])
+    fresh_user = await run_in_db_executor(get_user, current_user['id'])
     if not fresh_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -145,8 +148,9 @@ async def get_admin_user(current_user = Depends(get_current_user)):
 
 async def get_pro_user(current_user = Depends(get_current_user)):
     from app.core.database.crud.user import get_user
+    from app.core.database.repositories.async_generic import run_in_db_executor
     
-    fresh_user = get_user(current_user['id'])
+    fresh_user = await run_in_db_executor(get_user, current_user['id'])
     if not fresh_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -163,8 +167,9 @@ async def get_pro_user(current_user = Depends(get_current_user)):
 
 async def check_user_role(required_role: str, current_user = Depends(get_current_user)):
     from app.core.database.crud.user import get_user
+    from app.core.database.repositories.async_generic import run_in_db_executor
     
-    fresh_user = get_user(current_user['id'])
+    fresh_user = await run_in_db_executor(get_user, current_user['id'])
     if not fresh_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
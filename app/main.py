@@ -1,5 +1,8 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from app.core.database.metrics import current_scope
+from app.core.database.throttling import DynamoDBThrottledError
 from datetime import datetime
 import uvicorn
 
@@ -25,6 +28,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def dynamodb_route_context(request: Request, call_next):
+    # Метрики DynamoDB группируются по шаблону роута, а не по конкретному URL
+    token = current_scope.set(request.scope)
+    try:
+        return await call_next(request)
+    finally:
+        current_scope.reset(token)
+
+@app.exception_handler(DynamoDBThrottledError)
+async def dynamodb_throttled_handler(request: Request, exc: DynamoDBThrottledError):
+    print(f"[WARNING][APP] - {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "База данных перегружена, повторите запрос позже"},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+    )
+
 try:
     from app.routes.auth import router as auth_router
     app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
@@ -86,12 +107,27 @@ async def startup_event():
             system_info = connector.get_system_info()
             print(f"[INFO][APP] - Статус БД: {system_info.get('status')}")
             print(f"[INFO][APP] - Таблиц: {system_info.get('total_tables')}")
+            
+            from app.services.market.catalog.token_catalog import token_catalog
+            token_catalog.start()
+            print("[INFO][APP] - Фоновое обновление каталога токенов запущено")
+            
+            from app.services.market.catalog.exchange_catalog import exchange_catalog
+            exchange_catalog.start()
+            print("[INFO][APP] - Фоновое обновление каталога бирж запущено")
         else:
             print("[ERROR][APP] - Не удалось инициализировать базу данных")
             
     except Exception as e:
         print(f"[ERROR][APP] - Ошибка инициализации: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.services.market.catalog.token_catalog import token_catalog
+    from app.services.market.catalog.exchange_catalog import exchange_catalog
+    await token_catalog.stop()
+    await exchange_catalog.stop()
+
 @app.get("/health", tags=["Health Check"])
 async def health_check():
     return {
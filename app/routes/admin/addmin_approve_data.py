@@ -3,7 +3,8 @@ from typing import Dict, Any
 from datetime import datetime
 
 from app.core.security.security import get_admin_user
-from app.core.database.connector import get_generic_repository
+from app.core.database.connector import get_async_generic_repository
+from app.services.market.catalog.token_catalog import token_catalog
 
 router = APIRouter()
 
@@ -14,10 +15,10 @@ async def approve_token(
     current_user = Depends(get_admin_user)
 ):
     try:
-        tokens_repo = get_generic_repository("LiberandumAggregationToken")
-        token_stats_repo = get_generic_repository("LiberandumAggregationTokenStats")
+        tokens_repo = get_async_generic_repository("LiberandumAggregationToken")
+        token_stats_repo = get_async_generic_repository("LiberandumAggregationTokenStats")
         
-        token_results = tokens_repo.find_by_field("coingecko_id", coingecko_id)
+        token_results = await tokens_repo.find_by_field("coingecko_id", coingecko_id)
         if not token_results:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -46,9 +47,9 @@ async def approve_token(
             'updated_by_admin': current_user['id']
         }
         
-        updated_token = tokens_repo.update_by_id(token['id'], token_updates)
+        updated_token = await tokens_repo.update_by_id(token['id'], token_updates)
         
-        token_stats_results = token_stats_repo.find_by_field("coingecko_id", coingecko_id)
+        token_stats_results = await token_stats_repo.find_by_field("coingecko_id", coingecko_id)
         updated_stats = []
         
         for stats in token_stats_results:
@@ -61,10 +62,11 @@ async def approve_token(
                     'updated_by_admin': current_user['id']
                 }
                 
-                updated_stat = token_stats_repo.update_by_id(stats['id'], stats_updates)
+                updated_stat = await token_stats_repo.update_by_id(stats['id'], stats_updates)
                 if updated_stat:
                     updated_stats.append(updated_stat)
         
+        token_catalog.request_refresh()
         status_text = "подтвержден" if approved else "отклонен"
         
         return {
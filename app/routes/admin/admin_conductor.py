@@ -4,7 +4,7 @@ from typing import Dict, Any, Optional, List
 from app.core.security.security import get_admin_user
 from app.routes.admin.admin_controller import BaseAdminController
 from app.schemas.wallte_conductors import ConductorCreate, ConductorUpdate, ConductorResponse
-from app.core.database.connector import get_generic_repository
+from app.core.database.connector import get_async_generic_repository
 
 router = APIRouter()
 controller = BaseAdminController("LiberandumApiConductors", "conductor")
@@ -29,8 +29,8 @@ async def search_conductors(
 ):
 
     try:
-        conductors_repo = get_generic_repository("LiberandumApiConductors")
-        all_conductors = conductors_repo.list_all(limit=1000)
+        conductors_repo = get_async_generic_repository("LiberandumApiConductors")
+        all_conductors = await conductors_repo.list_all(limit=1000)
         
         query_lower = q.lower().strip()
         results = []
@@ -1,20 +1,22 @@
 from fastapi import HTTPException, status
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
 from decimal import Decimal
 import uuid
 
 from app.core.security.permissions import require_admin
-from app.core.database.connector import get_generic_repository
+from app.core.database.connector import get_async_generic_repository
 from app.core.security.security import get_admin_user
 
 class BaseAdminController:
-    def __init__(self, table_name: str, entity_name: str):
+    def __init__(self, table_name: str, entity_name: str, on_change: Optional[Callable[[], None]] = None):
         self.table_name = table_name
         self.entity_name = entity_name
+        # Вызывается после create/update/delete - например, чтобы пересобрать кэш каталога
+        self.on_change = on_change
     
     def _get_repository(self):
-        return get_generic_repository(self.table_name)
+        return get_async_generic_repository(self.table_name)
     
     def _convert_floats_to_decimals(self, data: Dict[str, Any]) -> Dict[str, Any]:
 
@@ -63,6 +65,10 @@ class BaseAdminController:
         
         return data
     
+    def _notify_change(self):
+        if self.on_change:
+            self.on_change()
+    
     async def create_entity(self, entity_data: Dict[str, Any], current_user: Dict[str, Any]):
         try:
             repo = self._get_repository()
@@ -73,7 +79,8 @@ class BaseAdminController:
                 entity_data['approved'] = False
             
             entity_data = self._add_audit_fields(entity_data, current_user['id'], "create")
-            created_entity = repo.create(entity_data, auto_id=False)
+            created_entity = await repo.create(entity_data, auto_id=False)
+            self._notify_change()
             
             return {
                 "message": f"{self.entity_name} создан",
@@ -90,7 +97,7 @@ class BaseAdminController:
     async def get_entities_list(self, limit: Optional[int], current_user: Dict[str, Any]):
         try:
             repo = self._get_repository()
-            items = repo.scan_items(self.table_name, limit=limit)
+            items = await repo.list_all(limit=limit)
             active_items = [item for item in items if not item.get('is_deleted', False)]
             
             if self.table_name == "LiberandumAggregationToken":
@@ -118,7 +125,7 @@ class BaseAdminController:
     async def get_entity_by_id(self, entity_id: str, current_user: Dict[str, Any]):
         try:
             repo = self._get_repository()
-            entity = repo.get_by_id(entity_id)
+            entity = await repo.get_by_id(entity_id)
             
             if not entity:
                 raise HTTPException(
@@ -151,7 +158,7 @@ class BaseAdminController:
         try:
             repo = self._get_repository()
             
-            existing_entity = repo.get_by_id(entity_id)
+            existing_entity = await repo.get_by_id(entity_id)
             if not existing_entity:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, 
@@ -176,7 +183,8 @@ class BaseAdminController:
                 else:
                     print(f"   {key}: {type(value).__name__}")
             
-            updated_entity = repo.update_by_id(entity_id, updates)
+            updated_entity = await repo.update_by_id(entity_id, updates)
+            self._notify_change()
             
             if self.table_name == "LiberandumAggregationToken" and updated_entity:
                 updated_entity['description_en'] = updated_entity.get('description', '')
@@ -207,7 +215,7 @@ class BaseAdminController:
         try:
             repo = self._get_repository()
             
-            existing_entity = repo.get_by_id(entity_id)
+            existing_entity = await repo.get_by_id(entity_id)
             if not existing_entity:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, 
@@ -215,7 +223,8 @@ class BaseAdminController:
                 )
             
             delete_data = self._add_audit_fields({}, current_user['id'], "delete")
-            repo.update_by_id(entity_id, delete_data)
+            await repo.update_by_id(entity_id, delete_data)
+            self._notify_change()
             
             return {
                 "message": f"{self.entity_name} удален",
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.core.database.metrics import db_metrics
+from app.core.security.security import get_admin_user
+
+router = APIRouter()
+
+@router.get("/")
+async def get_db_metrics(
+    table: str = Query(default=None, description="Фильтр по таблице"),
+    route: str = Query(default=None, description="Фильтр по роуту"),
+    current_user = Depends(get_admin_user)
+):
+    snapshot = db_metrics.snapshot()
+    
+    operations = snapshot['operations']
+    if table:
+        operations = [row for row in operations if row['table'] == table]
+    if route:
+        operations = [row for row in operations if route in row['route']]
+    
+    return {
+        "since": snapshot['since'],
+        "tables": snapshot['tables'],
+        "operations": operations,
+        "admin": current_user['email']
+    }
+
+@router.post("/reset")
+async def reset_db_metrics(current_user = Depends(get_admin_user)):
+    db_metrics.reset()
+    return {
+        "message": "Метрики DynamoDB сброшены",
+        "admin": current_user['email']
+    }
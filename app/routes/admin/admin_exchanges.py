@@ -3,10 +3,11 @@ from typing import Dict, Any, Optional
 
 from app.core.security.security import get_admin_user
 from app.routes.admin.admin_controller import BaseAdminController
+from app.services.market.catalog.exchange_catalog import exchange_catalog
 
 router = APIRouter()
-exchanges_controller = BaseAdminController("LiberandumAggregationExchanges", "exchange")
-exchange_stats_controller = BaseAdminController("LiberandumAggregationExchangesStats", "exchange-stats")
+exchanges_controller = BaseAdminController("LiberandumAggregationExchanges", "exchange", on_change=exchange_catalog.request_refresh)
+exchange_stats_controller = BaseAdminController("LiberandumAggregationExchangesStats", "exchange-stats", on_change=exchange_catalog.request_refresh)
 
 @router.post("/")
 async def create_exchange(exchange_data: Dict[str, Any], current_user = Depends(get_admin_user)):
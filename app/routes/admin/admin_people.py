@@ -4,7 +4,7 @@ from typing import Dict, Any, Optional, List
 from app.core.security.security import get_admin_user
 from app.routes.admin.admin_controller import BaseAdminController
 from app.schemas.people_audit import PersonCreate, PersonUpdate, PersonResponse
-from app.core.database.connector import get_generic_repository
+from app.core.database.connector import get_async_generic_repository
 
 router = APIRouter()
 controller = BaseAdminController("LiberandumApiPeople", "person")
@@ -26,8 +26,8 @@ async def search_people(
     current_user = Depends(get_admin_user)
 ):
     try:
-        people_repo = get_generic_repository("LiberandumApiPeople")
-        all_people = people_repo.list_all(limit=1000)
+        people_repo = get_async_generic_repository("LiberandumApiPeople")
+        all_people = await people_repo.list_all(limit=1000)
         
         query_lower = q.lower().strip()
         results = []
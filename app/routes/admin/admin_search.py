@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status
 from typing import List, Optional, Dict, Any
 
-from app.core.database.connector import get_generic_repository
+from app.core.database.connector import get_async_generic_repository
 from app.core.security.security import get_admin_user
+from app.services.market.catalog.token_catalog import token_catalog
 
 try:
     from app.services.admin.coingecko_search_service import coingecko_search_service
@@ -11,6 +12,29 @@ except ImportError:
 
 router = APIRouter()
 
+# Проекции для поиска: читаем только поля, по которым ищем и которые отдаем
+SEARCH_TOKEN_ATTRIBUTES = [
+    'id', 'name', 'symbol', 'coingecko_id', 'description', 'description_ru', 'description_uz',
+    'avatar_image', 'website', 'approved', 'is_deleted', 'created_at', 'created_by_admin'
+]
+SEARCH_TOKEN_STATS_ATTRIBUTES = [
+    'id', 'symbol', 'coin_name', 'coingecko_id', 'price', 'market_cap', 'trading_volume_24h',
+    'approved', 'approved_by', 'approved_at', 'rejected', 'rejection_reason',
+    'is_deleted', 'created_at', 'updated_at'
+]
+SEARCH_EXCHANGE_ATTRIBUTES = [
+    'id', 'name', 'coingecko_id', 'avatar_image', 'website', 'country',
+    'is_deleted', 'created_at', 'created_by_admin'
+]
+SEARCH_EXCHANGE_STATS_ATTRIBUTES = [
+    'id', 'name', 'exchange_id', 'trading_volume_24h', 'trading_volume_1w', 'reserves',
+    'visitors_30d', 'coins_count', 'is_deleted', 'created_at', 'updated_at'
+]
+SEARCH_USER_ATTRIBUTES = [
+    'id', 'email', 'name', 'first_name', 'last_name', 'role', 'is_verified', 'is_active',
+    'auth_provider', 'created_at', 'updated_at'
+]
+
 @router.get("/coingecko/tokens")
 async def search_coingecko_tokens(
     q: str = Query(..., min_length=1, description="Название или символ токена"),
@@ -71,8 +95,8 @@ async def search_tokens(
     current_user = Depends(get_admin_user)
 ):
     try:
-        tokens_repo = get_generic_repository("LiberandumAggregationToken")
-        all_tokens = tokens_repo.list_all(limit=1000)
+        tokens_repo = get_async_generic_repository("LiberandumAggregationToken")
+        all_tokens = await tokens_repo.list_all(limit=1000, attributes=SEARCH_TOKEN_ATTRIBUTES)
         
         query_lower = q.lower().strip()
         results = []
@@ -126,6 +150,24 @@ async def search_tokens(
             detail=f"Ошибка поиска токенов: {str(e)}"
         )
 
+def _token_stats_result(stat: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': stat.get('id'),
+        'symbol': (stat.get('symbol') or '').upper(),
+        'coin_name': stat.get('coin_name') or '',
+        'coingecko_id': stat.get('coingecko_id') or '',
+        'price': stat.get('price', 0),
+        'market_cap': stat.get('market_cap', 0),
+        'trading_volume_24h': stat.get('trading_volume_24h', 0),
+        'approved': stat.get('approved', False),
+        'approved_by': stat.get('approved_by') or '',
+        'approved_at': stat.get('approved_at') or '',
+        'rejected': stat.get('rejected', False),
+        'rejection_reason': stat.get('rejection_reason') or '',
+        'created_at': stat.get('created_at') or '',
+        'updated_at': stat.get('updated_at') or ''
+    }
+
 @router.get("/token-stats")
 async def search_token_stats(
     q: str = Query(..., min_length=1, description="Символ или название токена"),
@@ -133,45 +175,34 @@ async def search_token_stats(
     current_user = Depends(get_admin_user)
 ):
     try:
-        token_stats_repo = get_generic_repository("LiberandumAggregationTokenStats")
-        all_stats = token_stats_repo.list_all(limit=1000)
-        
-        query_lower = q.lower().strip()
-        results = []
-        
-        for stat in all_stats:
-            if stat.get('is_deleted', False):
-                continue
+        if not show_all:
+            # Подтвержденные токены - из каталога в памяти, ранжированы по совпадению
+            catalog = await token_catalog.get_snapshot()
+            search_index = await catalog.get_admin_search_index()
+            results = [
+                _token_stats_result(catalog.approved_stats[position])
+                for position, _ in search_index.search(q)
+            ]
+        else:
+            token_stats_repo = get_async_generic_repository("LiberandumAggregationTokenStats")
+            all_stats = await token_stats_repo.list_all(limit=1000, attributes=SEARCH_TOKEN_STATS_ATTRIBUTES)
             
-            if not show_all and not stat.get('approved', False):
-                continue
-                
-            symbol = (stat.get('symbol') or '').lower()
-            coin_name = (stat.get('coin_name') or '').lower()
-            coingecko_id = (stat.get('coingecko_id') or '').lower()
+            query_lower = q.lower().strip()
+            results = []
             
-            if (query_lower in symbol or 
-                query_lower in coin_name or 
-                query_lower in coingecko_id or
-                symbol == query_lower):
+            for stat in all_stats:
+                if stat.get('is_deleted', False):
+                    continue
+                    
+                symbol = (stat.get('symbol') or '').lower()
+                coin_name = (stat.get('coin_name') or '').lower()
+                coingecko_id = (stat.get('coingecko_id') or '').lower()
                 
-                stat_result = {
-                    'id': stat.get('id'),
-                    'symbol': (stat.get('symbol') or '').upper(),
-                    'coin_name': stat.get('coin_name') or '',
-                    'coingecko_id': stat.get('coingecko_id') or '',
-                    'price': stat.get('price', 0),
-                    'market_cap': stat.get('market_cap', 0),
-                    'trading_volume_24h': stat.get('trading_volume_24h', 0),
-                    'approved': stat.get('approved', False),
-                    'approved_by': stat.get('approved_by') or '',
-                    'approved_at': stat.get('approved_at') or '',
-                    'rejected': stat.get('rejected', False),
-                    'rejection_reason': stat.get('rejection_reason') or '',
-                    'created_at': stat.get('created_at') or '',
-                    'updated_at': stat.get('updated_at') or ''
-                }
-                results.append(stat_result)
+                if (query_lower in symbol or 
+                    query_lower in coin_name or 
+                    query_lower in coingecko_id or
+                    symbol == query_lower):
+                    results.append(_token_stats_result(stat))
         
         approved_count = len([r for r in results if r.get('approved', False)])
         pending_count = len([r for r in results if not r.get('approved', False) and not r.get('rejected', False)])
@@ -199,8 +230,8 @@ async def search_exchanges(
     current_user = Depends(get_admin_user)
 ):
     try:
-        exchanges_repo = get_generic_repository("LiberandumAggregationExchanges")
-        all_exchanges = exchanges_repo.list_all(limit=1000)
+        exchanges_repo = get_async_generic_repository("LiberandumAggregationExchanges")
+        all_exchanges = await exchanges_repo.list_all(limit=1000, attributes=SEARCH_EXCHANGE_ATTRIBUTES)
         
         query_lower = q.lower().strip()
         results = []
@@ -246,8 +277,8 @@ async def search_exchange_stats(
     current_user = Depends(get_admin_user)
 ):
     try:
-        exchange_stats_repo = get_generic_repository("LiberandumAggregationExchangesStats")
-        all_stats = exchange_stats_repo.list_all(limit=1000)
+        exchange_stats_repo = get_async_generic_repository("LiberandumAggregationExchangesStats")
+        all_stats = await exchange_stats_repo.list_all(limit=1000, attributes=SEARCH_EXCHANGE_STATS_ATTRIBUTES)
         
         query_lower = q.lower().strip()
         results = []
@@ -292,8 +323,8 @@ async def search_users(
     current_user = Depends(get_admin_user)
 ):
     try:
-        users_repo = get_generic_repository("users")
-        all_users = users_repo.list_all(limit=1000)
+        users_repo = get_async_generic_repository("users")
+        all_users = await users_repo.list_all(limit=1000, attributes=SEARCH_USER_ATTRIBUTES)
         
         query_lower = q.lower().strip()
         results = []
@@ -3,9 +3,10 @@ from typing import Dict, Any, Optional
 
 from app.core.security.security import get_admin_user
 from app.routes.admin.admin_controller import BaseAdminController
+from app.services.market.catalog.token_catalog import token_catalog
 
 router = APIRouter()
-controller = BaseAdminController("LiberandumAggregationTokenStats", "token-stats")
+controller = BaseAdminController("LiberandumAggregationTokenStats", "token-stats", on_change=token_catalog.request_refresh)
 
 @router.post("/")
 async def create_token_stats(stats_data: Dict[str, Any], current_user = Depends(get_admin_user)):
@@ -4,11 +4,12 @@ from decimal import Decimal
 
 from app.core.security.security import get_admin_user
 from app.routes.admin.admin_controller import BaseAdminController
-from app.core.database.connector import get_generic_repository
+from app.core.database.connector import get_async_generic_repository
 from app.routes.admin.addmin_approve_data import router as approval_router
+from app.services.market.catalog.token_catalog import token_catalog
 
 router = APIRouter()
-controller = BaseAdminController("LiberandumAggregationToken", "token")
+controller = BaseAdminController("LiberandumAggregationToken", "token", on_change=token_catalog.request_refresh)
 
 router.include_router(approval_router, tags=["Token Approval"])
 
@@ -44,9 +45,9 @@ async def create_token_from_coingecko(
     try:
         from app.services.admin.coingecko_search_service import coingecko_search_service
         
-        tokens_repo = get_generic_repository("LiberandumAggregationToken")
+        tokens_repo = get_async_generic_repository("LiberandumAggregationToken")
         
-        existing = tokens_repo.find_by_field("coingecko_id", coingecko_id)
+        existing = await tokens_repo.find_by_field("coingecko_id", coingecko_id)
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
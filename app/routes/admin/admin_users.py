@@ -4,6 +4,7 @@ from datetime import datetime
 
 from app.core.security.security import get_admin_user
 from app.core.database.connector import get_generic_repository
+from app.core.database.repositories.async_generic import run_in_db_executor
 from app.core.database.crud.user import update_user_role
 
 router = APIRouter()
@@ -12,7 +13,7 @@ router = APIRouter()
 async def list_users( current_user = Depends(get_admin_user)):
     try:
         repo = get_generic_repository("users")
-        items = repo.scan_items("users")
+        items = await run_in_db_executor(repo.scan_items, "users")
         active_users = [user for user in items if user.get('is_active', True)]
         
         for user in active_users:
@@ -35,7 +36,7 @@ async def list_users( current_user = Depends(get_admin_user)):
 async def get_user_by_admin(user_id: str, current_user = Depends(get_admin_user)):
     try:
         repo = get_generic_repository("users")
-        user = repo.get_by_id(user_id)
+        user = await run_in_db_executor(repo.get_by_id, user_id)
         
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден")
@@ -58,7 +59,7 @@ async def update_user_by_admin(user_id: str, updates: Dict[str, Any], current_us
     try:
         repo = get_generic_repository("users")
         
-        existing_user = repo.get_by_id(user_id)
+        existing_user = await run_in_db_executor(repo.get_by_id, user_id)
         if not existing_user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден")
         
@@ -73,7 +74,7 @@ async def update_user_by_admin(user_id: str, updates: Dict[str, Any], current_us
             'updated_by_admin': current_user['id']
         })
         
-        updated_user = repo.update_by_id(user_id, updates)
+        updated_user = await run_in_db_executor(repo.update_by_id, user_id, updates)
         updated_user.pop('hashed_password', None)
         updated_user.pop('access_token', None)
         updated_user.pop('refresh_token', None)
@@ -101,7 +102,7 @@ async def update_user_role_by_admin(user_id: str, role: str, current_user = Depe
                 detail=f"Недопустимая роль. Доступные: {', '.join(valid_roles)}"
             )
         
-        updated_user = update_user_role(user_id, role)
+        updated_user = await run_in_db_executor(update_user_role, user_id, role)
         if not updated_user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден")
         
@@ -124,7 +125,7 @@ async def deactivate_user_by_admin(user_id: str, current_user = Depends(get_admi
     try:
         repo = get_generic_repository("users")
         
-        existing_user = repo.get_by_id(user_id)
+        existing_user = await run_in_db_executor(repo.get_by_id, user_id)
         if not existing_user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден")
         
@@ -134,7 +135,7 @@ async def deactivate_user_by_admin(user_id: str, current_user = Depends(get_admi
                 detail="Нельзя деактивировать самого себя"
             )
         
-        repo.update_by_id(user_id, {
+        await run_in_db_executor(repo.update_by_id, user_id, {
             'is_active': False,
             'deactivated_at': datetime.now().isoformat(),
             'deactivated_by_admin': current_user['id']
@@ -158,11 +159,11 @@ async def activate_user_by_admin(user_id: str, current_user = Depends(get_admin_
     try:
         repo = get_generic_repository("users")
         
-        existing_user = repo.get_by_id(user_id)
+        existing_user = await run_in_db_executor(repo.get_by_id, user_id)
         if not existing_user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден")
         
-        repo.update_by_id(user_id, {
+        await run_in_db_executor(repo.update_by_id, user_id, {
             'is_active': True,
             'activated_at': datetime.now().isoformat(),
             'activated_by_admin': current_user['id']
@@ -5,7 +5,7 @@ from typing import Dict, Any, Optional, List
 from app.core.security.security import get_admin_user
 from app.routes.admin.admin_controller import BaseAdminController
 from app.schemas.wallte_conductors import WalletCreate, WalletUpdate, WalletResponse
-from app.core.database.connector import get_generic_repository
+from app.core.database.connector import get_async_generic_repository
 
 router = APIRouter()
 controller = BaseAdminController("LiberandumApiWallets", "wallet")
@@ -27,8 +27,8 @@ async def search_wallets(
     current_user = Depends(get_admin_user)
 ):
     try:
-        wallets_repo = get_generic_repository("LiberandumApiWallets")
-        all_wallets = wallets_repo.list_all(limit=1000)
+        wallets_repo = get_async_generic_repository("LiberandumApiWallets")
+        all_wallets = await wallets_repo.list_all(limit=1000)
         
         query_lower = q.lower().strip()
         results = []
@@ -11,6 +11,7 @@ from app.routes.admin.admin_people import router as people_router
 from app.routes.admin.admin_platform import router as platform_router
 from app.routes.admin.admin_wallets import router as wallets_router
 from app.routes.admin.admin_conductor import router as conductors_router
+from app.routes.admin.admin_db_metrics import router as db_metrics_router
 
 router = APIRouter()
 
@@ -26,4 +27,5 @@ router.include_router(people_router, prefix="/people", tags=["Admin People"])
 router.include_router(platform_router, prefix="/platform", tags=["Admin Platform"])
 
 router.include_router(wallets_router, prefix="/wallets", tags=["Admin Wallets"])
-router.include_router(conductors_router, prefix="/conductors", tags=["Admin Conductors"])
\ No newline at end of file
+router.include_router(conductors_router, prefix="/conductors", tags=["Admin Conductors"])
+router.include_router(db_metrics_router, prefix="/db-metrics", tags=["Admin DB Metrics"])
\ No newline at end of file
@@ -1,71 +1,32 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Query, Response
 
 from app.services.market.market_service import market_service
+from app.services.market.catalog.exchange_catalog import exchange_catalog
+from app.services.market.catalog.fields import InvalidFieldsError, parse_fields
+from app.services.market.catalog import fast_json
 from app.schemas.market import ExchangeDetailResponse, ExchangeListResponse, ExchangeResponse, ExchangeHalalStatus
-from app.core.database.connector import get_generic_repository
-from typing import Dict, Any
+from app.core.database.throttling import DynamoDBThrottledError
 
 router = APIRouter()
 
-def from_db_to_api(exchange_stats: Dict[str, Any], exchange: Dict[str, Any] = None, rank: int = 1) -> ExchangeResponse:
-    def safe_float(value, default=0.0):
-        try:
-            if value is None:
-                return default
-            return float(str(value).replace(',', ''))
-        except (ValueError, TypeError):
-            return default
-    
-    def safe_int(value, default=0):
-        try:
-            if value is None:
-                return default
-            return int(float(str(value).replace(',', '')))
-        except (ValueError, TypeError):
-            return default
-    
-    def format_currency(value):
-        if value >= 1_000_000_000:
-            return f"${value / 1_000_000_000:.2f}B"
-        elif value >= 1_000_000:
-            return f"${value / 1_000_000:.2f}M"
-        elif value >= 1_000:
-            return f"${value / 1_000:.2f}K"
-        else:
-            return f"${value:.2f}"
-    
-    volume_24h = safe_float(exchange_stats.get('trading_volume_24h'))
-    reserves = safe_float(exchange_stats.get('reserves'))
-    
-    return ExchangeResponse(
-        rank=rank,
-        id=str(exchange_stats.get('name', 'unknown')).lower().replace(' ', '_'),
-        name=str(exchange_stats.get('name', '')),
-        image=exchange.get('avatar_image', '') if exchange else '',
-        halal_status=ExchangeHalalStatus(
-            is_halal=exchange_stats.get('is_halal'),
-            score=str(exchange_stats.get('halal_score', '')),
-            rating=safe_int(exchange_stats.get('halal_rating'))
-        ),
-        trust_score=safe_int(exchange_stats.get('trust_score')),
-        volume_24h_usd=volume_24h,
-        volume_24h_formatted=format_currency(volume_24h),
-        reserves_usd=reserves,
-        reserves_formatted=format_currency(reserves),
-        trading_pairs_count=safe_int(exchange_stats.get('trading_pairs_count')),
-        visitors_monthly=str(safe_int(exchange_stats.get('visitors_30d', 0))),
-        supported_fiat=exchange_stats.get('list_supported', []),
-        supported_fiat_display=', '.join(exchange_stats.get('list_supported', [])[:3]),
-        volume_chart_7d=exchange_stats.get('inflows_1w', []),
-        exchange_type="centralized"
-    )
-
 @router.get("/", response_model=ExchangeListResponse)
-async def get_exchanges_list():
+async def get_exchanges_list(
+    fields: Optional[str] = Query(default=None, description="Поля биржи через запятую (id возвращается всегда)")
+):
     try:
-        result = market_service.get_exchanges_list()
+        exchange_fields = parse_fields(fields, ExchangeResponse)
+        if exchange_fields:
+            catalog = await exchange_catalog.get_snapshot()
+            return Response(content=fast_json.dumps({'data': catalog.project_list(exchange_fields)}), media_type="application/json")
+        
+        result = await market_service.get_exchanges_list()
         return result
         
+    except DynamoDBThrottledError:
+        raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"[ERROR][Market] - Ошибка получения списка бирж: {e}")
         raise HTTPException(
@@ -79,49 +40,13 @@ async def search_exchanges(
     limit: int = Query(default=20, ge=1, le=100, description="Количество результатов")
 ):
     try:
-        exchanges_repo = get_generic_repository("LiberandumAggregationExchanges")
-        exchange_stats_repo = get_generic_repository("LiberandumAggregationExchangesStats")
-        
-        all_exchanges = exchanges_repo.list_all(limit=500)
-        all_exchange_stats = exchange_stats_repo.list_all(limit=500)
-        
-        stats_by_name = {}
-        for stat in all_exchange_stats:
-            if not stat.get('is_deleted', False):
-                name = stat.get('name', '')
-                if name:
-                    stats_by_name[name] = stat
-        
-        query_lower = q.lower().strip()
-        results = []
-        
-        for exchange in all_exchanges:
-            if exchange.get('is_deleted', False):
-                continue
-                
-            name = exchange.get('name', '').lower()
-            coingecko_id = exchange.get('coingecko_id', '').lower()
-            
-            if (query_lower in name or 
-                query_lower in coingecko_id or
-                name.startswith(query_lower)):
-                
-                exchange_name = exchange.get('name', '')
-                exchange_stats = stats_by_name.get(exchange_name)
-                
-                if exchange_stats:
-                    exchange_response = from_db_to_api(
-                        exchange_stats, 
-                        exchange, 
-                        len(results) + 1
-                    )
-                    results.append(exchange_response)
-            
-            if len(results) >= limit:
-                break
+        catalog = await exchange_catalog.get_snapshot()
+        results = catalog.search(q, limit)
         
         return ExchangeListResponse(data=results)
         
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         print(f"[ERROR][Market] - Ошибка поиска бирж: {e}")
         raise HTTPException(
@@ -132,7 +57,7 @@ async def search_exchanges(
 @router.get("/{exchange_id}", response_model=ExchangeDetailResponse)
 async def get_exchange_detail(exchange_id: str):
     try:
-        result = market_service.get_exchange_detail(exchange_id)
+        result = await market_service.get_exchange_detail(exchange_id)
         
         if not result:
             raise HTTPException(
@@ -164,6 +89,8 @@ async def get_exchange_detail(exchange_id: str):
         
     except HTTPException:
         raise
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         print(f"[ERROR][Market] - Ошибка получения биржи {exchange_id}: {e}")
         raise HTTPException(
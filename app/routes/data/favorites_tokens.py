@@ -9,6 +9,8 @@ from app.core.database.crud.user import (
 from app.core.security.security import get_current_user
 from app.schemas.user import FavoriteTokenRequest, FavoriteTokensResponse
 from app.services.market.market_service import market_service
+from app.core.database.throttling import DynamoDBThrottledError
+from app.core.database.repositories.async_generic import run_in_db_executor
 
 router = APIRouter()
 
@@ -16,12 +18,14 @@ router = APIRouter()
 async def get_user_favorites(current_user = Depends(get_current_user)):
 
     try:
-        favorite_tokens = get_user_favorite_tokens(current_user['id'])
+        favorite_tokens = await run_in_db_executor(get_user_favorite_tokens, current_user['id'])
         
         return FavoriteTokensResponse(
             favorite_tokens=favorite_tokens,
             total_count=len(favorite_tokens)
         )
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -35,14 +39,14 @@ async def add_to_favorites(
 ):
 
     try:
-        token_detail = market_service.get_token_detail(request.token_id)
+        token_detail = await market_service.get_token_detail(request.token_id)
         if not token_detail:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Токен не найден"
             )
         
-        updated_user = add_token_to_favorites(current_user['id'], request.token_id)
+        updated_user = await run_in_db_executor(add_token_to_favorites, current_user['id'], request.token_id)
         if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -56,6 +60,8 @@ async def add_to_favorites(
         }
     except HTTPException:
         raise
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -69,7 +75,7 @@ async def remove_from_favorites(
 ):
 
     try:
-        updated_user = remove_token_from_favorites(current_user['id'], token_id)
+        updated_user = await run_in_db_executor(remove_token_from_favorites, current_user['id'], token_id)
         if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -81,6 +87,8 @@ async def remove_from_favorites(
             "token_id": token_id,
             "favorite_tokens": updated_user.get('favorite_tokens', [])
         }
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -91,7 +99,7 @@ async def remove_from_favorites(
 async def clear_favorites(current_user = Depends(get_current_user)):
 
     try:
-        updated_user = clear_user_favorites(current_user['id'])
+        updated_user = await run_in_db_executor(clear_user_favorites, current_user['id'])
         if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -102,6 +110,8 @@ async def clear_favorites(current_user = Depends(get_current_user)):
             "message": "Избранное очищено",
             "favorite_tokens": []
         }
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -115,12 +125,14 @@ async def check_favorite_status(
 ):
 
     try:
-        is_favorite = is_token_favorite(current_user['id'], token_id)
+        is_favorite = await run_in_db_executor(is_token_favorite, current_user['id'], token_id)
         
         return {
             "token_id": token_id,
             "is_favorite": is_favorite
         }
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -131,7 +143,7 @@ async def check_favorite_status(
 async def get_favorite_tokens_details(current_user = Depends(get_current_user)):
 
     try:
-        favorite_token_ids = get_user_favorite_tokens(current_user['id'])
+        favorite_token_ids = await run_in_db_executor(get_user_favorite_tokens, current_user['id'])
         
         if not favorite_token_ids:
             return {
@@ -141,7 +153,7 @@ async def get_favorite_tokens_details(current_user = Depends(get_current_user)):
         
         token_details = []
         for token_id in favorite_token_ids:
-            token_detail = market_service.get_token_detail(token_id)
+            token_detail = await market_service.get_token_detail(token_id)
             if token_detail:
                 token_details.append(token_detail)
         
@@ -149,6 +161,8 @@ async def get_favorite_tokens_details(current_user = Depends(get_current_user)):
             "favorite_tokens": token_details,
             "total_count": len(token_details)
         }
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
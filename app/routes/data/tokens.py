@@ -1,17 +1,34 @@
-from fastapi import APIRouter, HTTPException, status, Query, Depends
-from typing import Optional, List
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, Dict, Any, Tuple
 from enum import Enum
 
 from app.services.market.market_service import market_service
-from app.schemas.market import RelatedConductor, RelatedSecurityAudit, RelatedWallet, TokenListResponse, TokenDetailResponse, TokenFullStatsResponse, RelatedPerson
+from app.schemas.market import RelatedConductor, RelatedSecurityAudit, RelatedWallet, TokenListResponse, TokenResponse, TokenBatchResponse, TokenDetailResponse, TokenFullStatsResponse, RelatedPerson
 from app.schemas.chart import TokenChartResponse
 from app.services.market.coingecko_service import coingecko_service
-from app.core.database.connector import get_generic_repository
+from app.core.database.connector import get_async_generic_repository
+from app.core.database.repositories.async_generic import run_in_db_executor
+from app.core.database.throttling import DynamoDBThrottledError
+from app.services.market.catalog.cursor import InvalidCursorError
+from app.services.market.catalog.fields import InvalidFieldsError, parse_fields
+from app.services.market.catalog.response_cache import CachedResponse, token_response_cache
+from app.services.market.catalog.token_catalog import token_catalog
 from app.core.security.security import get_current_user_optional
+from app.core.security.config import settings
 from app.core.database.crud.user import get_user_favorite_tokens
 
 router = APIRouter()
 
+FALLBACK_COINGECKO_IDS = {'btc': 'bitcoin', 'eth': 'ethereum'}
+RELATED_PEOPLE_ATTRIBUTES = ['id', 'full_name', 'avatar_image', 'description', 'position', 'related_link', 'is_deleted']
+RELATED_LINK_ATTRIBUTES = ['id', 'title', 'image', 'url', 'is_deleted']
+RELATED_AUDIT_ATTRIBUTES = ['id', 'title', 'auditor_name', 'link', 'audit_score', 'is_deleted']
+RELATED_DATA_FIELDS = ['related_people_data', 'related_wallets_data', 'related_conductors_data', 'related_security_audits_data']
+MAX_BATCH_IDS = 250
+
 class TokenCategory(str, Enum):
     all = "all"
     favorites = "favorites"
@@ -55,38 +72,33 @@ class TimeframeEnum(str, Enum):
     one_year = "1y"
     max = "max"
 
+class SparklineEncoding(str, Enum):
+    full = "full"
+    delta = "delta"
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8"
+}
+
 class Language(str, Enum):
     en = "en"
     ru = "ru"
     uz = "uz"
 
-async def _get_people_data_for_token(related_people_ids: List[str]) -> List[RelatedPerson]:
-    if not related_people_ids:
-        return []
-    
-    try:
-        people_repo = get_generic_repository("LiberandumApiPeople")
-        people_data = []
-        
-        for person_id in related_people_ids:
-            person = people_repo.get_by_id(person_id)
-            if person and not person.get('is_deleted', False):
-                people_data.append(RelatedPerson(
-                    id=person['id'],
-                    full_name=person.get('full_name', ''),
-                    avatar_image=person.get('avatar_image'),
-                    description=person.get('description'),
-                    position=person.get('position'),
-                    related_link=person.get('related_link')
-                ))
-        
-        return people_data
-    except Exception as e:
-        print(f"[ERROR] Failed to get people data: {e}")
-        return []
+def _cached_response(cached: CachedResponse, request: Request) -> Response:
+    if_none_match = request.headers.get("if-none-match", "")
+    if cached.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": cached.etag})
+    return Response(content=cached.body, media_type="application/json", headers={"ETag": cached.etag})
 
 @router.get("/", response_model=TokenListResponse)
 async def get_tokens_list(
+    request: Request,
     page: int = Query(default=1, ge=1, description="Номер страницы"),
     limit: int = Query(default=100, ge=1, le=250, description="Элементов на странице"),
     category: TokenCategory = Query(default=TokenCategory.all, description="Категория токенов"),
@@ -102,12 +114,41 @@ async def get_tokens_list(
     price_change_24h_max: Optional[float] = Query(default=None, description="Максимальное изменение цены за 24ч (%)"),
     halal_only: bool = Query(default=False, description="Только халяльные токены"),
     favorites_only: bool = Query(default=False, description="Только избранные токены"),
+    cursor: Optional[str] = Query(default=None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    include_total: bool = Query(default=True, description="Считать total_items и total_pages"),
+    sparkline_points: Optional[int] = Query(default=None, ge=2, le=500, description="Число точек графика (LTTB), по умолчанию - все"),
+    sparkline_encoding: SparklineEncoding = Query(default=SparklineEncoding.full, description="Формат графика: full или delta"),
+    fields: Optional[str] = Query(default=None, description="Поля токена через запятую (id возвращается всегда)"),
     current_user = Depends(get_current_user_optional)
 ):
     try:
+        token_fields = parse_fields(fields, TokenResponse)
+        uses_favorites = favorites_only or sort_by == SortBy.favorites or category == TokenCategory.favorites
+        
+        # Один снимок на запрос: по его версии ключ кэша и ETag, из него же строится страница
+        catalog = await token_catalog.get_snapshot()
+        
+        # Без избранного ответ одинаков для всех пользователей - кэшируем по запросу и версии каталога
+        cache_key = None
+        if not uses_favorites:
+            cache_key = token_response_cache.make_key(
+                "tokens", catalog.version,
+                page=page, limit=limit, category=category, sort_by=sort_by, sort_order=sort_order,
+                min_market_cap=min_market_cap, max_market_cap=max_market_cap,
+                min_price=min_price, max_price=max_price,
+                min_volume=min_volume, max_volume=max_volume,
+                price_change_24h_min=price_change_24h_min, price_change_24h_max=price_change_24h_max,
+                halal_only=halal_only, cursor=cursor, include_total=include_total,
+                sparkline_points=sparkline_points, sparkline_encoding=sparkline_encoding,
+                fields=token_fields
+            )
+            cached = token_response_cache.get(cache_key)
+            if cached:
+                return _cached_response(cached, request)
+        
         user_favorites = []
-        if current_user and (favorites_only or sort_by == SortBy.favorites or category == TokenCategory.favorites):
-            user_favorites = get_user_favorite_tokens(current_user['id'])
+        if current_user and uses_favorites:
+            user_favorites = await run_in_db_executor(get_user_favorite_tokens, current_user['id'])
             
             if (favorites_only or category == TokenCategory.favorites) and not user_favorites:
                 return TokenListResponse(
@@ -120,7 +161,7 @@ async def get_tokens_list(
                     }
                 )
         
-        result = market_service.get_tokens_list_enhanced(
+        result = await market_service.get_tokens_list_page(
             page=page, 
             limit=limit, 
             category=category.value,
@@ -136,11 +177,25 @@ async def get_tokens_list(
             price_change_24h_max=price_change_24h_max,
             halal_only=halal_only,
             favorites_only=favorites_only or category == TokenCategory.favorites,
-            user_favorites=user_favorites
+            user_favorites=user_favorites,
+            cursor=cursor,
+            include_total=include_total,
+            sparkline_points=sparkline_points,
+            sparkline_encoding=sparkline_encoding.value,
+            fields=token_fields,
+            catalog=catalog
         )
         
-        return result
+        body = market_service.render_page(result)
+        # Пустые ответы не кэшируем - так же выглядит и ответ сервиса при ошибке
+        if cache_key and result.positions:
+            return _cached_response(token_response_cache.put(cache_key, body, result.ids), request)
+        return Response(content=body, media_type="application/json")
         
+    except DynamoDBThrottledError:
+        raise
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"[ERROR][Market] - Ошибка получения списка токенов: {e}")
         raise HTTPException(
@@ -150,29 +205,64 @@ async def get_tokens_list(
 
 @router.get("/search", response_model=TokenListResponse)
 async def search_tokens(
+    request: Request,
     q: str = Query(..., min_length=1, description="Название или символ токена"),
     limit: int = Query(default=20, ge=1, le=100, description="Количество результатов"),
     category: TokenCategory = Query(default=TokenCategory.all, description="Фильтр по категории"),
-    sort_by: SortBy = Query(default=SortBy.market_cap, description="Тип сортировки результатов"),
+    sort_by: Optional[SortBy] = Query(default=None, description="Тип сортировки результатов (по умолчанию - по релевантности)"),
     halal_only: bool = Query(default=False, description="Только халяльные токены"),
+    cursor: Optional[str] = Query(default=None, description="Курсор следующей страницы результатов"),
+    sparkline_points: Optional[int] = Query(default=None, ge=2, le=500, description="Число точек графика (LTTB), по умолчанию - все"),
+    sparkline_encoding: SparklineEncoding = Query(default=SparklineEncoding.full, description="Формат графика: full или delta"),
+    fields: Optional[str] = Query(default=None, description="Поля токена через запятую (id возвращается всегда)"),
     current_user = Depends(get_current_user_optional)
 ):
     try:
+        token_fields = parse_fields(fields, TokenResponse)
+        catalog = await token_catalog.get_snapshot()
+        cache_key = None
+        cached = None
+        if sort_by != SortBy.favorites and category != TokenCategory.favorites:
+            cache_key = token_response_cache.make_key(
+                "search", catalog.version,
+                q=q.lower().strip(), limit=limit, category=category, sort_by=sort_by,
+                halal_only=halal_only, cursor=cursor,
+                sparkline_points=sparkline_points, sparkline_encoding=sparkline_encoding,
+                fields=token_fields
+            )
+            cached = token_response_cache.get(cache_key)
+        
         user_favorites = []
         if current_user:
-            user_favorites = get_user_favorite_tokens(current_user['id'])
+            user_favorites = await run_in_db_executor(get_user_favorite_tokens, current_user['id'])
+        
+        # Общий ответ подходит, если среди найденных нет избранных токенов пользователя
+        if cached and not set(user_favorites) & set(cached.ids):
+            return _cached_response(cached, request)
         
-        result = market_service.search_tokens_enhanced(
+        result = await market_service.search_tokens_page(
             query=q,
             limit=limit,
             category=category.value,
-            sort_by=sort_by.value,
+            sort_by=sort_by.value if sort_by else None,
             halal_only=halal_only,
-            user_favorites=user_favorites
+            user_favorites=user_favorites,
+            cursor=cursor,
+            sparkline_points=sparkline_points,
+            sparkline_encoding=sparkline_encoding.value,
+            fields=token_fields,
+            catalog=catalog
         )
         
-        return result
+        body = market_service.render_page(result)
+        if cache_key and result.positions and not result.has_favorites:
+            return _cached_response(token_response_cache.put(cache_key, body, result.ids), request)
+        return Response(content=body, media_type="application/json")
         
+    except DynamoDBThrottledError:
+        raise
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"[ERROR][Market] - Ошибка поиска токенов: {e}")
         raise HTTPException(
@@ -180,10 +270,161 @@ async def search_tokens(
             detail="Ошибка поиска токенов"
         )
 
+@router.get("/export")
+async def export_tokens(
+    format: ExportFormat = Query(default=ExportFormat.ndjson, description="Формат выгрузки: ndjson или csv"),
+    category: TokenCategory = Query(default=TokenCategory.all, description="Категория токенов"),
+    sort_by: SortBy = Query(default=SortBy.market_cap, description="Поле для сортировки"),
+    sort_order: SortOrder = Query(default=SortOrder.desc, description="Порядок сортировки"),
+    min_market_cap: Optional[float] = Query(default=None, description="Минимальная рыночная капитализация"),
+    max_market_cap: Optional[float] = Query(default=None, description="Максимальная рыночная капитализация"),
+    min_price: Optional[float] = Query(default=None, description="Минимальная цена"),
+    max_price: Optional[float] = Query(default=None, description="Максимальная цена"),
+    min_volume: Optional[float] = Query(default=None, description="Минимальный объем торгов 24ч"),
+    max_volume: Optional[float] = Query(default=None, description="Максимальный объем торгов 24ч"),
+    price_change_24h_min: Optional[float] = Query(default=None, description="Минимальное изменение цены за 24ч (%)"),
+    price_change_24h_max: Optional[float] = Query(default=None, description="Максимальное изменение цены за 24ч (%)"),
+    halal_only: bool = Query(default=False, description="Только халяльные токены"),
+    favorites_only: bool = Query(default=False, description="Только избранные токены"),
+    updated_since: Optional[datetime] = Query(default=None, description="Только токены, обновленные не раньше (ISO 8601, без зоны - UTC)"),
+    current_user = Depends(get_current_user_optional)
+):
+    try:
+        user_favorites = []
+        if current_user:
+            user_favorites = await run_in_db_executor(get_user_favorite_tokens, current_user['id'])
+        
+        export = await market_service.get_tokens_export(
+            category=category.value,
+            sort_by=sort_by.value,
+            sort_order=sort_order.value,
+            updated_since=updated_since,
+            favorites_only=favorites_only or category == TokenCategory.favorites,
+            user_favorites=user_favorites,
+            min_market_cap=min_market_cap,
+            max_market_cap=max_market_cap,
+            min_price=min_price,
+            max_price=max_price,
+            min_volume=min_volume,
+            max_volume=max_volume,
+            price_change_24h_min=price_change_24h_min,
+            price_change_24h_max=price_change_24h_max,
+            halal_only=halal_only
+        )
+        
+        return StreamingResponse(
+            market_service.iter_export(export, format.value),
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers={
+                "Content-Disposition": f'attachment; filename="tokens.{format.value}"',
+                "X-Catalog-Version": str(export.catalog.version),
+                "X-Total-Count": str(len(export.positions))
+            }
+        )
+        
+    except DynamoDBThrottledError:
+        raise
+    except Exception as e:
+        print(f"[ERROR][Market] - Ошибка выгрузки токенов: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка выгрузки токенов"
+        )
+
+@router.get("/batch", response_model=TokenBatchResponse)
+async def get_tokens_batch(
+    response: Response,
+    ids: str = Query(..., min_length=1, description=f"id токенов через запятую (до {MAX_BATCH_IDS})"),
+    detail: bool = Query(default=False, description="Полные данные токенов вместо компактных строк"),
+    lang: Language = Query(default=Language.en, description="Язык отображения (для detail=true)"),
+    fields: Optional[str] = Query(default=None, description="Поля компактных строк через запятую (id возвращается всегда)"),
+    current_user = Depends(get_current_user_optional)
+):
+    token_ids = list(dict.fromkeys(token_id.strip() for token_id in ids.split(',') if token_id.strip()))
+    if len(token_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Не больше {MAX_BATCH_IDS} id за запрос"
+        )
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.TOKEN_DETAIL_DEADLINE_SECONDS
+    
+    # Одно чтение избранного на весь пакет
+    favorites_task = None
+    if current_user:
+        favorites_task = asyncio.ensure_future(run_in_db_executor(get_user_favorite_tokens, current_user['id']))
+    
+    try:
+        if not detail:
+            token_fields = parse_fields(fields, TokenResponse)
+            user_favorites = await favorites_task if favorites_task else []
+            favorites_task = None
+            
+            page, not_found = await market_service.get_tokens_batch(token_ids, user_favorites, token_fields)
+            return Response(content=market_service.render_batch(page, not_found), media_type="application/json")
+        
+        results = []
+        not_found = []
+        seen = set()
+        for token_id in token_ids:
+            result = await market_service.get_token_detail(token_id, lang.value)
+            if not result:
+                not_found.append(token_id)
+            elif result.id not in seen:
+                seen.add(result.id)
+                results.append((token_id, result, _related_ids(result.additional_info)))
+        
+        # Связанные сущности всех токенов - одним batch_get на таблицу
+        merged_ids = {
+            field: list(dict.fromkeys(related_id for _, _, related in results for related_id in related[field]))
+            for field in RELATED_DATA_FIELDS
+        }
+        fetches = _related_fetches(merged_ids)
+        if favorites_task:
+            fetches['favorites'] = favorites_task
+        
+        fetched, timed_out = await _gather_until(fetches, deadline - loop.time())
+        favorites_task = None
+        
+        favorites = set(fetched.get('favorites', []))
+        items_by_id = {
+            field: {item.id: item for item in fetched.get(field, [])}
+            for field in RELATED_DATA_FIELDS
+        }
+        for token_id, result, related in results:
+            result.is_favorite = token_id in favorites or result.id in favorites
+            for field in RELATED_DATA_FIELDS:
+                setattr(result, field, [
+                    items_by_id[field][related_id]
+                    for related_id in dict.fromkeys(related[field])
+                    if related_id in items_by_id[field]
+                ])
+        
+        if timed_out:
+            print(f"[WARNING][Market] - Пакет токенов: не загружено за дедлайн {', '.join(timed_out)}")
+            response.headers["X-Partial-Content"] = ",".join(timed_out)
+        
+        return TokenBatchResponse(data=[result for _, result, _ in results], not_found=not_found)
+        
+    except DynamoDBThrottledError:
+        raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        print(f"[ERROR][Market] - Ошибка пакетного получения токенов: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка получения информации о токенах"
+        )
+    finally:
+        if favorites_task and not favorites_task.done():
+            favorites_task.cancel()
+
 @router.get("/{token_id}/stats", response_model=TokenFullStatsResponse)
 async def get_token_full_stats(token_id: str):
     try:
-        result = market_service.get_token_full_stats(token_id)
+        result = await market_service.get_token_full_stats(token_id)
         
         if not result:
             raise HTTPException(
@@ -195,6 +436,8 @@ async def get_token_full_stats(token_id: str):
         
     except HTTPException:
         raise
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         print(f"[ERROR][Market] - Ошибка получения полной статистики токена {token_id}: {e}")
         raise HTTPException(
@@ -205,12 +448,21 @@ async def get_token_full_stats(token_id: str):
 @router.get("/{token_id}", response_model=TokenDetailResponse)
 async def get_token_detail(
     token_id: str,
+    response: Response,
     lang: Language = Query(default=Language.en, description="Язык отображения"),
     current_user = Depends(get_current_user_optional)
 ):
 
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.TOKEN_DETAIL_DEADLINE_SECONDS
+    
+    # Избранное не зависит от токена - запрашиваем параллельно с поиском токена
+    favorites_task = None
+    if current_user:
+        favorites_task = asyncio.ensure_future(run_in_db_executor(get_user_favorite_tokens, current_user['id']))
+    
     try:
-        result = market_service.get_token_detail(token_id, lang.value)
+        result = await market_service.get_token_detail(token_id, lang.value)
         
         if not result:
             raise HTTPException(
@@ -218,56 +470,41 @@ async def get_token_detail(
                 detail="Токен не найден"
             )
         
-
-        if current_user:
-            user_favorites = get_user_favorite_tokens(current_user['id'])
-            result.is_favorite = token_id in user_favorites
+        fetches = {}
+        if favorites_task:
+            fetches['favorites'] = favorites_task
         
-
         if result.additional_info:
-
-            related_people_ids = result.additional_info.related_people if result.additional_info.related_people else []
-            people_data = await _get_people_data_for_token(related_people_ids)
-            result.related_people_data = people_data
-            
-
-            related_wallet_ids = []
-            if hasattr(result.additional_info, 'related_wallets') and result.additional_info.related_wallets:
-                related_wallet_ids = result.additional_info.related_wallets
-            elif result.additional_info and 'related_wallets_data' in result.additional_info.__dict__:
-                related_wallet_ids = result.additional_info.related_wallets_data or []
-            wallets_data = await _get_wallets_data_for_token(related_wallet_ids)
-            result.related_wallets_data = wallets_data
-            
-
-            related_conductor_ids = []
-            if hasattr(result.additional_info, 'related_conductors') and result.additional_info.related_conductors:
-                related_conductor_ids = result.additional_info.related_conductors
-            elif result.additional_info and 'related_conductors_data' in result.additional_info.__dict__:
-                related_conductor_ids = result.additional_info.related_conductors_data or []
-            conductors_data = await _get_conductors_data_for_token(related_conductor_ids)
-            result.related_conductors_data = conductors_data
-            
-            security_audit_ids = result.additional_info.security_audits if result.additional_info.security_audits else []
-            audits_data = await _get_security_audits_data_for_token(security_audit_ids)
-            result.related_security_audits_data = audits_data
-        else:
-
-            result.related_people_data = []
-            result.related_wallets_data = []
-            result.related_conductors_data = []
-            result.related_security_audits_data = []
+            fetches.update(_related_fetches(_related_ids(result.additional_info)))
+        
+        fetched, timed_out = await _gather_until(fetches, deadline - loop.time())
+        favorites_task = None
+        
+        result.is_favorite = token_id in fetched.get('favorites', [])
+        result.related_people_data = fetched.get('related_people_data', [])
+        result.related_wallets_data = fetched.get('related_wallets_data', [])
+        result.related_conductors_data = fetched.get('related_conductors_data', [])
+        result.related_security_audits_data = fetched.get('related_security_audits_data', [])
+        
+        if timed_out:
+            print(f"[WARNING][Market] - Токен {token_id}: не загружено за дедлайн {', '.join(timed_out)}")
+            response.headers["X-Partial-Content"] = ",".join(timed_out)
         
         return result
         
     except HTTPException:
         raise
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         print(f"[ERROR][Market] - Ошибка получения токена {token_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Ошибка получения информации о токене"
         )
+    finally:
+        if favorites_task and not favorites_task.done():
+            favorites_task.cancel()
     
 
 @router.get("/{token_id}/chart", response_model=TokenChartResponse)
@@ -277,7 +514,7 @@ async def get_token_chart(
     currency: str = Query("usd", description="Currency for price data"),
 ):
     try:
-        coingecko_id = _resolve_coingecko_id(token_id)
+        coingecko_id = await _resolve_coingecko_id(token_id)
         
         chart_data = await coingecko_service.get_token_chart_data(
             token_id=coingecko_id,
@@ -295,6 +532,8 @@ async def get_token_chart(
         
     except HTTPException:
         raise
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         print(f"Error getting chart for token {token_id}: {e}")
         raise HTTPException(
@@ -302,32 +541,79 @@ async def get_token_chart(
             detail="Internal server error while fetching chart data"
         )
 
-def _resolve_coingecko_id(token_id: str) -> str:
-    token_stats_repo = market_service._get_repository(market_service.token_stats_table)
+async def _resolve_coingecko_id(token_id: str) -> str:
+    catalog = await token_catalog.get_snapshot()
+    token_stats = catalog.resolve(token_id)
+    if token_stats and token_stats.get('coingecko_id'):
+        return token_stats['coingecko_id']
+    # Токена нет в каталоге - пробуем как есть, BTC/ETH знаем и без него
+    return FALLBACK_COINGECKO_IDS.get(token_id.lower(), token_id.lower())
+
+
+
+async def _gather_until(fetches: Dict[str, Any], timeout: float) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Запускает независимые загрузки одновременно и ждет их не дольше timeout.
+    Возвращает результаты успевших и имена не успевших или упавших (в том числе
+    из-за throttling) - ответ тогда частичный, а не ошибка целиком.
+    """
+    tasks = {name: asyncio.ensure_future(fetch) for name, fetch in fetches.items()}
+    results = {}
+    timed_out = []
+    try:
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=max(timeout, 0))
+        
+        for name, task in tasks.items():
+            if not task.done():
+                timed_out.append(name)
+            elif task.cancelled():
+                timed_out.append(name)
+            elif task.exception() is not None:
+                print(f"[WARNING][Market] - Загрузка {name} завершилась ошибкой: {task.exception()}")
+                timed_out.append(name)
+            else:
+                results[name] = task.result()
+        return results, timed_out
+    finally:
+        for task in tasks.values():
+            if not task.done():
+                task.cancel()
+
+def _related_ids(additional_info) -> Dict[str, List[str]]:
+    if not additional_info:
+        return {field: [] for field in RELATED_DATA_FIELDS}
     
-    coingecko_id = token_id.lower()
-    if token_id.upper() == "BTC":
-        coingecko_id = "bitcoin"
-    elif token_id.upper() == "ETH":
-        coingecko_id = "ethereum"
-    elif token_id.lower() == "bitcoin":
-        coingecko_id = "bitcoin"
-    else:
-        token_stats_results = token_stats_repo.find_by_field('symbol', token_id.upper())
-        if token_stats_results:
-            unique_stats = market_service._remove_duplicates_by_symbol(token_stats_results)
-            if unique_stats:
-                coingecko_id = unique_stats[0].get('coingecko_id', token_id.lower())
-        else:
-            token_stats_results = token_stats_repo.find_by_field('coingecko_id', token_id.lower())
-            if token_stats_results:
-                unique_stats = market_service._remove_duplicates_by_symbol(token_stats_results)
-                if unique_stats:
-                    coingecko_id = unique_stats[0].get('coingecko_id', token_id.lower())
+    related_people_ids = additional_info.related_people if additional_info.related_people else []
     
-    return coingecko_id
-
+    related_wallet_ids = []
+    if hasattr(additional_info, 'related_wallets') and additional_info.related_wallets:
+        related_wallet_ids = additional_info.related_wallets
+    elif 'related_wallets_data' in additional_info.__dict__:
+        related_wallet_ids = additional_info.related_wallets_data or []
+    
+    related_conductor_ids = []
+    if hasattr(additional_info, 'related_conductors') and additional_info.related_conductors:
+        related_conductor_ids = additional_info.related_conductors
+    elif 'related_conductors_data' in additional_info.__dict__:
+        related_conductor_ids = additional_info.related_conductors_data or []
+    
+    security_audit_ids = additional_info.security_audits if additional_info.security_audits else []
+    
+    return {
+        'related_people_data': related_people_ids,
+        'related_wallets_data': related_wallet_ids,
+        'related_conductors_data': related_conductor_ids,
+        'related_security_audits_data': security_audit_ids
+    }
 
+def _related_fetches(ids_by_field: Dict[str, List[str]]) -> Dict[str, Any]:
+    return {
+        'related_people_data': _get_people_data_for_token(ids_by_field['related_people_data']),
+        'related_wallets_data': _get_wallets_data_for_token(ids_by_field['related_wallets_data']),
+        'related_conductors_data': _get_conductors_data_for_token(ids_by_field['related_conductors_data']),
+        'related_security_audits_data': _get_security_audits_data_for_token(ids_by_field['related_security_audits_data'])
+    }
 
 async def _get_people_data_for_token(related_people_ids: List[str]) -> List[RelatedPerson]:
 
@@ -335,12 +621,11 @@ async def _get_people_data_for_token(related_people_ids: List[str]) -> List[Rela
         return []
     
     try:
-        people_repo = get_generic_repository("LiberandumApiPeople")
+        people_repo = get_async_generic_repository("LiberandumApiPeople")
         people_data = []
         
-        for person_id in related_people_ids:
-            person = people_repo.get_by_id(person_id)
-            if person and not person.get('is_deleted', False):
+        for person in await people_repo.batch_get(related_people_ids, RELATED_PEOPLE_ATTRIBUTES):
+            if not person.get('is_deleted', False):
                 people_data.append(RelatedPerson(
                     id=person['id'],
                     full_name=person.get('full_name', ''),
@@ -351,6 +636,8 @@ async def _get_people_data_for_token(related_people_ids: List[str]) -> List[Rela
                 ))
         
         return people_data
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         print(f"[ERROR] Failed to get people data: {e}")
         return []
@@ -361,12 +648,11 @@ async def _get_wallets_data_for_token(related_wallet_ids: List[str]) -> List[Rel
         return []
     
     try:
-        wallets_repo = get_generic_repository("LiberandumApiWallets")
+        wallets_repo = get_async_generic_repository("LiberandumApiWallets")
         wallets_data = []
         
-        for wallet_id in related_wallet_ids:
-            wallet = wallets_repo.get_by_id(wallet_id)
-            if wallet and not wallet.get('is_deleted', False):
+        for wallet in await wallets_repo.batch_get(related_wallet_ids, RELATED_LINK_ATTRIBUTES):
+            if not wallet.get('is_deleted', False):
                 wallets_data.append(RelatedWallet(
                     id=wallet['id'],
                     title=wallet.get('title', ''),
@@ -375,6 +661,8 @@ async def _get_wallets_data_for_token(related_wallet_ids: List[str]) -> List[Rel
                 ))
         
         return wallets_data
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         print(f"[ERROR] Failed to get wallets data: {e}")
         return []
@@ -385,12 +673,11 @@ async def _get_conductors_data_for_token(related_conductor_ids: List[str]) -> Li
         return []
     
     try:
-        conductors_repo = get_generic_repository("LiberandumApiConductors")
+        conductors_repo = get_async_generic_repository("LiberandumApiConductors")
         conductors_data = []
         
-        for conductor_id in related_conductor_ids:
-            conductor = conductors_repo.get_by_id(conductor_id)
-            if conductor and not conductor.get('is_deleted', False):
+        for conductor in await conductors_repo.batch_get(related_conductor_ids, RELATED_LINK_ATTRIBUTES):
+            if not conductor.get('is_deleted', False):
                 conductors_data.append(RelatedConductor(
                     id=conductor['id'],
                     title=conductor.get('title', ''),
@@ -399,6 +686,8 @@ async def _get_conductors_data_for_token(related_conductor_ids: List[str]) -> Li
                 ))
         
         return conductors_data
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         print(f"[ERROR] Failed to get conductors data: {e}")
         return []
@@ -409,12 +698,11 @@ async def _get_security_audits_data_for_token(security_audit_ids: List[str]) ->
         return []
     
     try:
-        audits_repo = get_generic_repository("LiberandumApiSecurityAudit")
+        audits_repo = get_async_generic_repository("LiberandumApiSecurityAudit")
         audits_data = []
         
-        for audit_id in security_audit_ids:
-            audit = audits_repo.get_by_id(audit_id)
-            if audit and not audit.get('is_deleted', False):
+        for audit in await audits_repo.batch_get(security_audit_ids, RELATED_AUDIT_ATTRIBUTES):
+            if not audit.get('is_deleted', False):
                 audits_data.append(RelatedSecurityAudit(
                     id=audit['id'],
                     title=audit.get('title', ''),
@@ -424,6 +712,8 @@ async def _get_security_audits_data_for_token(security_audit_ids: List[str]) ->
                 ))
         
         return audits_data
+    except DynamoDBThrottledError:
+        raise
     except Exception as e:
         print(f"[ERROR] Failed to get security audits data: {e}")
         return []
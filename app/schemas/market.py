@@ -2,8 +2,17 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any, Union
 from decimal import Decimal
 
+from app.core.categories import get_token_category
+
+class SparklineDelta(BaseModel):
+    # price[i] = base + step * (values[0] + ... + values[i])
+    base: float
+    step: float
+    values: List[int] = Field(default_factory=list)
+
 class TokenSparkline(BaseModel):
     price: List[float] = Field(default_factory=list)
+    delta: Optional[SparklineDelta] = None
 
 
 class TokenResponse(BaseModel):
@@ -193,13 +202,20 @@ class TokenDetailResponse(BaseModel):
 
 class Pagination(BaseModel):
     current_page: int = 1
-    total_pages: int = 0
-    total_items: int = 0
+    # None, если запрошено include_total=false
+    total_pages: Optional[int] = 0
+    total_items: Optional[int] = 0
     items_per_page: int = 100
 
 class TokenListResponse(BaseModel):
     data: List[TokenResponse] = Field(default_factory=list)
     pagination: Pagination = Field(default_factory=Pagination)
+    next_cursor: Optional[str] = None
+
+class TokenBatchResponse(BaseModel):
+    # Компактные строки TokenResponse или, при detail=true, полные TokenDetailResponse
+    data: List[Union[TokenDetailResponse, TokenResponse]] = Field(default_factory=list)
+    not_found: List[str] = Field(default_factory=list)
 
 class TokenFilters(BaseModel):
     category: Optional[str] = None
@@ -322,23 +338,7 @@ class TokenDataConverter(BaseModel):
         if not isinstance(sparkline_data, list):
             sparkline_data = []
         
-        symbol = str(token_stats.get('symbol', '')).upper()
-        name = str(token_stats.get('coin_name', '')).lower()
-        
-        token_category = token_stats.get('token_category') or (token.get('token_category') if token else None)
-        if not token_category:
-            if symbol in ['USDT', 'USDC', 'DAI', 'BUSD', 'FRAX', 'TUSD']:
-                token_category = "stablecoin"
-            elif symbol in ['BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'AVAX', 'MATIC', 'DOT', 'ATOM']:
-                token_category = "layer1"
-            elif 'layer' in name or 'l2' in name:
-                token_category = "layer2"
-            elif any(word in name for word in ['defi', 'swap', 'finance', 'lending']):
-                token_category = "defi"
-            elif any(word in name for word in ['meme', 'doge', 'shib', 'pepe']):
-                token_category = "meme"
-            else:
-                token_category = "other"
+        token_category = get_token_category(token_stats, token)
         
         return TokenResponse(
             id=token_stats.get('coingecko_id', token_stats.get('symbol', 'unknown')),
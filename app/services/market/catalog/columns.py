@@ -0,0 +1,122 @@
+import numpy as np
+from datetime import datetime, timezone
+from typing import List, Optional, Dict, Any, Iterable
+
+from app.core.categories import category_code, UNKNOWN_CATEGORY_CODE
+
+def to_float(value, default=0.0):
+    try:
+        return float(str(value or 0).replace(',', ''))
+    except:
+        return default
+
+def to_int(value, default=0):
+    try:
+        return int(float(str(value or 0).replace(',', '')))
+    except:
+        return default
+
+def to_bool(value, default=False):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 'yes')
+    return bool(value)
+
+def to_timestamp(value, default=float('nan')):
+    """
+    updated_at в секундах UTC: ISO-строка (без зоны - UTC) или число миллисекунд/секунд.
+    """
+    if value is None or value == '':
+        return default
+    if isinstance(value, (int, float)) or str(value).replace('.', '', 1).isdigit():
+        number = float(value)
+        return number / 1000 if number > 1e11 else number
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return default
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def token_id_of(stat: Dict[str, Any]) -> str:
+    return str(stat.get('coingecko_id') or stat.get('symbol') or '').lower()
+
+class TokenColumns:
+    """
+    Типизированные колонки каталога: строки разбираются один раз на версию снимка,
+    фильтры скринера собираются в векторные булевы маски.
+    Индекс строки совпадает с позицией в snapshot.stats.
+    """
+    def __init__(self, stats: List[Dict[str, Any]], categories: List[str]):
+        self.size = len(stats)
+        self.price = np.array([to_float(stat.get('price')) for stat in stats], dtype=np.float64)
+        self.market_cap = np.array([to_float(stat.get('market_cap')) for stat in stats], dtype=np.float64)
+        self.volume = np.array([to_float(stat.get('trading_volume_24h')) for stat in stats], dtype=np.float64)
+        # Как и в сортировке, "изменение за 24h" берется из volume_24h_change_24h
+        self.price_change_24h = np.array([to_float(stat.get('volume_24h_change_24h')) for stat in stats], dtype=np.float64)
+        self.halal = np.array([to_bool(stat.get('is_halal')) for stat in stats], dtype=bool)
+        self.approved = np.array([to_bool(stat.get('approved')) for stat in stats], dtype=bool)
+        self.category = np.array([category_code(category) for category in categories], dtype=np.int8)
+        self.updated_at = np.array([to_timestamp(stat.get('updated_at')) for stat in stats], dtype=np.float64)
+
+        self.position_by_id: Dict[str, int] = {}
+        for position, stat in enumerate(stats):
+            self.position_by_id.setdefault(token_id_of(stat), position)
+
+    def favorites_mask(self, user_favorites: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        positions = [self.position_by_id[token_id] for token_id in set(user_favorites or []) if token_id in self.position_by_id]
+        if positions:
+            mask[positions] = True
+        return mask
+
+    def mask(
+        self,
+        category: str = "all",
+        min_market_cap: Optional[float] = None,
+        max_market_cap: Optional[float] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_volume: Optional[float] = None,
+        max_volume: Optional[float] = None,
+        price_change_24h_min: Optional[float] = None,
+        price_change_24h_max: Optional[float] = None,
+        halal_only: bool = False,
+        favorites_only: bool = False,
+        user_favorites: Iterable[str] = None,
+        updated_since: Optional[float] = None
+    ) -> np.ndarray:
+        mask = self.approved.copy()
+
+        if category == "favorites" or favorites_only:
+            mask &= self.favorites_mask(user_favorites)
+        if category not in ("all", "favorites"):
+            code = category_code(category)
+            if code == UNKNOWN_CATEGORY_CODE:
+                mask[:] = False
+            else:
+                mask &= self.category == code
+
+        # Сравнения через отрицание - NaN, как и раньше, не отсеивается границами
+        for column, low, high in (
+            (self.market_cap, min_market_cap, max_market_cap),
+            (self.price, min_price, max_price),
+            (self.volume, min_volume, max_volume),
+            (self.price_change_24h, price_change_24h_min, price_change_24h_max),
+        ):
+            if low is not None:
+                mask &= ~(column < low)
+            if high is not None:
+                mask &= ~(column > high)
+
+        if halal_only:
+            mask &= self.halal
+        # Для выгрузки по водяной метке записи без updated_at не попадают
+        if updated_since is not None:
+            mask &= self.updated_at >= updated_since
+
+        return mask
@@ -0,0 +1,34 @@
+import base64
+import json
+from typing import Dict, Any, Optional
+
+class InvalidCursorError(ValueError):
+    pass
+
+def encode_cursor(version: int, sort_by: str, sort_order: str, last_id: str, sort_value: Any = None) -> str:
+    """
+    Непрозрачный курсор: версия каталога, ключ сортировки, id последнего токена страницы
+    и его значение сортировки - по нему продолжаем, если каталог успели пересобрать.
+    """
+    payload = {'v': version, 's': sort_by, 'o': sort_order, 'id': last_id}
+    if sort_value is not None:
+        payload['k'] = sort_value
+    payload = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        last_id = str(payload['id'])
+        sort_matches = payload['s'] == sort_by and payload['o'] == sort_order
+    except Exception:
+        raise InvalidCursorError("Некорректный курсор")
+
+    if not sort_matches:
+        raise InvalidCursorError("Курсор получен для другой сортировки")
+    # Составные ключи (halal, по умолчанию) в JSON становятся списками
+    sort_value: Optional[Any] = payload.get('k')
+    if isinstance(sort_value, list):
+        sort_value = tuple(sort_value)
+    return {'version': payload.get('v'), 'last_id': last_id, 'sort_value': sort_value}
@@ -0,0 +1,285 @@
+import asyncio
+import bisect
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple
+
+from app.core.database.connector import get_async_generic_repository
+from app.core.database.metrics import measure_read_capacity
+from app.core.database.throttling import paced_interval, throttle_wait
+from app.core.security.config import settings
+from app.schemas.market import ExchangeResponse, ExchangeHalalStatus
+from .columns import to_float, to_int
+
+# Список /market/exchanges отдает первые записи таблицы статистики, как и раньше
+EXCHANGE_LIST_LIMIT = 50
+
+def format_currency(value: float) -> str:
+    if value >= 1_000_000_000:
+        return f"${value / 1_000_000_000:.2f}B"
+    elif value >= 1_000_000:
+        return f"${value / 1_000_000:.2f}M"
+    elif value >= 1_000:
+        return f"${value / 1_000:.2f}K"
+    else:
+        return f"${value:.2f}"
+
+def exchange_slug(name: Any) -> str:
+    return str(name or '').strip().lower().replace(' ', '_')
+
+def from_db_to_api(exchange_stats: Dict[str, Any], exchange: Dict[str, Any] = None, rank: int = 1) -> ExchangeResponse:
+    volume_24h = to_float(exchange_stats.get('trading_volume_24h'))
+    reserves = to_float(exchange_stats.get('reserves'))
+    supported = exchange_stats.get('list_supported', [])
+
+    return ExchangeResponse(
+        rank=rank,
+        id=str(exchange_stats.get('name', 'unknown')).lower().replace(' ', '_'),
+        name=str(exchange_stats.get('name', '')),
+        image=exchange.get('avatar_image', '') if exchange else '',
+        halal_status=ExchangeHalalStatus(
+            is_halal=exchange_stats.get('is_halal'),
+            score=str(exchange_stats.get('halal_score', '')),
+            rating=to_int(exchange_stats.get('halal_rating'))
+        ),
+        trust_score=to_int(exchange_stats.get('trust_score')),
+        volume_24h_usd=volume_24h,
+        volume_24h_formatted=format_currency(volume_24h),
+        reserves_usd=reserves,
+        reserves_formatted=format_currency(reserves),
+        trading_pairs_count=to_int(exchange_stats.get('trading_pairs_count')),
+        visitors_monthly=str(to_int(exchange_stats.get('visitors_30d', 0))),
+        supported_fiat=supported,
+        supported_fiat_display=', '.join(supported[:3]),
+        volume_chart_7d=exchange_stats.get('inflows_1w', []),
+        exchange_type="centralized"
+    )
+
+def list_row(stat: Dict[str, Any], rank: int) -> ExchangeResponse:
+    return ExchangeResponse(
+        rank=stat.get('rank', rank),
+        id=exchange_slug(stat.get('coingecko_id', stat.get('name', 'unknown'))),
+        name=str(stat.get('name', '')),
+        image=stat.get('image', ''),
+        halal_status=ExchangeHalalStatus(
+            is_halal=stat.get('is_halal', None),
+            score=stat.get('halal_score', ''),
+            rating=stat.get('halal_rating', 0)
+        ),
+        trust_score=stat.get('trust_score', 0),
+        volume_24h_usd=stat.get('trading_volume_24h', 0),
+        volume_24h_formatted=str(stat.get('trading_volume_24h', 0)),
+        reserves_usd=stat.get('reserves', 0),
+        reserves_formatted=str(stat.get('reserves', 0)),
+        trading_pairs_count=stat.get('trading_pairs', 0),
+        visitors_monthly=str(stat.get('visitors_monthly', 0)),
+        supported_fiat=stat.get('supported_fiat', []),
+        supported_fiat_display=str(stat.get('supported_fiat', [])),
+        volume_chart_7d=stat.get('volume_chart_7d', []),
+        exchange_type=stat.get('exchange_type', 'centralized')
+    )
+
+def detail_row(stat: Dict[str, Any], exchange_id: str) -> Dict[str, Any]:
+    return {
+        "id": stat.get('coingecko_id', exchange_id),
+        "name": stat.get('name', ''),
+        "image": stat.get('image', ''),
+        "halal_status": {
+            "score": stat.get('halal_score', ''),
+            "rating": stat.get('halal_rating', 0),
+            "is_halal": stat.get('is_halal', None)
+        },
+        "trust_score": stat.get('trust_score', 0),
+        "volume_24h_usd": stat.get('trading_volume_24h', 0),
+        "total_assets_usd": stat.get('reserves', 0),
+        "trading_pairs_count": stat.get('trading_pairs', 0),
+        "visitors_monthly": str(stat.get('visitors_monthly', 0)),
+        "website_url": stat.get('website_url', ''),
+        "supported_fiat": stat.get('supported_fiat', [])
+    }
+
+class ExchangeCatalogSnapshot:
+    """
+    Снимок бирж: готовые строки списка и поиска, индекс по coingecko_id/slug/названию
+    и отсортированные ключи для поиска по префиксу.
+    """
+    def __init__(self, version: int, exchange_stats: List[Dict[str, Any]], exchanges: List[Dict[str, Any]]):
+        self.version = version
+        self.built_at = datetime.utcnow()
+
+        self.list_rows: List[ExchangeResponse] = [
+            list_row(stat, rank)
+            for rank, stat in enumerate(exchange_stats[:EXCHANGE_LIST_LIMIT], 1)
+        ]
+        self._list_dicts: List[Dict[str, Any]] = [row.model_dump() for row in self.list_rows]
+
+        # Детали: сначала точный coingecko_id, затем slug и название (первая запись таблицы побеждает)
+        self.stats_by_alias: Dict[str, Dict[str, Any]] = {}
+        for stat in exchange_stats:
+            coingecko_id = str(stat.get('coingecko_id') or '').strip()
+            if coingecko_id:
+                self.stats_by_alias.setdefault(coingecko_id, stat)
+        for stat in exchange_stats:
+            name = str(stat.get('name') or '')
+            for alias in (str(stat.get('coingecko_id') or '').lower(), exchange_slug(name), name.strip().lower()):
+                if alias:
+                    self.stats_by_alias.setdefault(alias, stat)
+
+        stats_by_name: Dict[str, Dict[str, Any]] = {}
+        for stat in exchange_stats:
+            name = stat.get('name', '')
+            if name:
+                stats_by_name[name] = stat
+
+        # Поиск: только биржи со статистикой, в порядке таблицы бирж
+        self.search_rows: List[ExchangeResponse] = []
+        self._search_terms: List[Tuple[str, str]] = []
+        for exchange in exchanges:
+            stat = stats_by_name.get(exchange.get('name', ''))
+            if not stat:
+                continue
+            self.search_rows.append(from_db_to_api(stat, exchange))
+            self._search_terms.append((
+                str(exchange.get('name', '')).lower(),
+                str(exchange.get('coingecko_id', '')).lower()
+            ))
+
+        self._prefix_keys: List[Tuple[str, int]] = sorted(
+            (term, position)
+            for position, terms in enumerate(self._search_terms)
+            for term in set(terms) if term
+        )
+
+    def project_list(self, fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        return [{field: row[field] for field in fields} for row in self._list_dicts]
+
+    def get_detail(self, exchange_id: str) -> Optional[Dict[str, Any]]:
+        stat = (
+            self.stats_by_alias.get(exchange_id)
+            or self.stats_by_alias.get(str(exchange_id or '').strip().lower())
+        )
+        return detail_row(stat, exchange_id) if stat else None
+
+    def search(self, query: str, limit: int) -> List[ExchangeResponse]:
+        """
+        Сначала совпадения по началу названия или coingecko_id (по алфавиту),
+        затем по подстроке в порядке таблицы. rank - место в выдаче.
+        """
+        query = query.lower().strip()
+        positions: List[int] = []
+        seen = set()
+
+        start = bisect.bisect_left(self._prefix_keys, (query, -1))
+        for term, position in self._prefix_keys[start:]:
+            if not term.startswith(query) or len(positions) >= limit:
+                break
+            if position not in seen:
+                seen.add(position)
+                positions.append(position)
+
+        for position, (name, coingecko_id) in enumerate(self._search_terms):
+            if len(positions) >= limit:
+                break
+            if position not in seen and (query in name or query in coingecko_id):
+                seen.add(position)
+                positions.append(position)
+
+        return [
+            self.search_rows[position].model_copy(update={'rank': rank})
+            for rank, position in enumerate(positions, 1)
+        ]
+
+class ExchangeCatalog:
+    """
+    Материализованный каталог бирж, обновляется в фоне так же, как каталог токенов.
+    """
+    def __init__(self):
+        self.exchange_stats_table = "LiberandumAggregationExchangesStats"
+        self.exchanges_table = "LiberandumAggregationExchanges"
+
+        self._snapshot: Optional[ExchangeCatalogSnapshot] = None
+        self._version = 0
+        self._build_lock: Optional[asyncio.Lock] = None
+        self._refresh_requested: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Optional[ExchangeCatalogSnapshot]:
+        return self._snapshot
+
+    async def get_snapshot(self) -> ExchangeCatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = await self.refresh(only_if_missing=True)
+        return snapshot
+
+    async def refresh(self, only_if_missing: bool = False) -> ExchangeCatalogSnapshot:
+        if self._build_lock is None:
+            self._build_lock = asyncio.Lock()
+
+        async with self._build_lock:
+            if only_if_missing and self._snapshot is not None:
+                return self._snapshot
+
+            started = datetime.utcnow()
+            exchange_stats, exchanges = await asyncio.gather(
+                self._collect_active(self.exchange_stats_table),
+                self._collect_active(self.exchanges_table)
+            )
+
+            snapshot = await asyncio.to_thread(ExchangeCatalogSnapshot, self._version + 1, exchange_stats, exchanges)
+            self._version = snapshot.version
+            self._snapshot = snapshot
+
+            elapsed = (datetime.utcnow() - started).total_seconds()
+            print(f"[INFO][ExchangeCatalog] - Снимок v{snapshot.version}: {len(exchange_stats)} бирж за {elapsed:.2f}s")
+            return snapshot
+
+    def request_refresh(self):
+        if self._refresh_requested is not None:
+            self._refresh_requested.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._refresh_requested = asyncio.Event()
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self):
+        while True:
+            consumed: Dict[str, float] = {}
+            try:
+                with throttle_wait(settings.EXCHANGE_CATALOG_REFRESH_SECONDS), measure_read_capacity() as consumed:
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[ERROR][ExchangeCatalog] - Ошибка обновления каталога бирж: {e}")
+
+            interval = paced_interval(settings.EXCHANGE_CATALOG_REFRESH_SECONDS, consumed)
+            try:
+                await asyncio.wait_for(
+                    self._refresh_requested.wait(),
+                    timeout=interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_requested.clear()
+
+    async def _collect_active(self, table_name: str) -> List[Dict[str, Any]]:
+        repo = get_async_generic_repository(table_name)
+        if not repo:
+            raise RuntimeError(f"Репозиторий для таблицы {table_name} недоступен")
+        return [
+            item async for item in repo.iter_all(page_size=500)
+            if not item.get('is_deleted', False)
+        ]
+
+exchange_catalog = ExchangeCatalog()
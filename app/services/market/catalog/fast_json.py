@@ -0,0 +1,26 @@
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+import json
+import math
+from typing import Any
+
+def _finite(value: Any) -> Any:
+    # Как orjson: NaN и бесконечности -> null
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    try:
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False, allow_nan=False).encode()
+    except ValueError:
+        return json.dumps(_finite(value), separators=(',', ':'), ensure_ascii=False).encode()
@@ -0,0 +1,20 @@
+from typing import Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+class InvalidFieldsError(ValueError):
+    pass
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel], always: Tuple[str, ...] = ('id',)) -> Optional[Tuple[str, ...]]:
+    """
+    Разреженный набор полей из параметра fields=a,b,c. None - все поля.
+    Поля из always возвращаются всегда, порядок нормализован (для ключей кэша).
+    """
+    requested = {field.strip() for field in (fields or '').split(',') if field.strip()}
+    if not requested:
+        return None
+
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise InvalidFieldsError(f"Неизвестные поля: {', '.join(sorted(unknown))}")
+    return tuple(sorted(requested | set(always)))
@@ -0,0 +1,76 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any
+
+from app.core.security.config import settings
+
+class CachedResponse:
+    __slots__ = ('body', 'etag', 'ids')
+
+    def __init__(self, body: bytes, version: int, ids: List[str]):
+        self.body = body
+        self.etag = f'"v{version}-{hashlib.sha1(body).hexdigest()[:20]}"'
+        # id токенов в ответе - чтобы понять, можно ли отдать общий ответ пользователю с избранным
+        self.ids = ids
+
+class ResponseCache:
+    """
+    LRU-кэш готовых JSON-ответов списков токенов с ограничением по памяти.
+    Ключ включает версию каталога, поэтому после пересборки старые записи просто вытесняются.
+    В теле только общие данные: is_favorite всегда false.
+    """
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes or settings.TOKEN_RESPONSE_CACHE_MB * 1024 * 1024
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(endpoint: str, version: int, **params) -> tuple:
+        normalized = tuple(sorted(
+            (name, getattr(value, 'value', value))
+            for name, value in params.items()
+            if value is not None
+        ))
+        return (endpoint, version, normalized)
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, body: bytes, ids: List[str]) -> Optional[CachedResponse]:
+        entry = CachedResponse(body, key[1], ids)
+        if len(body) > self.max_bytes:
+            return entry
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body)
+            self._entries[key] = entry
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+token_response_cache = ResponseCache()
@@ -0,0 +1,116 @@
+import math
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import List, Optional, Dict, Any, Set, Tuple
+
+from .columns import to_float
+
+# Базовые оценки совпадения; внутри уровня выше токены с большей капитализацией
+SCORE_EXACT_SYMBOL = 100.0
+SCORE_EXACT_TERM = 90.0
+SCORE_SYMBOL_PREFIX = 80.0
+SCORE_TERM_PREFIX = 70.0
+SCORE_SUBSTRING = 50.0
+SCORE_FUZZY = 40.0
+
+FUZZY_MIN_SIMILARITY = 0.35
+MAX_PREFIX_MATCHES = 2000
+
+_WORD_SPLIT = re.compile(r"[\s\-_./]+")
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SearchIndex:
+    """
+    Поисковый индекс по symbol, названию и coingecko_id: точные символы, отсортированный
+    массив префиксов и триграммы для опечаток. Оценка совпадения смешивается с капитализацией.
+    """
+    def __init__(self, rows: List[Dict[str, Any]], name_field: str = 'coin_name'):
+        self.size = len(rows)
+        self.exact_symbol: Dict[str, List[int]] = defaultdict(list)
+        self.exact_terms: Dict[str, List[int]] = defaultdict(list)
+        self.trigrams: Dict[str, Set[int]] = defaultdict(set)
+        self.terms: List[Tuple[str, ...]] = []
+        self.boost: List[float] = []
+
+        prefixes: List[Tuple[str, int, bool]] = []
+        for position, row in enumerate(rows):
+            symbol = str(row.get('symbol') or '').lower()
+            name = str(row.get(name_field) or '').lower()
+            coingecko_id = str(row.get('coingecko_id') or '').lower()
+
+            if symbol:
+                self.exact_symbol[symbol].append(position)
+                prefixes.append((symbol, position, True))
+            for term in {name, coingecko_id} - {''}:
+                self.exact_terms[term].append(position)
+                prefixes.append((term, position, False))
+            for word in set(_WORD_SPLIT.split(name)) - {'', name}:
+                prefixes.append((word, position, False))
+
+            row_terms = tuple(term for term in (symbol, name, coingecko_id) if term)
+            for term in row_terms:
+                for trigram in _trigrams(term):
+                    self.trigrams[trigram].add(position)
+            self.terms.append(row_terms)
+            # log10 капитализации - не больше ~12 баллов, уровень совпадения не перебивает
+            self.boost.append(math.log10(1 + max(to_float(row.get('market_cap')), 0.0)))
+
+        prefixes.sort()
+        self._prefix_terms = [term for term, _, _ in prefixes]
+        self._prefix_entries = [(position, is_symbol) for _, position, is_symbol in prefixes]
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """
+        Позиции совпавших строк с оценкой, по убыванию оценки.
+        """
+        query = query.lower().strip()
+        if not query:
+            return []
+
+        scores: Dict[int, float] = {}
+
+        def hit(position: int, score: float):
+            if score > scores.get(position, 0.0):
+                scores[position] = score
+
+        for position in self.exact_symbol.get(query, ()):
+            hit(position, SCORE_EXACT_SYMBOL)
+        for position in self.exact_terms.get(query, ()):
+            hit(position, SCORE_EXACT_TERM)
+
+        start = bisect_left(self._prefix_terms, query)
+        for index in range(start, min(start + MAX_PREFIX_MATCHES, len(self._prefix_terms))):
+            if not self._prefix_terms[index].startswith(query):
+                break
+            position, is_symbol = self._prefix_entries[index]
+            hit(position, SCORE_SYMBOL_PREFIX if is_symbol else SCORE_TERM_PREFIX)
+
+        # Подстроки и опечатки - через триграммы, для коротких запросов хватает префиксов
+        if len(query) >= 3:
+            query_trigrams = _trigrams(query)
+            shared: Dict[int, int] = defaultdict(int)
+            for trigram in query_trigrams:
+                for position in self.trigrams.get(trigram, ()):
+                    shared[position] += 1
+
+            for position, count in shared.items():
+                if position in scores:
+                    continue
+                terms = self.terms[position]
+                if any(query in term for term in terms):
+                    hit(position, SCORE_SUBSTRING)
+                    continue
+                similarity = max(
+                    len(query_trigrams & _trigrams(term)) / len(query_trigrams | _trigrams(term))
+                    for term in terms
+                ) if count >= 2 else 0.0
+                if similarity >= FUZZY_MIN_SIMILARITY:
+                    hit(position, SCORE_FUZZY * similarity)
+
+        ranked = [(position, score + self.boost[position]) for position, score in scores.items()]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked
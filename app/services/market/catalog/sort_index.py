@@ -0,0 +1,159 @@
+import numpy as np
+from bisect import bisect_right
+from typing import List, Optional, Dict, Any, Hashable
+
+from .columns import to_float, to_int, to_bool
+
+# Ключи сортировки - те же, что в MarketDataService._apply_sorting_enhanced.
+# Второй элемент - инвертировать ли направление (rank и oldest сортируются "наоборот")
+SORT_KEYS: Dict[str, tuple] = {
+    "market_cap": (lambda x: to_float(x.get('market_cap')), False),
+    "volume": (lambda x: to_float(x.get('trading_volume_24h')), False),
+    "price": (lambda x: to_float(x.get('price')), False),
+    "price_change_24h": (lambda x: to_float(x.get('volume_24h_change_24h')), False),
+    "price_change_7d": (lambda x: to_float(x.get('price_change_7d')), False),
+    "market_cap_rank": (lambda x: to_int(x.get('market_cap_rank'), 999999), True),
+    "alphabetical": (lambda x: str(x.get('symbol', '')).upper(), False),
+    "halal": (lambda x: (to_bool(x.get('is_halal'), False), to_float(x.get('market_cap'))), False),
+    "newest": (lambda x: str(x.get('created_at') or ""), False),
+    "oldest": (lambda x: str(x.get('created_at') or ""), True),
+}
+DEFAULT_SORT_KEY = (lambda x: (to_int(x.get('market_cap_rank'), 999999), -to_float(x.get('market_cap'))), False)
+
+MAX_CACHED_COUNTS = 512
+
+class SortIndex:
+    """
+    Перестановки каталога для каждого ключа и направления сортировки, считаются
+    один раз на версию снимка. Страница - срез перестановки по маске фильтра
+    (по смещению или с места курсора), общее число совпадений кэшируется по ключу фильтра.
+    """
+    def __init__(self, stats: List[Dict[str, Any]]):
+        self.stats = stats
+        self._orders: Dict[tuple, Any] = {}
+        self._counts: Dict[Hashable, int] = {}
+
+    def order(self, sort_by: str, sort_order: str = "desc") -> np.ndarray:
+        key = (sort_by if sort_by in SORT_KEYS else None, sort_order)
+        order = self._orders.get(key)
+        if order is None:
+            key_func, inverted = SORT_KEYS.get(sort_by, DEFAULT_SORT_KEY)
+            reverse = (sort_order == "desc") != inverted
+            values = [key_func(stat) for stat in self.stats]
+            # sorted стабилен - порядок равных элементов тот же, что при сортировке списка
+            order = np.array(
+                sorted(range(len(self.stats)), key=values.__getitem__, reverse=reverse),
+                dtype=np.intp
+            )
+            self._orders[key] = order
+        return order
+
+    def sort_value(self, sort_by: str, position: int) -> Any:
+        key_func, _ = SORT_KEYS.get(sort_by, DEFAULT_SORT_KEY)
+        return key_func(self.stats[position])
+
+    def seek(self, sort_by: str, sort_order: str, sort_value: Any) -> int:
+        """
+        Место в порядке сортировки, с которого идут элементы строго после sort_value -
+        продолжение курсора, выданного по другой версии снимка. Токены с тем же значением,
+        что у последнего на странице, при этом пропускаются.
+        """
+        key = ('values', sort_by if sort_by in SORT_KEYS else None, sort_order)
+        values = self._orders.get(key)
+        if values is None:
+            values = [self.sort_value(sort_by, position) for position in self.order(sort_by, sort_order)]
+            self._orders[key] = values
+
+        _, inverted = SORT_KEYS.get(sort_by, DEFAULT_SORT_KEY)
+        if sort_order == "desc" and not inverted or sort_order != "desc" and inverted:
+            # По убыванию: первый элемент строго меньше sort_value
+            return self._first(values, lambda value: value < sort_value)
+        # По возрастанию: первый элемент строго больше sort_value
+        return bisect_right(values, sort_value)
+
+    @staticmethod
+    def _first(values: List[Any], predicate) -> int:
+        # Бинарный поиск первого элемента, для которого predicate истинен (дальше - тоже)
+        low, high = 0, len(values)
+        while low < high:
+            middle = (low + high) // 2
+            if predicate(values[middle]):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def count(self, mask: np.ndarray, filter_key: Optional[Hashable] = None) -> int:
+        """
+        Число элементов по маске. filter_key - нормализованные параметры фильтра;
+        None для фильтров, зависящих от пользователя, - такие не кэшируются.
+        """
+        if filter_key is not None and filter_key in self._counts:
+            return self._counts[filter_key]
+
+        total = int(np.count_nonzero(mask))
+
+        if filter_key is not None:
+            if len(self._counts) >= MAX_CACHED_COUNTS:
+                self._counts.clear()
+            self._counts[filter_key] = total
+        return total
+
+    def ranks(self, sort_by: str, sort_order: str = "desc") -> np.ndarray:
+        # Обратная перестановка: позиция в каталоге -> место в порядке сортировки
+        key = ('ranks', sort_by if sort_by in SORT_KEYS else None, sort_order)
+        ranks = self._orders.get(key)
+        if ranks is None:
+            order = self.order(sort_by, sort_order)
+            ranks = np.empty_like(order)
+            ranks[order] = np.arange(len(order), dtype=order.dtype)
+            self._orders[key] = ranks
+        return ranks
+
+    def page(self, sort_by: str, sort_order: str, mask: np.ndarray, limit: int, offset: int = 0,
+             after: Optional[int] = None, favorites: Optional[np.ndarray] = None,
+             after_value: Any = None) -> List[int]:
+        """
+        Позиции каталога для страницы. after - позиция последнего токена предыдущей страницы
+        (курсор): продолжаем сразу за ним в порядке сортировки, не считая пропущенные.
+        after_value - значение сортировки, если токена курсора в снимке уже нет на том же месте.
+        """
+        if sort_by == "favorites":
+            order = self._favorites_order(sort_order, favorites)
+            start = int(np.flatnonzero(order == after)[0]) + 1 if after is not None else 0
+        else:
+            order = self.order(sort_by, sort_order)
+            if after is not None:
+                start = int(self.ranks(sort_by, sort_order)[after]) + 1
+            elif after_value is not None:
+                start = self.seek(sort_by, sort_order, after_value)
+            else:
+                start = 0
+
+        if after is None and after_value is None and offset:
+            return order[mask[order]][offset:offset + limit].tolist()
+        return self._take(order, mask, start, limit)
+
+    def _take(self, order: np.ndarray, mask: np.ndarray, start: int, limit: int) -> List[int]:
+        # Маску применяем кусками с начала страницы - для курсора работа ~ O(limit), а не O(n)
+        taken: List[int] = []
+        chunk = max(limit * 4, 256)
+        while start < len(order) and len(taken) < limit:
+            part = order[start:start + chunk]
+            taken.extend(part[mask[part]][:limit - len(taken)].tolist())
+            start += chunk
+            chunk *= 2
+        return taken
+
+    def _favorites_order(self, sort_order: str, favorites: Optional[np.ndarray]) -> np.ndarray:
+        # (is_favorite, market_cap): порядок market_cap, разбитый на две группы -
+        # при desc сначала избранные, при asc сначала остальные
+        order = self.order("market_cap", sort_order)
+        if favorites is None:
+            return order
+        is_favorite = favorites[order]
+        favorite_part = order[is_favorite]
+        other_part = order[~is_favorite]
+        if sort_order == "desc":
+            return np.concatenate((favorite_part, other_part))
+        return np.concatenate((other_part, favorite_part))
@@ -0,0 +1,70 @@
+from typing import List, Optional, Dict, Any
+
+# Шагов квантования на диапазон min..max при delta-кодировании
+DELTA_LEVELS = 1000
+
+def lttb(values: List[float], threshold: int) -> List[float]:
+    """
+    Largest-Triangle-Three-Buckets: оставляет threshold точек, сохраняя форму графика.
+    По оси x - индекс точки.
+    """
+    size = len(values)
+    if threshold >= size:
+        return list(values)
+    if threshold <= 2:
+        return [values[0], values[-1]]
+
+    sampled = [values[0]]
+    bucket_size = (size - 2) / (threshold - 2)
+    selected = 0
+
+    for bucket in range(threshold - 2):
+        # Среднее следующего бакета - третья вершина треугольника
+        next_start = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, size)
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        point_x, point_y = selected, values[selected]
+
+        best_area = -1.0
+        best = start
+        for index in range(start, end):
+            area = abs((point_x - avg_x) * (values[index] - point_y) - (point_x - index) * (avg_y - point_y))
+            if area > best_area:
+                best_area = area
+                best = index
+
+        sampled.append(values[best])
+        selected = best
+
+    sampled.append(values[-1])
+    return sampled
+
+def delta_encode(values: List[float]) -> Optional[Dict[str, Any]]:
+    """
+    Компактное представление: price[i] = base + step * (values[0] + ... + values[i]).
+    Квантование на DELTA_LEVELS уровней диапазона, ошибка не накапливается.
+    """
+    if not values:
+        return None
+    base = values[0]
+    low, high = min(values), max(values)
+    step = (high - low) / DELTA_LEVELS if high > low else 0.0
+
+    deltas = []
+    previous = 0
+    for value in values:
+        level = round((value - base) / step) if step else 0
+        deltas.append(level - previous)
+        previous = level
+    return {'base': base, 'step': step, 'values': deltas}
+
+def build_sparkline(prices: List[float], points: Optional[int] = None, encoding: Optional[str] = None) -> Dict[str, Any]:
+    if points:
+        prices = lttb(prices, points)
+    if encoding == "delta":
+        return {'price': [], 'delta': delta_encode(prices)}
+    return {'price': prices}
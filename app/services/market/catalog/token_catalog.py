@@ -0,0 +1,254 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Set
+
+from app.core.database.connector import get_async_generic_repository
+from app.core.database.metrics import measure_read_capacity
+from app.core.database.throttling import paced_interval, throttle_wait
+from app.core.security.config import settings
+from app.core.categories import get_token_category
+from .columns import TokenColumns
+from .search_index import SearchIndex
+from .sort_index import SortIndex
+
+def remove_duplicates_by_symbol(token_stats: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    seen_symbols: Set[str] = set()
+    unique_tokens = []
+
+    sorted_tokens = sorted(
+        token_stats,
+        key=lambda x: x.get('updated_at', ''),
+        reverse=True
+    )
+
+    for token in sorted_tokens:
+        symbol = token.get('symbol', '').upper()
+        if symbol and symbol not in seen_symbols:
+            seen_symbols.add(symbol)
+            unique_tokens.append(token)
+
+    return unique_tokens
+
+MAX_FRAGMENT_VARIANTS = 8
+
+class TokenCatalogSnapshot:
+    """
+    Неизменяемый снимок каталога: подтвержденная статистика без дублей по символу,
+    токены, алиасы (символ, coingecko_id, id, название), поисковый индекс, колонки для фильтров и порядки сортировки.
+    """
+    def __init__(self, version: int, token_stats: List[Dict[str, Any]], tokens: List[Dict[str, Any]]):
+        self.version = version
+        self.built_at = datetime.utcnow()
+
+        approved_stats = [stat for stat in token_stats if stat.get('approved', False)]
+        self.approved_stats = approved_stats
+        self.stats = remove_duplicates_by_symbol(approved_stats)
+        self.stats_by_symbol = {stat['symbol'].upper(): stat for stat in self.stats}
+
+        # По coingecko_id берем самую свежую запись, даже если по символу победила другая
+        self.stats_by_coingecko_id: Dict[str, Dict[str, Any]] = {}
+        for stat in sorted(approved_stats, key=lambda x: x.get('updated_at', ''), reverse=True):
+            coingecko_id = str(stat.get('coingecko_id') or '').lower()
+            if coingecko_id:
+                self.stats_by_coingecko_id.setdefault(coingecko_id, stat)
+
+        self.tokens_by_symbol: Dict[str, Dict[str, Any]] = {}
+        self.tokens_by_coingecko_id: Dict[str, Dict[str, Any]] = {}
+        for token in tokens:
+            symbol = token.get('symbol', '').upper()
+            if symbol:
+                self.tokens_by_symbol[symbol] = token
+            coingecko_id = token.get('coingecko_id')
+            if coingecko_id:
+                self.tokens_by_coingecko_id.setdefault(coingecko_id, token)
+
+        # Категория считается один раз на версию, ключ - символ (в stats символы уникальны)
+        self.category_by_symbol: Dict[str, str] = {
+            symbol: get_token_category(stat, self.tokens_by_symbol.get(symbol))
+            for symbol, stat in self.stats_by_symbol.items()
+        }
+        self.aliases = self._build_aliases(tokens)
+        self.columns = TokenColumns(
+            self.stats,
+            [self.category_by_symbol[stat['symbol'].upper()] for stat in self.stats]
+        )
+        self.sort_index = SortIndex(self.stats)
+        self.search_index = SearchIndex(self.stats)
+        self._admin_search_index: Optional[SearchIndex] = None
+        # Токены по позиции для каждого варианта графика: (dict без is_favorite, JSON-фрагмент).
+        # Заполняются лениво, варианты вытесняются по LRU
+        self._fragments: "OrderedDict[tuple, Dict[int, tuple]]" = OrderedDict()
+        self._fragments_lock = threading.Lock()
+
+    async def get_admin_search_index(self) -> SearchIndex:
+        # Для админки - все подтвержденные записи, включая дубли по символу; строится по первому запросу
+        # в отдельном потоке, чтобы не держать event loop
+        if self._admin_search_index is None:
+            self._admin_search_index = await asyncio.to_thread(SearchIndex, self.approved_stats)
+        return self._admin_search_index
+
+    def _build_aliases(self, tokens: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        # При совпадении алиасов побеждает более точный идентификатор:
+        # coingecko_id, затем символ, затем id записей, затем название
+        aliases: Dict[str, Dict[str, Any]] = {}
+
+        def add(alias, stat):
+            alias = str(alias or '').strip().lower()
+            if alias and stat:
+                aliases.setdefault(alias, stat)
+
+        for coingecko_id, stat in self.stats_by_coingecko_id.items():
+            add(coingecko_id, stat)
+        for symbol, stat in self.stats_by_symbol.items():
+            add(symbol, stat)
+        for stat in self.approved_stats:
+            add(stat.get('id'), self.stats_by_symbol.get(str(stat.get('symbol') or '').upper()))
+        for token in tokens:
+            stat = (
+                self.stats_by_symbol.get(str(token.get('symbol') or '').upper())
+                or self.stats_by_coingecko_id.get(str(token.get('coingecko_id') or '').lower())
+            )
+            add(token.get('id'), stat)
+        # self.stats отсортированы по updated_at - при одинаковых названиях берем свежий
+        for stat in self.stats:
+            add(stat.get('coin_name'), stat)
+        for token in tokens:
+            add(token.get('name'), self.stats_by_symbol.get(str(token.get('symbol') or '').upper()))
+        return aliases
+
+    def fragment_cache(self, variant: tuple) -> Dict[int, tuple]:
+        # Вариант - (точки графика, кодировка); fields в ключ не входят, поля проецируются из dict
+        with self._fragments_lock:
+            fragments = self._fragments.get(variant)
+            if fragments is None:
+                fragments = self._fragments[variant] = {}
+                while len(self._fragments) > MAX_FRAGMENT_VARIANTS:
+                    self._fragments.popitem(last=False)
+            else:
+                self._fragments.move_to_end(variant)
+            return fragments
+
+    def resolve(self, alias: str) -> Optional[Dict[str, Any]]:
+        """
+        Статистика токена по любому идентификатору: coingecko_id, символ, id записи или название.
+        """
+        return self.aliases.get(str(alias or '').strip().lower())
+
+    def category_of(self, token_stats: Dict[str, Any], token: Optional[Dict[str, Any]] = None) -> str:
+        category = self.category_by_symbol.get(str(token_stats.get('symbol') or '').upper())
+        return category or get_token_category(token_stats, token)
+
+    def find_token(self, token_stats: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        token = self.tokens_by_symbol.get(str(token_stats.get('symbol') or '').upper())
+        if not token and token_stats.get('coingecko_id'):
+            token = self.tokens_by_coingecko_id.get(token_stats['coingecko_id'])
+        return token
+
+class TokenCatalog:
+    """
+    Материализованный каталог токенов в памяти. Фоновая задача пересобирает снимок
+    по интервалу (или сразу по request_refresh), читатели получают ссылку на текущий
+    снимок - замена ссылки атомарна, блокировок на чтение нет.
+    """
+    def __init__(self):
+        self.token_stats_table = "LiberandumAggregationTokenStats"
+        self.tokens_table = "LiberandumAggregationToken"
+
+        self._snapshot: Optional[TokenCatalogSnapshot] = None
+        self._version = 0
+        self._build_lock: Optional[asyncio.Lock] = None
+        self._refresh_requested: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Optional[TokenCatalogSnapshot]:
+        return self._snapshot
+
+    async def get_snapshot(self) -> TokenCatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = await self.refresh(only_if_missing=True)
+        return snapshot
+
+    async def refresh(self, only_if_missing: bool = False) -> TokenCatalogSnapshot:
+        if self._build_lock is None:
+            self._build_lock = asyncio.Lock()
+
+        async with self._build_lock:
+            if only_if_missing and self._snapshot is not None:
+                return self._snapshot
+
+            started = datetime.utcnow()
+            token_stats, tokens = await asyncio.gather(
+                self._collect_active(self.token_stats_table),
+                self._collect_active(self.tokens_table)
+            )
+
+            # Сборка снимка (индексы, колонки) - CPU-работа на сотни мс, делаем ее вне event loop;
+            # на loop только подменяем ссылку
+            snapshot = await asyncio.to_thread(TokenCatalogSnapshot, self._version + 1, token_stats, tokens)
+            self._version = snapshot.version
+            self._snapshot = snapshot
+
+            elapsed = (datetime.utcnow() - started).total_seconds()
+            print(f"[INFO][TokenCatalog] - Снимок v{snapshot.version}: {len(snapshot.stats)} токенов за {elapsed:.2f}s")
+            return snapshot
+
+    def request_refresh(self):
+        """
+        Просит фоновую задачу пересобрать каталог, не дожидаясь интервала
+        (например, после подтверждения токена в админке).
+        """
+        if self._refresh_requested is not None:
+            self._refresh_requested.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._refresh_requested = asyncio.Event()
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self):
+        while True:
+            consumed: Dict[str, float] = {}
+            try:
+                # Фоновой сборке можно подождать токены таблицы, в отличие от запросов API
+                with throttle_wait(settings.TOKEN_CATALOG_REFRESH_SECONDS), measure_read_capacity() as consumed:
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[ERROR][TokenCatalog] - Ошибка обновления каталога: {e}")
+
+            # Полный scan стоит RCU по размеру таблиц (даже если сборка упала на середине):
+            # реже пересобираем, если он съедает заметную долю provisioned capacity
+            interval = paced_interval(settings.TOKEN_CATALOG_REFRESH_SECONDS, consumed)
+            try:
+                await asyncio.wait_for(
+                    self._refresh_requested.wait(),
+                    timeout=interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_requested.clear()
+
+    async def _collect_active(self, table_name: str) -> List[Dict[str, Any]]:
+        repo = get_async_generic_repository(table_name)
+        if not repo:
+            raise RuntimeError(f"Репозиторий для таблицы {table_name} недоступен")
+        return [
+            item async for item in repo.iter_all(page_size=500)
+            if not item.get('is_deleted', False)
+        ]
+
+token_catalog = TokenCatalog()
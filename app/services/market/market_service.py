@@ -1,13 +1,52 @@
-from typing import List, Optional, Dict, Any, Set
-from datetime import datetime
+import csv
+import io
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from datetime import datetime, timezone
 
-from app.core.database.connector import get_generic_repository
+from app.core.database.throttling import DynamoDBThrottledError
+from app.services.market.catalog.token_catalog import TokenCatalogSnapshot, token_catalog
+from app.services.market.catalog.exchange_catalog import exchange_catalog
+from app.core.categories import get_token_category
+from app.services.market.catalog import fast_json
+from app.services.market.catalog.columns import token_id_of
+from app.services.market.catalog.sparkline import build_sparkline
+from app.services.market.catalog.cursor import InvalidCursorError, encode_cursor, decode_cursor
 from app.schemas.market import (
     TokenAdditionalInfo, TokenResponse, TokenDetailResponse, TokenListResponse, TokenFullStatsResponse,
     ExchangeListResponse, TokenSocialLinks, TokenSparkline,
     HalalStatus, MarketData, Statistics, AllTimeHigh, AllTimeLow, PriceIndicators24h
 )
 
+# Строк на один кусок потоковой выгрузки
+EXPORT_CHUNK_SIZE = 500
+EXPORT_CSV_FIELDS = [
+    'id', 'symbol', 'name', 'image', 'current_price', 'market_cap', 'price_change_percentage_24h',
+    'price_change_percentage_7d', 'is_halal', 'token_category', 'market_cap_rank', 'volume_24h',
+    'total_supply', 'max_supply', 'is_favorite'
+]
+
+class TokenListPage:
+    """
+    Страница списка токенов: позиции в снимке каталога и метаданные ответа.
+    """
+    def __init__(self, catalog, positions: List[int], pagination: Dict[str, Any],
+                 next_cursor: Optional[str] = None, user_favorites: List[str] = None,
+                 sparkline: tuple = (None, None), fields: Optional[tuple] = None):
+        self.catalog = catalog
+        # (sparkline_points, sparkline_encoding) - вариант представления графиков
+        self.sparkline = sparkline
+        # Разреженный набор полей токена, None - все поля
+        self.fields = fields
+        self.positions = positions
+        self.pagination = pagination
+        self.next_cursor = next_cursor
+        self.favorites = set(user_favorites or [])
+        self.ids = [token_id_of(catalog.stats[position]) for position in positions] if catalog else []
+
+    @property
+    def has_favorites(self) -> bool:
+        return any(token_id in self.favorites for token_id in self.ids)
+
 class MarketDataService:
     def __init__(self):
         self.token_stats_table = "LiberandumAggregationTokenStats"
@@ -15,34 +54,8 @@ class MarketDataService:
         self.exchange_stats_table = "LiberandumAggregationExchangesStats"
         self.exchanges_table = "LiberandumAggregationExchanges"
 
-    def _get_repository(self, table_name: str):
-        repo = get_generic_repository(table_name)
-        if not repo:
-            raise RuntimeError(f"Репозиторий для таблицы {table_name} недоступен")
-        return repo
-
-    def _remove_duplicates_by_symbol(self, token_stats: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        seen_symbols: Set[str] = set()
-        unique_tokens = []
-        
-        sorted_tokens = sorted(
-            token_stats, 
-            key=lambda x: x.get('updated_at', ''), 
-            reverse=True
-        )
-        
-        for token in sorted_tokens:
-            symbol = token.get('symbol', '').upper()
-            if symbol and symbol not in seen_symbols:
-                seen_symbols.add(symbol)
-                unique_tokens.append(token)
-        
-        return unique_tokens
-
-    def _filter_approved_tokens(self, token_stats: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        return [token for token in token_stats if token.get('approved', False)]
   
-    def get_tokens_list_enhanced(
+    async def get_tokens_list_page(
         self, 
         page: int = 1, 
         limit: int = 100, 
@@ -59,33 +72,24 @@ class MarketDataService:
         price_change_24h_max: Optional[float] = None,
         halal_only: bool = False,
         favorites_only: bool = False,
-        user_favorites: List[str] = None
-    ) -> TokenListResponse:
+        user_favorites: List[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        sparkline_points: Optional[int] = None,
+        sparkline_encoding: Optional[str] = None,
+        fields: Optional[tuple] = None,
+        catalog: Optional[TokenCatalogSnapshot] = None
+    ) -> TokenListPage:
         try:
-            token_stats_repo = self._get_repository(self.token_stats_table)
-            tokens_repo = self._get_repository(self.tokens_table)
-            
             if user_favorites is None:
                 user_favorites = []
             
-            scan_limit = min(limit * 5, 2000)
-            all_token_stats = token_stats_repo.scan_items(self.token_stats_table, limit=scan_limit)
-            
-            active_token_stats = [ts for ts in all_token_stats if not ts.get('is_deleted', False)]
-            approved_token_stats = self._filter_approved_tokens(active_token_stats)
-            unique_token_stats = self._remove_duplicates_by_symbol(approved_token_stats)
+            # Роут передает снимок, по версии которого построил ключ кэша и ETag
+            if catalog is None:
+                catalog = await token_catalog.get_snapshot()
+            after, after_value = self._cursor_position(catalog, cursor, sort_by, sort_order) if cursor else (None, None)
             
-            all_tokens = tokens_repo.scan_items(self.tokens_table, limit=2000)
-            tokens_by_symbol = {}
-            for token in all_tokens:
-                if not token.get('is_deleted', False):
-                    symbol = token.get('symbol', '').upper()
-                    if symbol:
-                        tokens_by_symbol[symbol] = token
-            
-            filtered_stats = self._apply_filters(
-                unique_token_stats,
-                tokens_by_symbol,
+            filters = dict(
                 category=category,
                 min_market_cap=min_market_cap,
                 max_market_cap=max_market_cap,
@@ -95,259 +99,287 @@ class MarketDataService:
                 max_volume=max_volume,
                 price_change_24h_min=price_change_24h_min,
                 price_change_24h_max=price_change_24h_max,
-                halal_only=halal_only,
+                halal_only=halal_only
+            )
+            mask = catalog.columns.mask(
                 favorites_only=favorites_only,
-                user_favorites=user_favorites
+                user_favorites=user_favorites,
+                **filters
             )
+            # Фильтр по избранному зависит от пользователя - его счетчик не кэшируем
+            uses_favorites = favorites_only or category == "favorites"
+            filter_key = None if uses_favorites else tuple(sorted(filters.items()))
+            favorites_mask = catalog.columns.favorites_mask(user_favorites) if sort_by == "favorites" else None
             
-            sorted_stats = self._apply_sorting_enhanced(
-                filtered_stats, 
-                sort_by, 
-                sort_order, 
-                user_favorites
+            sort_index = catalog.sort_index
+            total_items = sort_index.count(mask, filter_key) if include_total else None
+            start_idx = (page - 1) * limit
+            # Берем на один больше - так понятно, нужен ли next_cursor
+            positions = sort_index.page(
+                sort_by,
+                sort_order,
+                mask,
+                limit + 1,
+                offset=start_idx,
+                after=after,
+                favorites=favorites_mask,
+                after_value=after_value
             )
+            has_more = len(positions) > limit
+            positions = positions[:limit]
             
-            total_items = len(sorted_stats)
-            start_idx = (page - 1) * limit
-            end_idx = start_idx + limit
-            paginated_stats = sorted_stats[start_idx:end_idx]
-            
-            token_responses = []
-            for stat in paginated_stats:
-                try:
-                    symbol = stat.get('symbol', '').upper()
-                    token_data = tokens_by_symbol.get(symbol)
-                    token_response = self._convert_token_stats_to_response(stat, token_data)
-                    
-                    token_response.is_favorite = token_response.id in user_favorites
-                    
-                    token_responses.append(token_response)
-                except Exception as e:
-                    print(f"[ERROR] Ошибка конвертации токена: {e}")
-                    continue
+            next_cursor = None
+            if has_more:
+                last = positions[-1]
+                sort_value = sort_index.sort_value(sort_by, last) if sort_by != "favorites" else None
+                next_cursor = encode_cursor(catalog.version, sort_by, sort_order, token_id_of(catalog.stats[last]), sort_value)
             
+            if total_items is None:
+                total_pages = None
+            else:
+                total_pages = (total_items + limit - 1) // limit if total_items > 0 else 0
             pagination = {
                 "current_page": page,
-                "total_pages": (total_items + limit - 1) // limit if total_items > 0 else 0,
+                "total_pages": total_pages,
                 "total_items": total_items,
                 "items_per_page": limit
             }
             
-            return TokenListResponse(data=token_responses, pagination=pagination)
+            return TokenListPage(catalog, positions, pagination, next_cursor, user_favorites,
+                                 (sparkline_points, sparkline_encoding), fields)
             
+        except (DynamoDBThrottledError, InvalidCursorError):
+            raise
         except Exception as e:
-            print(f"[ERROR] Критическая ошибка в get_tokens_list_enhanced: {e}")
-            return TokenListResponse(
-                data=[], 
-                pagination={"current_page": 1, "total_pages": 0, "total_items": 0, "items_per_page": limit}
+            print(f"[ERROR] Критическая ошибка в get_tokens_list_page: {e}")
+            return TokenListPage(
+                None, [],
+                {"current_page": 1, "total_pages": 0, "total_items": 0, "items_per_page": limit}
             )
      
-    def search_tokens_enhanced(
+    def _cursor_position(self, catalog, cursor: str, sort_by: str, sort_order: str) -> Tuple[Optional[int], Any]:
+        """
+        Откуда продолжать страницу: (позиция токена курсора, None) или, если каталог
+        пересобран и токен пропал или сменил значение сортировки, (None, значение сортировки).
+        """
+        decoded = decode_cursor(cursor, sort_by, sort_order)
+        position = catalog.columns.position_by_id.get(decoded['last_id'])
+        if decoded['version'] == catalog.version and position is not None:
+            return position, None
+        
+        sort_value = decoded['sort_value']
+        # Порядок избранного зависит от пользователя, а NaN не сравнивается - продолжить по значению нельзя
+        if sort_by == "favorites" or sort_value is None or sort_value != sort_value:
+            raise InvalidCursorError("Курсор устарел, начните с первой страницы")
+        if position is not None and catalog.sort_index.sort_value(sort_by, position) == sort_value:
+            return position, None
+        return None, sort_value
+    
+    async def search_tokens_page(
         self,
         query: str,
         limit: int = 20,
         category: str = "all",
-        sort_by: str = "market_cap", 
+        sort_by: Optional[str] = None, 
         halal_only: bool = False,
-        user_favorites: List[str] = None
-    ) -> TokenListResponse:
+        user_favorites: List[str] = None,
+        cursor: Optional[str] = None,
+        sparkline_points: Optional[int] = None,
+        sparkline_encoding: Optional[str] = None,
+        fields: Optional[tuple] = None,
+        catalog: Optional[TokenCatalogSnapshot] = None
+    ) -> TokenListPage:
         try:
             if user_favorites is None:
                 user_favorites = []
-                
-            token_stats_repo = self._get_repository(self.token_stats_table)
-            tokens_repo = self._get_repository(self.tokens_table)
-            
-            all_token_stats = token_stats_repo.list_all(limit=1000)
-            all_tokens = tokens_repo.list_all(limit=1000)
             
-            approved_token_stats = self._filter_approved_tokens(all_token_stats)
-            unique_stats = self._remove_duplicates_by_symbol(approved_token_stats)
-            
-            tokens_by_symbol = {}
-            for token in all_tokens:
-                if not token.get('is_deleted', False):
-                    symbol = token.get('symbol', '').upper()
-                    if symbol:
-                        tokens_by_symbol[symbol] = token
-            
-            query_lower = query.lower().strip()
-            matching_stats = []
-            
-            for stat in unique_stats:
-                if stat.get('is_deleted', False):
-                    continue
-                    
-                name = stat.get('coin_name', '').lower()
-                symbol = stat.get('symbol', '').lower()
-                coingecko_id = stat.get('coingecko_id', '').lower()
-                
-                if (query_lower in name or 
-                    query_lower in symbol or 
-                    query_lower in coingecko_id or
-                    symbol == query_lower or
-                    name.startswith(query_lower)):
-                    matching_stats.append(stat)
-            
-            filtered_stats = self._apply_filters(
-                matching_stats,
-                tokens_by_symbol,
-                category=category,
-                halal_only=halal_only
-            )
+            # Роут передает снимок, по версии которого построил ключ кэша и ETag
+            if catalog is None:
+                catalog = await token_catalog.get_snapshot()
+            unique_stats = catalog.stats
             
-            sorted_stats = self._apply_sorting_enhanced(filtered_stats, sort_by, "desc", user_favorites)
+            mask = catalog.columns.mask(category=category, halal_only=halal_only)
+            positions = [position for position, _ in catalog.search_index.search(query) if mask[position]]
             
-            limited_stats = sorted_stats[:limit]
-            
-            results = []
-            for stat in limited_stats:
-                try:
-                    symbol = stat.get('symbol', '').upper()
-                    token_data = tokens_by_symbol.get(symbol)
-                    token_response = self._convert_token_stats_to_response(stat, token_data)
-                    token_response.is_favorite = token_response.id in user_favorites
-                    results.append(token_response)
-                except Exception as e:
-                    print(f"[ERROR] Ошибка конвертации в поиске: {e}")
-                    continue
+            if sort_by:
+                position_of = {id(unique_stats[position]): position for position in positions}
+                sorted_stats = self._apply_sorting_enhanced(
+                    [unique_stats[position] for position in positions], sort_by, "desc", user_favorites
+                )
+                positions = [position_of[id(stat)] for stat in sorted_stats]
+            # Без sort_by - по релевантности (оценка совпадения с учетом капитализации)
+            sort_key = sort_by or "relevance"
+            
+            start_idx = 0
+            if cursor:
+                last_id = decode_cursor(cursor, sort_key, "desc")['last_id']
+                ids = [token_id_of(unique_stats[position]) for position in positions]
+                if last_id not in ids:
+                    raise InvalidCursorError("Курсор устарел, повторите поиск")
+                start_idx = ids.index(last_id) + 1
+            
+            limited = positions[start_idx:start_idx + limit]
+            next_cursor = None
+            if limited and start_idx + limit < len(positions):
+                next_cursor = encode_cursor(catalog.version, sort_key, "desc", token_id_of(unique_stats[limited[-1]]))
             
-            return TokenListResponse(
-                data=results,
-                pagination={
-                    "current_page": 1,
-                    "total_pages": 1,
-                    "total_items": len(results),
-                    "items_per_page": limit
-                }
-            )
+            pagination = {
+                "current_page": 1,
+                "total_pages": 1,
+                "total_items": len(limited),
+                "items_per_page": limit
+            }
+            return TokenListPage(catalog, limited, pagination, next_cursor, user_favorites,
+                                 (sparkline_points, sparkline_encoding), fields)
             
+        except (DynamoDBThrottledError, InvalidCursorError):
+            raise
         except Exception as e:
             print(f"[ERROR] Ошибка расширенного поиска токенов: {e}")
-            return TokenListResponse(data=[], pagination={})
+            return TokenListPage(None, [], {})
     
-    def _apply_filters(
-        self,
-        token_stats: List[Dict[str, Any]], 
-        tokens_by_symbol: Dict[str, Any],
-        category: str = "all",
-        min_market_cap: Optional[float] = None,
-        max_market_cap: Optional[float] = None,
-        min_price: Optional[float] = None,
-        max_price: Optional[float] = None,
-        min_volume: Optional[float] = None,
-        max_volume: Optional[float] = None,
-        price_change_24h_min: Optional[float] = None,
-        price_change_24h_max: Optional[float] = None,
-        halal_only: bool = False,
-        favorites_only: bool = False,
-        user_favorites: List[str] = None
-    ) -> List[Dict[str, Any]]:
-        
-        def safe_float(value, default=0.0):
-            try:
-                return float(str(value or 0).replace(',', ''))
-            except:
-                return default
+    def _token_fragment(self, catalog, position: int, sparkline: tuple = (None, None),
+                        fields: Optional[tuple] = None) -> bytes:
+        """
+        JSON токена без is_favorite и закрывающей скобки. Полный токен считается один раз
+        на версию каталога для каждого варианта графика, набор полей проецируется из него.
+        """
+        fragments = catalog.fragment_cache(sparkline)
+        entry = fragments.get(position)
+        if entry is None:
+            stat = catalog.stats[position]
+            token_data = catalog.tokens_by_symbol.get(stat.get('symbol', '').upper())
+            token_response = self._convert_token_stats_to_response(
+                stat, token_data, catalog.category_of(stat, token_data), *sparkline
+            )
+            token_dict = token_response.model_dump(exclude={'is_favorite'})
+            if token_dict['sparkline_in_7d']['delta'] is None:
+                del token_dict['sparkline_in_7d']['delta']
+            entry = fragments[position] = (token_dict, fast_json.dumps(token_dict)[:-1])
         
-        def safe_bool(value, default=False):
-            if value is None:
-                return default
-            if isinstance(value, bool):
-                return value
-            if isinstance(value, str):
-                return value.lower() in ('true', '1', 'yes')
-            return bool(value)
+        token_dict, fragment = entry
+        if fields:
+            return fast_json.dumps({name: value for name, value in token_dict.items() if name in fields})[:-1]
+        return fragment
+    
+    async def get_tokens_batch(self, token_ids: List[str], user_favorites: List[str] = None,
+                               fields: Optional[tuple] = None) -> Tuple[TokenListPage, List[str]]:
+        """
+        Токены по списку идентификаторов (любой алиас) в порядке запроса. Повторы и алиасы
+        одного токена схлопываются, нераспознанные id возвращаются отдельно.
+        """
+        catalog = await token_catalog.get_snapshot()
+        positions = []
+        seen = set()
+        not_found = []
+        for token_id in token_ids:
+            token_stats = catalog.resolve(token_id)
+            position = catalog.columns.position_by_id.get(token_id_of(token_stats)) if token_stats else None
+            if position is None:
+                not_found.append(token_id)
+            elif position not in seen:
+                seen.add(position)
+                positions.append(position)
         
-        def get_token_category(token_stat, token_data):
-            if token_data and token_data.get('token_category'):
-                return token_data['token_category']
-            
-            symbol = str(token_stat.get('symbol', '')).upper()
-            name = str(token_stat.get('coin_name', '')).lower()
-            
-            if symbol in ['USDT', 'USDC', 'DAI', 'BUSD', 'FRAX', 'TUSD', 'FDUSD', 'LUSD', 'sUSD']:
-                return "stablecoin"
-            elif symbol in ['BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'AVAX', 'MATIC', 'DOT', 'ATOM', 'NEAR', 'FTM', 'ALGO', 'HBAR', 'XTZ']:
-                return "layer1"
-            elif symbol in ['ARB', 'OP', 'LRC', 'IMX', 'METIS'] or any(word in name for word in ['layer 2', 'l2', 'arbitrum', 'optimism', 'polygon']):
-                return "layer2"
-            elif any(word in name for word in ['defi', 'swap', 'finance', 'lending', 'protocol', 'yield', 'liquidity']):
-                return "defi"
-            elif any(word in name for word in ['meme', 'doge', 'shib', 'pepe', 'floki', 'wojak']):
-                return "meme"
-            elif any(word in name for word in ['game', 'gaming', 'play', 'metaverse', 'virtual']):
-                return "gaming"
-            elif any(word in name for word in ['nft', 'collectible', 'art', 'token']):
-                return "nft"
-            elif any(word in name for word in ['metaverse', 'virtual reality', 'vr', 'ar', 'augmented']):
-                return "metaverse"
-            elif any(word in name for word in ['web3', 'decentralized', 'infrastructure', 'protocol']):
-                return "web3"
-            elif any(word in name for word in ['dao', 'governance', 'voting']):
-                return "dao"
-            elif any(word in name for word in ['privacy', 'anonymous', 'private', 'confidential']):
-                return "privacy"
-            elif any(word in name for word in ['oracle', 'data', 'network', 'node', 'validator']):
-                return "infrastructure"
+        return TokenListPage(catalog, positions, {}, user_favorites=user_favorites, fields=fields), not_found
+    
+    def render_batch(self, page: TokenListPage, not_found: List[str]) -> bytes:
+        return b''.join((
+            b'{"data":[', b','.join(self._render_items(page)),
+            b'],"not_found":', fast_json.dumps(not_found),
+            b'}'
+        ))
+    
+    def render_page(self, page: TokenListPage) -> bytes:
+        """
+        Тело ответа TokenListResponse из готовых фрагментов, без Pydantic на каждый запрос.
+        """
+        return b''.join((
+            b'{"data":[', b','.join(self._render_items(page)),
+            b'],"pagination":', fast_json.dumps(TokenListResponse(pagination=page.pagination).pagination.model_dump()),
+            b',"next_cursor":', fast_json.dumps(page.next_cursor),
+            b'}'
+        ))
+    
+    def _render_items(self, page: TokenListPage) -> List[bytes]:
+        items = []
+        for position, token_id in zip(page.positions, page.ids):
+            try:
+                fragment = self._token_fragment(page.catalog, position, page.sparkline, page.fields)
+            except Exception as e:
+                print(f"[ERROR] Ошибка конвертации токена: {e}")
+                continue
+            if page.fields and 'is_favorite' not in page.fields:
+                items.append(fragment + b'}')
             else:
-                return "other"
-        
-        if user_favorites is None:
-            user_favorites = []
+                items.append(fragment + (b',"is_favorite":true}' if token_id in page.favorites else b',"is_favorite":false}'))
+        return items
+    
+    async def get_tokens_export(
+        self,
+        category: str = "all",
+        sort_by: str = "market_cap",
+        sort_order: str = "desc",
+        updated_since: Optional[datetime] = None,
+        favorites_only: bool = False,
+        user_favorites: List[str] = None,
+        **filters
+    ) -> TokenListPage:
+        """
+        Все токены каталога по фильтрам в порядке сортировки. Строки не материализуются -
+        тело отдается кусками через iter_export.
+        """
+        catalog = await token_catalog.get_snapshot()
+        if updated_since is not None and updated_since.tzinfo is None:
+            updated_since = updated_since.replace(tzinfo=timezone.utc)
         
-        filtered = []
+        mask = catalog.columns.mask(
+            category=category,
+            favorites_only=favorites_only,
+            user_favorites=user_favorites,
+            updated_since=updated_since.timestamp() if updated_since else None,
+            **filters
+        )
+        favorites_mask = catalog.columns.favorites_mask(user_favorites) if sort_by == "favorites" else None
+        positions = catalog.sort_index.page(sort_by, sort_order, mask, catalog.columns.size, favorites=favorites_mask)
         
-        for stat in token_stats:
-            if category != "all" and category != "favorites":
-                symbol = stat.get('symbol', '').upper()
-                token_data = tokens_by_symbol.get(symbol)
-                token_category = get_token_category(stat, token_data)
-                if token_category != category:
-                    continue
-            
-            if category == "favorites":
-                token_id = stat.get('coingecko_id', stat.get('symbol', '')).lower()
-                if token_id not in user_favorites:
-                    continue
-            
-            market_cap = safe_float(stat.get('market_cap'))
-            if min_market_cap is not None and market_cap < min_market_cap:
-                continue
-            if max_market_cap is not None and market_cap > max_market_cap:
-                continue
-            
-            price = safe_float(stat.get('price'))
-            if min_price is not None and price < min_price:
-                continue
-            if max_price is not None and price > max_price:
-                continue
-            
-            volume = safe_float(stat.get('trading_volume_24h'))
-            if min_volume is not None and volume < min_volume:
-                continue
-            if max_volume is not None and volume > max_volume:
-                continue
-            
-            price_change = safe_float(stat.get('volume_24h_change_24h'))
-            if price_change_24h_min is not None and price_change < price_change_24h_min:
-                continue
-            if price_change_24h_max is not None and price_change > price_change_24h_max:
-                continue
-            
-            if halal_only:
-                is_halal = safe_bool(stat.get('is_halal'))
-                if not is_halal:
-                    continue
+        return TokenListPage(catalog, positions, {}, user_favorites=user_favorites)
+    
+    def iter_export(self, page: TokenListPage, export_format: str = "ndjson") -> Iterator[bytes]:
+        """
+        NDJSON - по строке TokenResponse на токен (из тех же фрагментов, что и список), CSV - плоские поля без графика.
+        """
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
 
-            if favorites_only:
-                token_id = stat.get('coingecko_id', stat.get('symbol', '')).lower()
-                if token_id not in user_favorites:
-                    continue
+        for start in range(0, len(page.positions), EXPORT_CHUNK_SIZE):
+            lines = []
+            for position, token_id in zip(page.positions[start:start + EXPORT_CHUNK_SIZE],
+                                          page.ids[start:start + EXPORT_CHUNK_SIZE]):
+                try:
+                    if export_format == "csv":
+                        stat = page.catalog.stats[position]
+                        token_data = page.catalog.tokens_by_symbol.get(stat.get('symbol', '').upper())
+                        row = self._convert_token_stats_to_response(stat, token_data, page.catalog.category_of(stat, token_data))
+                        row.is_favorite = token_id in page.favorites
+                        writer.writerow(row.model_dump(exclude={'sparkline_in_7d'}))
+                    else:
+                        fragment = self._token_fragment(page.catalog, position)
+                        lines.append(fragment + (b',"is_favorite":true}\n' if token_id in page.favorites else b',"is_favorite":false}\n'))
+                except Exception as e:
+                    print(f"[ERROR] Ошибка конвертации токена: {e}")
             
-            filtered.append(stat)
-        
-        return filtered
+            if export_format == "csv":
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                yield b''.join(lines)
     
     def _apply_sorting_enhanced(
         self, 
@@ -431,7 +463,7 @@ class MarketDataService:
         
         elif sort_by == "favorites":
             def favorite_sort_key(x):
-                token_id = x.get('coingecko_id', x.get('symbol', '')).lower()
+                token_id = token_id_of(x)
                 is_favorite = token_id in user_favorites
                 market_cap = safe_float(x.get('market_cap'))
                 return (is_favorite, market_cap)
@@ -453,27 +485,13 @@ class MarketDataService:
                          key=lambda x: (safe_int(x.get('market_cap_rank'), 999999), -safe_float(x.get('market_cap'))),
                          reverse=reverse_sort)
     
-    def get_token_full_stats(self, symbol_or_id: str) -> Optional[TokenFullStatsResponse]:
+    async def get_token_full_stats(self, symbol_or_id: str) -> Optional[TokenFullStatsResponse]:
         try:
-            token_stats_repo = self._get_repository(self.token_stats_table)
-            
-            token_stats_by_symbol = token_stats_repo.find_by_field('symbol', symbol_or_id.upper())
-            
-            if not token_stats_by_symbol:
-                token_stats_by_coingecko = token_stats_repo.find_by_field('coingecko_id', symbol_or_id.lower())
-                if not token_stats_by_coingecko:
-                    return None
-                token_stats = token_stats_by_coingecko
-            else:
-                token_stats = token_stats_by_symbol
-            
-            approved_stats = self._filter_approved_tokens(token_stats)
-            unique_stats = self._remove_duplicates_by_symbol(approved_stats)
-            if not unique_stats:
+            catalog = await token_catalog.get_snapshot()
+            latest_stats = catalog.resolve(symbol_or_id)
+            if not latest_stats:
                 return None
             
-            latest_stats = unique_stats[0]
-            
             def safe_float(value, default=None):
                 try:
                     return float(str(value or 0).replace(',', '')) if value is not None else default
@@ -512,11 +530,16 @@ class MarketDataService:
                 updated_at=latest_stats.get('updated_at', '')
             )
             
+        except DynamoDBThrottledError:
+            raise
         except Exception as e:
             print(f"[ERROR][MarketService] - Ошибка получения полной статистики токена {symbol_or_id}: {e}")
             return None
         
-    def _convert_token_stats_to_response(self, token_stats: Dict[str, Any], token_data: Dict[str, Any] = None) -> TokenResponse:
+    def _convert_token_stats_to_response(self, token_stats: Dict[str, Any], token_data: Dict[str, Any] = None,
+                                         token_category: Optional[str] = None,
+                                         sparkline_points: Optional[int] = None,
+                                         sparkline_encoding: Optional[str] = None) -> TokenResponse:
         def safe_float(value, default=0.0):
             try:
                 return float(str(value or 0).replace(',', ''))
@@ -538,26 +561,6 @@ class MarketDataService:
                 return value.lower() in ('true', '1', 'yes')
             return bool(value)
 
-        def get_token_category(token_stat, token):
-            if token and token.get('token_category'):
-                return token['token_category']
-
-            symbol = str(token_stat.get('symbol', '')).upper()
-            name = str(token_stat.get('coin_name', '')).lower()
-
-            if symbol in ['USDT', 'USDC', 'DAI', 'BUSD', 'FRAX', 'TUSD', 'FDUSD']:
-                return "stablecoin"
-            elif symbol in ['BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'AVAX', 'MATIC', 'DOT', 'ATOM', 'NEAR', 'FTM']:
-                return "layer1"
-            elif 'layer' in name or 'l2' in name or symbol in ['ARB', 'OP', 'MATIC']:
-                return "layer2"
-            elif any(word in name for word in ['defi', 'swap', 'finance', 'lending', 'protocol']):
-                return "defi"
-            elif any(word in name for word in ['meme', 'doge', 'shib', 'pepe', 'floki']):
-                return "meme"
-            else:
-                return "other"
-
         price_history_data = token_stats.get('price_history', [])
         if not isinstance(price_history_data, list):
             price_history_data = []
@@ -567,10 +570,11 @@ class MarketDataService:
         except:
             price_history_floats = []
 
-        token_category = get_token_category(token_stats, token_data)
+        if token_category is None:
+            token_category = get_token_category(token_stats, token_data)
 
         return TokenResponse(
-            id=str(token_stats.get('coingecko_id', token_stats.get('symbol', 'unknown'))).lower(),
+            id=token_id_of(token_stats) or 'unknown',
             symbol=str(token_stats.get('symbol', 'UNKNOWN')).upper(),
             name=str(token_stats.get('coin_name', 'Unknown Token')),
             image=token_data.get('avatar_image', '') if token_data else '',
@@ -578,7 +582,7 @@ class MarketDataService:
             market_cap=safe_int(token_stats.get('market_cap')),
             price_change_percentage_24h=safe_float(token_stats.get('volume_24h_change_24h')),
             price_change_percentage_7d=safe_float(token_stats.get('price_change_percentage_7d')),
-            sparkline_in_7d=TokenSparkline(price=price_history_floats),
+            sparkline_in_7d=TokenSparkline(**build_sparkline(price_history_floats, sparkline_points, sparkline_encoding)),
             is_halal=safe_bool(token_stats.get('is_halal') or (token_data.get('is_halal') if token_data else None)),
             is_layer_one=token_category == "layer1",
             is_stablecoin=token_category == "stablecoin",
@@ -595,41 +599,14 @@ class MarketDataService:
             return token.get('description_uz') or token.get('description', '')
         else:
             return token.get('description', '')
-    def get_token_detail(self, token_id: str, language: str = "en") -> Optional[TokenDetailResponse]:
+    async def get_token_detail(self, token_id: str, language: str = "en") -> Optional[TokenDetailResponse]:
             try:
-                token_stats_repo = self._get_repository(self.token_stats_table)
-                tokens_repo = self._get_repository(self.tokens_table)
-                
-                token_stats_results = token_stats_repo.find_by_field('coingecko_id', token_id)
-                if not token_stats_results:
-                    token_stats_results = token_stats_repo.find_by_field('symbol', token_id.upper())
-                
-                if not token_stats_results:
+                catalog = await token_catalog.get_snapshot()
+                token_stats = catalog.resolve(token_id)
+                if not token_stats:
                     return None
                 
-                approved_stats = self._filter_approved_tokens(token_stats_results)
-                unique_stats = self._remove_duplicates_by_symbol(approved_stats)
-                if not unique_stats:
-                    return None
-                
-                token_stats = unique_stats[0]
-                
-                token = None
-                if token_stats.get('symbol'):
-                    token_results = tokens_repo.find_by_field('symbol', token_stats['symbol'])
-                    if token_results:
-                        for t in token_results:
-                            if not t.get('is_deleted', False):
-                                token = t
-                                break
-                            
-                if not token and token_stats.get('coingecko_id'):
-                    token_results = tokens_repo.find_by_field('coingecko_id', token_stats['coingecko_id'])
-                    if token_results:
-                        for t in token_results:
-                            if not t.get('is_deleted', False):
-                                token = t
-                                break
+                token = catalog.find_token(token_stats)
                             
                 def safe_float(value, default=0.0):
                     try:
@@ -728,81 +705,29 @@ class MarketDataService:
                     additional_info=additional_info
                 )
                 
+            except DynamoDBThrottledError:
+                raise
             except Exception as e:
                 print(f"[ERROR][MarketService] - Ошибка получения токена {token_id}: {e}")
                 return None        
-    def get_exchanges_list(self) -> ExchangeListResponse:
+    async def get_exchanges_list(self) -> ExchangeListResponse:
         try:
-            exchange_stats_repo = self._get_repository(self.exchange_stats_table)
-            all_exchange_stats = exchange_stats_repo.scan_items(self.exchange_stats_table, limit=50)
-            
-            exchange_responses = []
-            for idx, stat in enumerate(all_exchange_stats, 1):
-                if stat.get('is_deleted', False):
-                    continue
-                
-                exchange_response = {
-                    "rank": stat.get('rank', idx),
-                    "id": str(stat.get('coingecko_id', stat.get('name', 'unknown'))).lower().replace(' ', '_'),
-                    "name": str(stat.get('name', '')),
-                    "image": stat.get('image', ''),
-                    "halal_status": {
-                        "is_halal": stat.get('is_halal', None),
-                        "score": stat.get('halal_score', ''),
-                        "rating": stat.get('halal_rating', 0)
-                    },
-                    "trust_score": stat.get('trust_score', 0),
-                    "volume_24h_usd": stat.get('trading_volume_24h', 0),
-                    "volume_24h_formatted": str(stat.get('trading_volume_24h', 0)),
-                    "reserves_usd": stat.get('reserves', 0),
-                    "reserves_formatted": str(stat.get('reserves', 0)),
-                    "trading_pairs_count": stat.get('trading_pairs', 0),
-                    "visitors_monthly": str(stat.get('visitors_monthly', 0)),
-                    "supported_fiat": stat.get('supported_fiat', []),
-                    "supported_fiat_display": str(stat.get('supported_fiat', [])),
-                    "volume_chart_7d": stat.get('volume_chart_7d', []),
-                    "exchange_type": stat.get('exchange_type', 'centralized')
-                }
-                exchange_responses.append(exchange_response)
-            
-            return ExchangeListResponse(data=exchange_responses)
+            catalog = await exchange_catalog.get_snapshot()
+            return ExchangeListResponse(data=catalog.list_rows)
             
+        except DynamoDBThrottledError:
+            raise
         except Exception as e:
             print(f"[ERROR][MarketService] - Ошибка получения списка бирж: {e}")
             return ExchangeListResponse(data=[])
 
-    def get_exchange_detail(self, exchange_id: str) -> Optional[Dict[str, Any]]:
+    async def get_exchange_detail(self, exchange_id: str) -> Optional[Dict[str, Any]]:
         try:
-            exchange_stats_repo = self._get_repository(self.exchange_stats_table)
-            
-            exchange_stats_results = exchange_stats_repo.find_by_field('coingecko_id', exchange_id)
-            if not exchange_stats_results:
-                exchange_name = exchange_id.replace('_', ' ').title()
-                exchange_stats_results = exchange_stats_repo.find_by_field('name', exchange_name)
-                
-            if not exchange_stats_results:
-                return None
-            
-            stats = exchange_stats_results[0]
-            
-            return {
-                "id": stats.get('coingecko_id', exchange_id),
-                "name": stats.get('name', ''),
-                "image": stats.get('image', ''),
-                "halal_status": {
-                    "score": stats.get('halal_score', ''),
-                    "rating": stats.get('halal_rating', 0),
-                    "is_halal": stats.get('is_halal', None)
-                },
-                "trust_score": stats.get('trust_score', 0),
-                "volume_24h_usd": stats.get('trading_volume_24h', 0),
-                "total_assets_usd": stats.get('reserves', 0),
-                "trading_pairs_count": stats.get('trading_pairs', 0),
-                "visitors_monthly": str(stats.get('visitors_monthly', 0)),
-                "website_url": stats.get('website_url', ''),
-                "supported_fiat": stats.get('supported_fiat', [])
-            }
+            catalog = await exchange_catalog.get_snapshot()
+            return catalog.get_detail(exchange_id)
             
+        except DynamoDBThrottledError:
+            raise
         except Exception as e:
             print(f"[ERROR][MarketService] - Ошибка получения деталей биржи {exchange_id}: {e}")
             return None
@@ -0,0 +1,234 @@
+"""
+Эталон: фильтрация и сортировка списка токенов в том виде, в каком они были до каталога
+(MarketDataService._apply_filters/_apply_sorting_enhanced из базовой версии).
+"""
+from typing import List, Optional, Dict, Any
+
+class BaselineMarketService:
+    def _apply_filters(
+        self,
+        token_stats: List[Dict[str, Any]], 
+        tokens_by_symbol: Dict[str, Any],
+        category: str = "all",
+        min_market_cap: Optional[float] = None,
+        max_market_cap: Optional[float] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_volume: Optional[float] = None,
+        max_volume: Optional[float] = None,
+        price_change_24h_min: Optional[float] = None,
+        price_change_24h_max: Optional[float] = None,
+        halal_only: bool = False,
+        favorites_only: bool = False,
+        user_favorites: List[str] = None
+    ) -> List[Dict[str, Any]]:
+        
+        def safe_float(value, default=0.0):
+            try:
+                return float(str(value or 0).replace(',', ''))
+            except:
+                return default
+        
+        def safe_bool(value, default=False):
+            if value is None:
+                return default
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str):
+                return value.lower() in ('true', '1', 'yes')
+            return bool(value)
+        
+        def get_token_category(token_stat, token_data):
+            if token_data and token_data.get('token_category'):
+                return token_data['token_category']
+            
+            symbol = str(token_stat.get('symbol', '')).upper()
+            name = str(token_stat.get('coin_name', '')).lower()
+            
+            if symbol in ['USDT', 'USDC', 'DAI', 'BUSD', 'FRAX', 'TUSD', 'FDUSD', 'LUSD', 'sUSD']:
+                return "stablecoin"
+            elif symbol in ['BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'AVAX', 'MATIC', 'DOT', 'ATOM', 'NEAR', 'FTM', 'ALGO', 'HBAR', 'XTZ']:
+                return "layer1"
+            elif symbol in ['ARB', 'OP', 'LRC', 'IMX', 'METIS'] or any(word in name for word in ['layer 2', 'l2', 'arbitrum', 'optimism', 'polygon']):
+                return "layer2"
+            elif any(word in name for word in ['defi', 'swap', 'finance', 'lending', 'protocol', 'yield', 'liquidity']):
+                return "defi"
+            elif any(word in name for word in ['meme', 'doge', 'shib', 'pepe', 'floki', 'wojak']):
+                return "meme"
+            elif any(word in name for word in ['game', 'gaming', 'play', 'metaverse', 'virtual']):
+                return "gaming"
+            elif any(word in name for word in ['nft', 'collectible', 'art', 'token']):
+                return "nft"
+            elif any(word in name for word in ['metaverse', 'virtual reality', 'vr', 'ar', 'augmented']):
+                return "metaverse"
+            elif any(word in name for word in ['web3', 'decentralized', 'infrastructure', 'protocol']):
+                return "web3"
+            elif any(word in name for word in ['dao', 'governance', 'voting']):
+                return "dao"
+            elif any(word in name for word in ['privacy', 'anonymous', 'private', 'confidential']):
+                return "privacy"
+            elif any(word in name for word in ['oracle', 'data', 'network', 'node', 'validator']):
+                return "infrastructure"
+            else:
+                return "other"
+        
+        if user_favorites is None:
+            user_favorites = []
+        
+        filtered = []
+        
+        for stat in token_stats:
+            if category != "all" and category != "favorites":
+                symbol = stat.get('symbol', '').upper()
+                token_data = tokens_by_symbol.get(symbol)
+                token_category = get_token_category(stat, token_data)
+                if token_category != category:
+                    continue
+            
+            if category == "favorites":
+                token_id = stat.get('coingecko_id', stat.get('symbol', '')).lower()
+                if token_id not in user_favorites:
+                    continue
+            
+            market_cap = safe_float(stat.get('market_cap'))
+            if min_market_cap is not None and market_cap < min_market_cap:
+                continue
+            if max_market_cap is not None and market_cap > max_market_cap:
+                continue
+            
+            price = safe_float(stat.get('price'))
+            if min_price is not None and price < min_price:
+                continue
+            if max_price is not None and price > max_price:
+                continue
+            
+            volume = safe_float(stat.get('trading_volume_24h'))
+            if min_volume is not None and volume < min_volume:
+                continue
+            if max_volume is not None and volume > max_volume:
+                continue
+            
+            price_change = safe_float(stat.get('volume_24h_change_24h'))
+            if price_change_24h_min is not None and price_change < price_change_24h_min:
+                continue
+            if price_change_24h_max is not None and price_change > price_change_24h_max:
+                continue
+            
+            if halal_only:
+                is_halal = safe_bool(stat.get('is_halal'))
+                if not is_halal:
+                    continue
+
+            if favorites_only:
+                token_id = stat.get('coingecko_id', stat.get('symbol', '')).lower()
+                if token_id not in user_favorites:
+                    continue
+            
+            filtered.append(stat)
+        
+        return filtered
+    
+    def _apply_sorting_enhanced(
+        self, 
+        token_stats: List[Dict[str, Any]], 
+        sort_by: str, 
+        sort_order: str = "desc",
+        user_favorites: List[str] = None
+    ) -> List[Dict[str, Any]]:
+        
+        def safe_float(value, default=0.0):
+            try:
+                return float(str(value or 0).replace(',', ''))
+            except:
+                return default
+        
+        def safe_int(value, default=0):
+            try:
+                return int(float(str(value or 0).replace(',', '')))
+            except:
+                return default
+        
+        def safe_bool(value, default=False):
+            if value is None:
+                return default
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str):
+                return value.lower() in ('true', '1', 'yes')
+            return bool(value)
+        
+        def safe_date(value, default=""):
+            try:
+                return str(value or default)
+            except:
+                return default
+        
+        if user_favorites is None:
+            user_favorites = []
+        
+        reverse_sort = sort_order == "desc"
+        
+        if sort_by == "market_cap":
+            return sorted(token_stats, 
+                         key=lambda x: safe_float(x.get('market_cap')), 
+                         reverse=reverse_sort)
+        
+        elif sort_by == "volume":
+            return sorted(token_stats, 
+                         key=lambda x: safe_float(x.get('trading_volume_24h')), 
+                         reverse=reverse_sort)
+        
+        elif sort_by == "price":
+            return sorted(token_stats, 
+                         key=lambda x: safe_float(x.get('price')), 
+                         reverse=reverse_sort)
+        
+        elif sort_by == "price_change_24h":
+            return sorted(token_stats, 
+                         key=lambda x: safe_float(x.get('volume_24h_change_24h')), 
+                         reverse=reverse_sort)
+        
+        elif sort_by == "price_change_7d":
+            return sorted(token_stats, 
+                         key=lambda x: safe_float(x.get('price_change_7d')), 
+                         reverse=reverse_sort)
+        
+        elif sort_by == "market_cap_rank":
+            return sorted(token_stats, 
+                         key=lambda x: safe_int(x.get('market_cap_rank'), 999999), 
+                         reverse=not reverse_sort) 
+        
+        elif sort_by == "alphabetical":
+            return sorted(token_stats, 
+                         key=lambda x: str(x.get('symbol', '')).upper(), 
+                         reverse=reverse_sort)
+        
+        elif sort_by == "halal":
+            return sorted(token_stats, 
+                         key=lambda x: (safe_bool(x.get('is_halal'), False), safe_float(x.get('market_cap'))), 
+                         reverse=reverse_sort)
+        
+        elif sort_by == "favorites":
+            def favorite_sort_key(x):
+                token_id = x.get('coingecko_id', x.get('symbol', '')).lower()
+                is_favorite = token_id in user_favorites
+                market_cap = safe_float(x.get('market_cap'))
+                return (is_favorite, market_cap)
+            
+            return sorted(token_stats, key=favorite_sort_key, reverse=reverse_sort)
+        
+        elif sort_by == "newest":
+            return sorted(token_stats, 
+                         key=lambda x: safe_date(x.get('created_at')), 
+                         reverse=reverse_sort)
+        
+        elif sort_by == "oldest":
+            return sorted(token_stats, 
+                         key=lambda x: safe_date(x.get('created_at')), 
+                         reverse=not reverse_sort)
+        
+        else:
+            return sorted(token_stats, 
+                         key=lambda x: (safe_int(x.get('market_cap_rank'), 999999), -safe_float(x.get('market_cap'))),
+                         reverse=reverse_sort)
+    
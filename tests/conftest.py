@@ -0,0 +1,42 @@
+import random
+import time
+
+import pytest
+
+from app.core.database.repositories.generic import GenericRepository
+from app.services.market.catalog.token_catalog import TokenCatalogSnapshot, token_catalog
+from fake_dynamodb import FakeResource, FakeTable
+from market_data import make_stats, make_tokens
+
+@pytest.fixture
+def catalog():
+    rng = random.Random(7)
+    stats = make_stats(rng, 400)
+    snapshot = TokenCatalogSnapshot(1, stats, make_tokens(stats))
+    previous = token_catalog._snapshot
+    token_catalog._snapshot = snapshot
+    yield snapshot
+    token_catalog._snapshot = previous
+
+@pytest.fixture
+def fake_repo(monkeypatch):
+    """
+    Фабрика GenericRepository поверх таблицы в памяти; задержки повторов отключены.
+    """
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+
+    def build(items, table_name='TestItems', page_size=10, scan_segments=1, unprocessed_rounds=0):
+        table = FakeTable(table_name, items, page_size)
+        resource = FakeResource([table], unprocessed_rounds)
+        repo = GenericRepository(table_name, scan_segments=scan_segments)
+        repo.dynamodb = resource
+        repo._tables[table_name] = table
+        return repo, table, resource
+    return build
+
+@pytest.fixture
+def client():
+    # Без контекстного менеджера: startup (подключение к DynamoDB, фоновые обновления) не запускается
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
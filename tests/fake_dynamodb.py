@@ -0,0 +1,129 @@
+"""
+Таблица и resource DynamoDB в памяти: Scan/Query с Limit и LastEvaluatedKey, сегменты,
+BatchGetItem/BatchWriteItem с настраиваемыми Unprocessed*. Для тестов репозиториев без AWS.
+"""
+import threading
+
+from boto3.dynamodb.conditions import AttributeBase
+
+def _value(operand, item):
+    if isinstance(operand, AttributeBase):
+        return item.get(operand.name)
+    return operand
+
+def matches(condition, item) -> bool:
+    if condition is None:
+        return True
+    expression = condition.get_expression()
+    operator, values = expression['operator'], expression['values']
+    if operator == 'AND':
+        return matches(values[0], item) and matches(values[1], item)
+    if operator == 'OR':
+        return matches(values[0], item) or matches(values[1], item)
+    if operator == '=':
+        return _value(values[0], item) == _value(values[1], item)
+    raise NotImplementedError(operator)
+
+class FakeTable:
+    def __init__(self, name, items, page_size=10):
+        self.name = name
+        self.items = items
+        self.page_size = page_size
+        self.calls = []
+        self.fail_on_call = None
+        self._lock = threading.Lock()
+
+    def _page(self, source, params):
+        start = params.get('ExclusiveStartKey', {}).get('offset', 0)
+        size = min(params.get('Limit', self.page_size), self.page_size)
+        chunk = source[start:start + size]
+        items = [item for item in chunk if matches(params.get('FilterExpression'), item)]
+
+        if 'ProjectionExpression' in params:
+            names = params['ExpressionAttributeNames']
+            fields = [names[part.strip()] for part in params['ProjectionExpression'].split(',')]
+            items = [{field: item[field] for field in fields if field in item} for item in items]
+
+        response = {'Items': items, 'Count': len(items), 'ScannedCount': len(chunk)}
+        if params.get('ReturnConsumedCapacity'):
+            response['ConsumedCapacity'] = {'TableName': self.name, 'CapacityUnits': 0.5 * max(1, len(chunk))}
+        if start + size < len(source):
+            response['LastEvaluatedKey'] = {'offset': start + size}
+        return response
+
+    def _record(self, operation, params):
+        with self._lock:
+            self.calls.append((operation, params))
+            if self.fail_on_call is not None and len(self.calls) == self.fail_on_call:
+                raise self.fail_error
+
+    def fail(self, call_number, error):
+        # Ошибка на call_number-м вызове таблицы (считая с 1)
+        self.fail_on_call = call_number
+        self.fail_error = error
+
+    def scan(self, **params):
+        self._record('scan', params)
+        segment, total = params.get('Segment'), params.get('TotalSegments')
+        source = self.items if segment is None else self.items[segment::total]
+        return self._page(source, params)
+
+    def query(self, **params):
+        self._record('query', params)
+        return self._page([item for item in self.items if matches(params['KeyConditionExpression'], item)], params)
+
+    def get_item(self, **params):
+        self._record('get_item', params)
+        for item in self.items:
+            if item.get('id') == params['Key']['id']:
+                return {'Item': item}
+        return {}
+
+class FakeResource:
+    def __init__(self, tables, unprocessed_rounds=0):
+        self.tables = {table.name: table for table in tables}
+        # Сколько первых вызовов batch_* возвращают половину запроса как Unprocessed*
+        self.unprocessed_rounds = unprocessed_rounds
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def Table(self, name):
+        return self.tables[name]
+
+    def _take_unprocessed(self, requests):
+        with self._lock:
+            if self.unprocessed_rounds <= 0 or len(requests) < 2:
+                return requests, []
+            self.unprocessed_rounds -= 1
+            half = len(requests) // 2
+            return requests[:half], requests[half:]
+
+    def batch_get_item(self, RequestItems, **params):
+        with self._lock:
+            self.calls.append(('batch_get_item', RequestItems))
+        responses, unprocessed = {}, {}
+        for name, request in RequestItems.items():
+            keys, rest = self._take_unprocessed(request['Keys'])
+            if rest:
+                unprocessed[name] = dict(request, Keys=rest)
+            ids = {key['id'] for key in keys}
+            responses[name] = [item for item in self.tables[name].items if item.get('id') in ids]
+        return {'Responses': responses, 'UnprocessedKeys': unprocessed}
+
+    def batch_write_item(self, RequestItems, **params):
+        with self._lock:
+            self.calls.append(('batch_write_item', RequestItems))
+        unprocessed = {}
+        for name, requests in RequestItems.items():
+            done, rest = self._take_unprocessed(requests)
+            if rest:
+                unprocessed[name] = rest
+            table = self.tables[name]
+            with table._lock:
+                for request in done:
+                    if 'PutRequest' in request:
+                        table.items.append(request['PutRequest']['Item'])
+                    else:
+                        key = request['DeleteRequest']['Key']['id']
+                        table.items[:] = [item for item in table.items if item.get('id') != key]
+        return {'UnprocessedItems': unprocessed}
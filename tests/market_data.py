@@ -0,0 +1,64 @@
+import random
+
+from baseline_market import BaselineMarketService
+
+SORTS = [
+    "market_cap", "volume", "price", "price_change_24h", "price_change_7d", "market_cap_rank",
+    "alphabetical", "halal", "favorites", "newest", "oldest", "default"
+]
+CATEGORIES = ["all", "favorites", "meme", "defi", "layer1", "stablecoin", "nft", "other", "unknown"]
+NAMES = ["Doge Meme", "Swap Finance", "Foo", "Pixel Game", "Oracle Network", "Bar Token", "Private Cash", ""]
+NUMBERS = ["0", "5", "5", "12.5", "1,000", "-3", "x", "", None, 7, 250000.0]
+
+def make_stats(rng: random.Random, count: int):
+    stats = []
+    for i in range(1, count + 1):
+        stats.append({
+            'id': f's{i}',
+            # Повторяющиеся символы - проверяем и дедупликацию по updated_at
+            'symbol': rng.choice([f'T{i}', f'T{i}', f'T{i // 3}', 'BTC', 'usdt']),
+            'coin_name': rng.choice(NAMES),
+            'coingecko_id': f'token-{i}',
+            'approved': rng.random() > 0.1,
+            'market_cap': rng.choice(NUMBERS + [str(1000 * i)]),
+            'price': rng.choice(NUMBERS),
+            'trading_volume_24h': rng.choice(NUMBERS),
+            'volume_24h_change_24h': rng.choice(NUMBERS),
+            'price_change_7d': rng.choice(NUMBERS),
+            'market_cap_rank': rng.choice([1, 2, 2, None, 'abc', str(i)]),
+            'is_halal': rng.choice([True, False, 'true', 'no', None]),
+            'created_at': rng.choice(['2024-01-01', '2024-02-01', '2023-12-31', None]),
+            'updated_at': f'2024-03-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00',
+        })
+    return stats
+
+def make_tokens(stats):
+    return [
+        {'id': f't{i}', 'symbol': stat['symbol'], 'token_category': 'defi'}
+        for i, stat in enumerate(stats) if i % 11 == 0
+    ]
+
+def random_query(rng: random.Random, favorites):
+    query = {
+        'sort_by': rng.choice(SORTS),
+        'sort_order': rng.choice(["asc", "desc"]),
+        'category': rng.choice(CATEGORIES),
+        'halal_only': rng.random() < 0.2,
+        'favorites_only': rng.random() < 0.1,
+        'user_favorites': favorites,
+    }
+    for low, high in (('min_market_cap', 'max_market_cap'), ('min_price', 'max_price'),
+                      ('min_volume', 'max_volume'), ('price_change_24h_min', 'price_change_24h_max')):
+        if rng.random() < 0.2:
+            query[low] = rng.choice([0, 5, 6, 1000])
+        if rng.random() < 0.2:
+            query[high] = rng.choice([5, 12.5, 100000])
+    return query
+
+def baseline_order(snapshot, query):
+    baseline = BaselineMarketService()
+    filters = {key: value for key, value in query.items() if key not in ('sort_by', 'sort_order')}
+    filtered = baseline._apply_filters(snapshot.stats, snapshot.tokens_by_symbol, **filters)
+    ordered = baseline._apply_sorting_enhanced(filtered, query['sort_by'], query['sort_order'], query['user_favorites'])
+    return [stat['coingecko_id'] for stat in ordered]
+
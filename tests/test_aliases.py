@@ -0,0 +1,51 @@
+from app.services.market.catalog.token_catalog import TokenCatalogSnapshot
+
+def stat(record_id, symbol, coingecko_id, coin_name, updated_at='2024-03-01', approved=True):
+    return {'id': record_id, 'symbol': symbol, 'coingecko_id': coingecko_id, 'coin_name': coin_name,
+            'updated_at': updated_at, 'approved': approved}
+
+STATS = [
+    stat('s1', 'BTC', 'bitcoin', 'Bitcoin'),
+    stat('s2', 'ETH', 'ethereum', 'Ethereum', updated_at='2024-03-02'),
+    # Старая запись ETH - проигрывает по updated_at, но ее id ведет к победителю
+    stat('s3', 'ETH', 'ethereum-old', 'Ether Old', updated_at='2024-01-01'),
+    # Название совпадает с символом BTC - символ точнее
+    stat('s4', 'WBTC', 'wrapped-bitcoin', 'btc'),
+    # coingecko_id совпадает с символом другого токена - coingecko_id точнее
+    stat('s5', 'SOLX', 'eth', 'Sol X'),
+    stat('s6', 'HIDDEN', 'hidden-token', 'Hidden', approved=False),
+]
+TOKENS = [
+    {'id': 't1', 'symbol': 'BTC', 'name': 'Bitcoin Token'},
+    {'id': 't2', 'symbol': 'UNKNOWN', 'coingecko_id': 'wrapped-bitcoin', 'name': 'Wrapped'},
+]
+
+def symbol_of(catalog, alias):
+    resolved = catalog.resolve(alias)
+    return resolved['symbol'] if resolved else None
+
+def test_resolve_by_any_identifier():
+    catalog = TokenCatalogSnapshot(1, STATS, TOKENS)
+    assert symbol_of(catalog, 'bitcoin') == 'BTC'
+    assert symbol_of(catalog, ' BTC ') == 'BTC'
+    assert symbol_of(catalog, 's1') == 'BTC'
+    assert symbol_of(catalog, 't1') == 'BTC'
+    assert symbol_of(catalog, 'Bitcoin Token') == 'BTC'
+    # Токен без статистики по символу находится по coingecko_id
+    assert symbol_of(catalog, 't2') == 'WBTC'
+    assert symbol_of(catalog, 'missing') is None
+    assert symbol_of(catalog, '') is None and symbol_of(catalog, None) is None
+
+def test_alias_precedence():
+    catalog = TokenCatalogSnapshot(1, STATS, TOKENS)
+    assert symbol_of(catalog, 'btc') == 'BTC'
+    assert symbol_of(catalog, 'eth') == 'SOLX'
+    assert catalog.resolve('s3') is catalog.resolve('s2')
+    assert catalog.resolve('ethereum')['id'] == 's2'
+    # По coingecko_id старой записи - она сама, даже если по символу победила другая
+    assert catalog.resolve('ethereum-old')['id'] == 's3'
+
+def test_unapproved_tokens_are_not_resolved():
+    catalog = TokenCatalogSnapshot(1, STATS, TOKENS)
+    assert catalog.resolve('hidden-token') is None
+    assert catalog.resolve('s6') is None
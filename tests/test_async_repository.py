@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+
+from app.core.database.metrics import current_scope
+from app.core.database.repositories.async_generic import AsyncGenericRepository, run_in_db_executor
+
+def items(count):
+    return [{'id': str(i), 'value': i} for i in range(count)]
+
+def test_run_in_db_executor_keeps_loop_free_and_copies_context():
+    scope = {'method': 'GET'}
+
+    def blocking():
+        time.sleep(0.2)
+        return threading.current_thread().name, current_scope.get()
+
+    async def scenario():
+        current_scope.set(scope)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        thread_name, seen_scope = await run_in_db_executor(blocking)
+        task.cancel()
+        return thread_name, seen_scope, ticks
+
+    thread_name, seen_scope, ticks = asyncio.run(scenario())
+    assert thread_name.startswith('dynamodb-async')
+    assert seen_scope is scope
+    # Пока поток пула спал, event loop продолжал работать
+    assert ticks >= 5
+
+def test_async_iter_all_and_calls(fake_repo):
+    repo, _, _ = fake_repo(items(230), page_size=20, scan_segments=3)
+    async_repo = AsyncGenericRepository(repo)
+
+    async def scenario():
+        streamed = [item async for item in async_repo.iter_all(page_size=20)]
+        found = await async_repo.get_many(['5', '7', 'missing'])
+        listed = await async_repo.list_all(limit=15)
+        return streamed, found, listed
+
+    streamed, found, listed = asyncio.run(scenario())
+    assert sorted(int(item['id']) for item in streamed) == list(range(230))
+    assert [item['id'] for item in found] == ['5', '7']
+    assert len(listed) == 15
+
+def test_async_iter_early_exit_stops_scan(fake_repo):
+    repo, table, _ = fake_repo(items(5000), page_size=5, scan_segments=1)
+    async_repo = AsyncGenericRepository(repo)
+
+    async def scenario():
+        async for item in async_repo.scan_iter(page_size=5):
+            if int(item['id']) >= 12:
+                break
+
+    asyncio.run(scenario())
+    calls = len(table.calls)
+    time.sleep(0.2)
+    # Генератор закрыт - следующие страницы не читаются
+    assert len(table.calls) == calls and calls <= 4
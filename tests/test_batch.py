@@ -0,0 +1,34 @@
+from app.routes.data.tokens import MAX_BATCH_IDS
+
+def test_batch_dedupes_aliases_and_keeps_request_order(client, catalog):
+    first, second = catalog.stats[5], catalog.stats[0]
+    ids = [first['coingecko_id'], 'missing-token', second['coingecko_id'], first['symbol'].lower(),
+           first['coingecko_id'].upper(), 'missing-token', ' ']
+
+    response = client.get('/market/tokens/batch', params={'ids': ','.join(ids)})
+    assert response.status_code == 200
+    body = response.json()
+    assert [token['id'] for token in body['data']] == [first['coingecko_id'], second['coingecko_id']]
+    assert body['not_found'] == ['missing-token']
+    assert all(token['is_favorite'] is False for token in body['data'])
+
+def test_batch_fields(client, catalog):
+    token_id = catalog.stats[0]['coingecko_id']
+    response = client.get('/market/tokens/batch', params={'ids': token_id, 'fields': 'current_price,symbol'})
+    assert response.status_code == 200
+    assert set(response.json()['data'][0]) == {'id', 'current_price', 'symbol'}
+
+    response = client.get('/market/tokens/batch', params={'ids': token_id, 'fields': 'current_price,unknown'})
+    assert response.status_code == 400
+
+def test_batch_limit(client, catalog):
+    ids = [f'token-{i}' for i in range(MAX_BATCH_IDS)]
+    assert client.get('/market/tokens/batch', params={'ids': ','.join(ids)}).status_code == 200
+
+    # Повторы не считаются в лимит
+    assert client.get('/market/tokens/batch', params={'ids': ','.join(ids + ids[:10])}).status_code == 200
+
+    too_many = ','.join(ids + ['token-extra'])
+    response = client.get('/market/tokens/batch', params={'ids': too_many})
+    assert response.status_code == 400
+    assert str(MAX_BATCH_IDS) in response.json()['detail']
@@ -0,0 +1,77 @@
+from botocore.exceptions import ClientError
+
+from app.core.database.bulk_writer import BulkWriter
+
+def items(count, prefix='i'):
+    return [{'id': f'{prefix}{i}', 'value': i} for i in range(count)]
+
+def test_bulk_create_writes_in_batches(fake_repo):
+    repo, table, resource = fake_repo([])
+    report = repo.bulk_create(items(60), auto_id=False, workers=3)
+
+    assert report['total'] == 60 and report['written'] == 60
+    assert report['failed'] == 0 and report['retried'] == 0
+    assert sorted(len(request['TestItems']) for _, request in resource.calls) == [10, 25, 25]
+    assert {item['id'] for item in table.items} == {f'i{i}' for i in range(60)}
+    assert all('created_at' in item and 'updated_at' in item for item in table.items)
+
+def test_unprocessed_items_are_retried(fake_repo):
+    repo, table, resource = fake_repo([], unprocessed_rounds=3)
+    report = repo.bulk_upsert(items(25), workers=1)
+
+    # 25 -> 12 записано, 13 повтор -> 6/7 -> 3/4 -> 4 записаны без остатка
+    assert report['written'] == 25 and report['failed'] == 0
+    assert report['retried'] == 13 + 7 + 4
+    assert len(resource.calls) == 4
+    assert len(table.items) == 25
+
+def test_unprocessed_items_counted_failed_after_retries(fake_repo):
+    _, table, resource = fake_repo([], unprocessed_rounds=100)
+    writer = BulkWriter(resource, table.name, workers=1, max_retries=2)
+    report = writer.write([{'PutRequest': {'Item': item}} for item in items(8)])
+
+    # 8 -> 4 + 4 повтор -> 2 + 2 повтор -> 1 + 1 не записан
+    assert report['written'] == 7
+    assert report['retried'] == 4 + 2
+    assert report['failed'] == 1
+
+def test_batch_error_counts_chunk_failed(fake_repo):
+    _, table, resource = fake_repo([])
+
+    def failing_batch(RequestItems, **params):
+        raise ClientError({'Error': {'Code': 'ValidationException'}}, 'BatchWriteItem')
+    resource.batch_write_item = failing_batch
+
+    report = BulkWriter(resource, table.name, workers=2).write(
+        [{'PutRequest': {'Item': item}} for item in items(30)]
+    )
+    assert report['written'] == 0 and report['failed'] == 30
+
+def test_items_without_id_are_counted_failed(fake_repo):
+    repo, table, _ = fake_repo([])
+    batch = items(3) + [{'value': 'no id'}, {'id': None}, {'id': 'i0', 'value': 'latest'}]
+    report = repo.bulk_create(batch, auto_id=False)
+
+    assert report['total'] == 5
+    assert report['written'] == 3
+    assert report['failed'] == 2
+    # Дубли по id схлопываются, остается последняя версия
+    assert next(item for item in table.items if item['id'] == 'i0')['value'] == 'latest'
+
+def test_upsert_without_id_is_counted_failed(fake_repo):
+    repo, _, _ = fake_repo([])
+    report = repo.bulk_upsert([{'value': 1}, {'id': 'a'}])
+    assert (report['written'], report['failed']) == (1, 1)
+
+def test_auto_id_assigns_missing_ids(fake_repo):
+    repo, table, _ = fake_repo([])
+    report = repo.bulk_create([{'value': 1}, {'value': 2}])
+    assert report['written'] == 2 and report['failed'] == 0
+    assert all(item['id'] for item in table.items)
+
+def test_bulk_delete_dedupes_ids(fake_repo):
+    repo, table, resource = fake_repo(items(5))
+    report = repo.bulk_delete(['i1', 'i2', 'i1', '', None])
+
+    assert report['total'] == 2 and report['written'] == 2
+    assert {item['id'] for item in table.items} == {'i0', 'i3', 'i4'}
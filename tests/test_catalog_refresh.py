@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.core.database.metrics import db_metrics, measure_read_capacity
+from app.core.database.table_schemas import get_provisioned_capacity
+from app.core.database.throttling import paced_interval
+from app.core.security.config import settings
+from app.services.market.catalog.token_catalog import TokenCatalog
+
+STATS_TABLE = "LiberandumAggregationTokenStats"
+
+def record_scan(table_name, units):
+    db_metrics.record(table_name, 'scan', 0.001, {
+        'Count': 1, 'ScannedCount': 1,
+        'ConsumedCapacity': {'TableName': table_name, 'CapacityUnits': units}
+    })
+
+def test_measure_read_capacity_sums_reads_per_table():
+    with measure_read_capacity() as consumed:
+        record_scan(STATS_TABLE, 2.5)
+        record_scan(STATS_TABLE, 1.5)
+        db_metrics.record(STATS_TABLE, 'put_item', 0.001, {
+            'ConsumedCapacity': {'TableName': STATS_TABLE, 'CapacityUnits': 7}
+        })
+    record_scan(STATS_TABLE, 100)
+    assert consumed == {STATS_TABLE: 4.0}
+
+def test_paced_interval():
+    rate = get_provisioned_capacity(STATS_TABLE, 'ReadCapacityUnits')
+    share = settings.DYNAMODB_BACKGROUND_READ_SHARE
+
+    assert paced_interval(60, {}) == 60
+    assert paced_interval(60, {STATS_TABLE: 1.0}) == 60
+    assert paced_interval(60, {STATS_TABLE: rate * share * 600}) == pytest.approx(600)
+    assert paced_interval(60, {'UnknownTable': 10 ** 6}) == 60
+
+@pytest.fixture
+def fast_refresh(monkeypatch):
+    monkeypatch.setattr(type(settings), 'TOKEN_CATALOG_REFRESH_SECONDS', property(lambda self: 0.05))
+
+def run_loop(units, actions):
+    catalog = TokenCatalog()
+    refreshes = []
+
+    async def refresh():
+        # Scan идет в потоке пула - емкость должна попасть в измерение цикла
+        await asyncio.to_thread(record_scan, STATS_TABLE, units)
+        refreshes.append(asyncio.get_running_loop().time())
+
+    catalog.refresh = refresh
+
+    async def scenario():
+        catalog.start()
+        try:
+            for action in actions:
+                action(catalog)
+                await asyncio.sleep(0.3)
+        finally:
+            await catalog.stop()
+
+    asyncio.run(scenario())
+    return refreshes
+
+def test_refresh_repeats_by_interval_when_cheap(fast_refresh):
+    refreshes = run_loop(0.001, [lambda catalog: None])
+    assert len(refreshes) >= 3
+
+def test_expensive_refresh_is_paced_until_requested(fast_refresh):
+    rate = get_provisioned_capacity(STATS_TABLE, 'ReadCapacityUnits')
+    units = rate * settings.DYNAMODB_BACKGROUND_READ_SHARE * 3600
+
+    refreshes = run_loop(units, [lambda catalog: None, lambda catalog: None])
+    assert len(refreshes) == 1
+
+    refreshes = run_loop(units, [lambda catalog: None, lambda catalog: catalog.request_refresh()])
+    assert len(refreshes) == 2
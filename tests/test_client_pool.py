@@ -0,0 +1,64 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.database import client_pool
+from app.core.security.config import settings
+
+class FakeClient:
+    def __init__(self):
+        self.list_calls = 0
+
+    def list_tables(self, **params):
+        self.list_calls += 1
+        return {'TableNames': []}
+
+class FakeBotoResource:
+    def __init__(self, config):
+        self.config = config
+        self.meta = SimpleNamespace(client=FakeClient())
+        self.table_calls = []
+
+    def Table(self, name):
+        self.table_calls.append(name)
+        return SimpleNamespace(name=name)
+
+@pytest.fixture
+def pool(monkeypatch):
+    created = []
+
+    def resource(service, **params):
+        created.append(FakeBotoResource(params['config']))
+        return created[-1]
+
+    monkeypatch.setattr(client_pool.boto3, 'resource', resource)
+    monkeypatch.setattr(client_pool, '_resource', None)
+    monkeypatch.setattr(client_pool, '_tables', {})
+    monkeypatch.setattr(client_pool, '_connection_checked', False)
+    return created
+
+def test_one_resource_per_process(pool):
+    threads = [threading.Thread(target=client_pool.get_dynamodb_resource) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(pool) == 1
+    assert client_pool.get_dynamodb_client() is pool[0].meta.client
+
+    config = pool[0].config
+    assert config.max_pool_connections == settings.DYNAMODB_MAX_POOL_CONNECTIONS
+    assert config.retries['max_attempts'] == 1
+
+def test_tables_are_cached(pool):
+    first = client_pool.get_table('Tokens')
+    assert client_pool.get_table('Tokens') is first
+    client_pool.get_table('Users')
+    assert pool[0].table_calls == ['Tokens', 'Users']
+
+def test_connection_is_checked_once(pool):
+    client_pool.ensure_connection()
+    client_pool.ensure_connection()
+    assert pool[0].meta.client.list_calls == 1
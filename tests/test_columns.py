@@ -0,0 +1,45 @@
+import math
+
+import numpy as np
+
+from app.services.market.catalog.columns import TokenColumns, to_bool, to_float, to_timestamp, token_id_of
+
+def test_parsers():
+    assert to_float("1,000.5") == 1000.5
+    assert to_float("x") == 0.0
+    assert to_float(None) == 0.0
+    assert to_bool("YES") and to_bool("1") and to_bool(1)
+    assert not to_bool("no") and not to_bool(None)
+    assert to_timestamp("2024-01-01T00:00:00Z") == to_timestamp("2024-01-01T00:00:00") == 1704067200.0
+    assert to_timestamp(1704067200000) == 1704067200.0
+    assert math.isnan(to_timestamp("garbage"))
+
+def test_mask():
+    stats = [
+        {'symbol': 'A', 'coingecko_id': 'a', 'approved': True, 'price': '10', 'market_cap': '100', 'is_halal': 'true'},
+        {'symbol': 'B', 'coingecko_id': 'b', 'approved': True, 'price': 'nan', 'market_cap': '5', 'is_halal': False},
+        {'symbol': 'C', 'coingecko_id': 'c', 'approved': False, 'price': '1', 'market_cap': '1,000'},
+    ]
+    columns = TokenColumns(stats, ['meme', 'defi', 'meme'])
+
+    assert columns.mask().tolist() == [True, True, False]
+    # NaN, как и построчные сравнения раньше, границами не отсеивается
+    assert columns.mask(min_price=5, max_price=20).tolist() == [True, True, False]
+    assert columns.mask(min_market_cap=50).tolist() == [True, False, False]
+    assert columns.mask(halal_only=True).tolist() == [True, False, False]
+    assert columns.mask(category="defi").tolist() == [False, True, False]
+    assert not columns.mask(category="unknown").any()
+    assert columns.mask(favorites_only=True, user_favorites=['b', 'zzz']).tolist() == [False, True, False]
+    assert columns.favorites_mask(['a', 'c']).dtype == np.bool_
+
+def test_token_id_without_coingecko_id():
+    assert token_id_of({'coingecko_id': None, 'symbol': 'BTC'}) == 'btc'
+    assert token_id_of({'coingecko_id': 42}) == '42'
+    assert token_id_of({}) == ''
+
+    stats = [
+        {'symbol': 'A', 'coingecko_id': None, 'approved': True},
+        {'symbol': 'B', 'approved': True},
+    ]
+    columns = TokenColumns(stats, ['other', 'other'])
+    assert columns.position_by_id == {'a': 0, 'b': 1}
@@ -0,0 +1,135 @@
+import asyncio
+import random
+
+import pytest
+
+from app.services.market.catalog.cursor import InvalidCursorError, encode_cursor, decode_cursor
+from app.services.market.catalog.sort_index import SORT_KEYS
+from app.services.market.catalog.token_catalog import TokenCatalogSnapshot, token_catalog
+from app.services.market.market_service import MarketDataService
+from market_data import baseline_order, make_tokens, random_query
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(3, "price", "asc", "token-42")
+    assert '=' not in cursor
+    assert decode_cursor(cursor, "price", "asc") == {'version': 3, 'last_id': 'token-42', 'sort_value': None}
+
+    cursor = encode_cursor(3, "halal", "desc", "token-42", (True, 12.5))
+    assert decode_cursor(cursor, "halal", "desc")['sort_value'] == (True, 12.5)
+
+def test_cursor_rejects_other_sort_and_garbage():
+    cursor = encode_cursor(1, "price", "asc", "token-1")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "price", "desc")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "volume", "asc")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor", "price", "asc")
+
+def test_unknown_token_cursor_is_rejected(catalog):
+    cursor = encode_cursor(catalog.version, "market_cap", "desc", "token-missing")
+    with pytest.raises(InvalidCursorError):
+        asyncio.run(MarketDataService().get_tokens_list_page(cursor=cursor))
+
+QUERY = {'sort_by': "market_cap", 'sort_order': "desc", 'category': "all", 'user_favorites': []}
+
+def first_page_and_rebuild(catalog, change):
+    service = MarketDataService()
+    first = asyncio.run(service.get_tokens_list_page(limit=10, **QUERY))
+    last_id = first.ids[-1]
+
+    # Пересборка каталога между страницами: новая версия, изменены stats
+    stats = [dict(stat) for stat in catalog.stats]
+    stats = change(stats, last_id)
+    token_catalog._snapshot = TokenCatalogSnapshot(catalog.version + 1, stats, make_tokens(stats))
+    second = asyncio.run(service.get_tokens_list_page(limit=10, cursor=first.next_cursor, **QUERY))
+    return first, second, token_catalog._snapshot
+
+def test_cursor_from_older_snapshot_continues_after_token(catalog):
+    def drop_first(stats, last_id):
+        return [stat for stat in stats if stat['coingecko_id'] != 'token-400']
+    first, second, rebuilt = first_page_and_rebuild(catalog, drop_first)
+
+    expected = baseline_order(rebuilt, QUERY)
+    start = expected.index(first.ids[-1]) + 1
+    assert second.ids == expected[start:start + 10]
+
+@pytest.mark.parametrize('change', ['removed', 'moved'])
+def test_cursor_from_older_snapshot_reseeks_by_sort_value(catalog, change):
+    key_func, _ = SORT_KEYS["market_cap"]
+    last_value = {}
+
+    def rebuild(stats, last_id):
+        last = next(stat for stat in stats if stat['coingecko_id'] == last_id)
+        last_value['value'] = key_func(last)
+        if change == 'removed':
+            return [stat for stat in stats if stat is not last]
+        last['market_cap'] = '0'
+        return stats
+    first, second, rebuilt = first_page_and_rebuild(catalog, rebuild)
+
+    by_id = {stat['coingecko_id']: stat for stat in rebuilt.stats}
+    expected = [
+        token_id for token_id in baseline_order(rebuilt, QUERY)
+        if key_func(by_id[token_id]) < last_value['value']
+    ]
+    assert second.ids == expected[:10]
+    assert not set(second.ids) & set(first.ids)
+
+def test_stale_favorites_cursor_is_rejected(catalog):
+    cursor = encode_cursor(catalog.version - 1, "favorites", "desc", "token-1")
+    with pytest.raises(InvalidCursorError):
+        asyncio.run(MarketDataService().get_tokens_list_page(sort_by="favorites", cursor=cursor))
+
+def test_stale_cursor_without_sort_value_is_rejected(client, catalog):
+    cursor = encode_cursor(catalog.version - 1, "market_cap", "desc", "token-1")
+    response = client.get(f'/market/tokens/?sort_by=market_cap&sort_order=desc&cursor={cursor}')
+    assert response.status_code == 400
+
+def test_cursor_walk_matches_baseline(catalog):
+    rng = random.Random(13)
+    service = MarketDataService()
+    favorites = [f'token-{i}' for i in range(1, 400, 5)]
+
+    for _ in range(60):
+        query = random_query(rng, favorites)
+        limit = rng.choice([3, 25, 60])
+        expected = baseline_order(catalog, query)
+
+        walked, cursor = [], None
+        while True:
+            result = asyncio.run(service.get_tokens_list_page(limit=limit, cursor=cursor, **query))
+            walked.extend(result.ids)
+            cursor = result.next_cursor
+            if cursor is None:
+                break
+
+        assert walked == expected, query
+
+def test_search_cursor_walk_matches_full_result(catalog):
+    service = MarketDataService()
+    full = asyncio.run(service.search_tokens_page("t1", limit=1000))
+    assert len(full.ids) > 10
+
+    walked, cursor = [], None
+    while True:
+        result = asyncio.run(service.search_tokens_page("t1", limit=4, cursor=cursor))
+        walked.extend(result.ids)
+        cursor = result.next_cursor
+        if cursor is None:
+            break
+
+    assert walked == full.ids
+
+def test_seek_lands_after_equal_values(catalog):
+    sort_index = catalog.sort_index
+    for sort_by in list(SORT_KEYS) + ["default"]:
+        for sort_order in ("asc", "desc"):
+            order = sort_index.order(sort_by, sort_order).tolist()
+            values = [sort_index.sort_value(sort_by, position) for position in order]
+            for rank in range(0, len(order), 17):
+                value = values[rank]
+                if value != value:
+                    continue
+                last_equal = max(i for i, other in enumerate(values) if other == value)
+                assert sort_index.seek(sort_by, sort_order, value) == last_equal + 1, (sort_by, sort_order)
@@ -0,0 +1,56 @@
+from app.services.market.catalog.exchange_catalog import EXCHANGE_LIST_LIMIT, ExchangeCatalogSnapshot
+
+def stat(name, coingecko_id=None, **extra):
+    return dict({'name': name, 'coingecko_id': coingecko_id, 'trading_volume_24h': '1000', 'list_supported': []}, **extra)
+
+STATS = [
+    stat('Binance', 'binance', website_url='https://binance.com'),
+    stat('Coin Base', 'gdax'),
+    stat('Bitfinex', 'bitfinex'),
+    stat('Bybit', 'bybit_spot'),
+    stat('OKX', 'okex'),
+    # Дубль по названию - побеждает первая запись таблицы
+    stat('Binance', 'binance-us', website_url='https://binance.us'),
+]
+EXCHANGES = [
+    {'name': 'OKX', 'coingecko_id': 'okex'},
+    {'name': 'Bybit', 'coingecko_id': 'bybit_spot'},
+    {'name': 'Coin Base', 'coingecko_id': 'gdax'},
+    {'name': 'Binance', 'coingecko_id': 'binance'},
+    {'name': 'Bitfinex', 'coingecko_id': 'bitfinex'},
+    {'name': 'No Stats', 'coingecko_id': 'nostats'},
+]
+
+def snapshot():
+    return ExchangeCatalogSnapshot(1, STATS, EXCHANGES)
+
+def test_detail_resolution():
+    catalog = snapshot()
+    assert catalog.get_detail('binance')['website_url'] == 'https://binance.com'
+    assert catalog.get_detail('binance-us')['website_url'] == 'https://binance.us'
+    # slug, название в любом регистре, coingecko_id в другом регистре
+    assert catalog.get_detail('coin_base')['id'] == 'gdax'
+    assert catalog.get_detail(' Coin Base ')['id'] == 'gdax'
+    assert catalog.get_detail('BYBIT_SPOT')['name'] == 'Bybit'
+    assert catalog.get_detail('unknown') is None
+    assert catalog.get_detail('') is None
+
+def test_search_prefix_first_then_substring():
+    results = snapshot().search('b', 10)
+    # Префиксы по алфавиту (binance, bitfinex, bybit), затем подстрока в порядке таблицы бирж (coin base)
+    assert [row.name for row in results] == ['Binance', 'Bitfinex', 'Bybit', 'Coin Base']
+    assert [row.rank for row in results] == [1, 2, 3, 4]
+
+def test_search_by_coingecko_id_and_limit():
+    catalog = snapshot()
+    assert [row.name for row in catalog.search('GDAX', 10)] == ['Coin Base']
+    assert [row.name for row in catalog.search('ok', 10)] == ['OKX']
+    assert len(catalog.search('b', 2)) == 2
+    # Биржи без статистики в поиск не попадают
+    assert catalog.search('nostats', 10) == []
+
+def test_list_rows_limit_and_projection():
+    stats = [stat(f'Exchange {i}', f'exchange-{i}') for i in range(EXCHANGE_LIST_LIMIT + 5)]
+    catalog = ExchangeCatalogSnapshot(1, stats, [])
+    assert len(catalog.list_rows) == EXCHANGE_LIST_LIMIT
+    assert catalog.project_list(('id', 'rank'))[:2] == [{'id': 'exchange-0', 'rank': 1}, {'id': 'exchange-1', 'rank': 2}]
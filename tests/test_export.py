@@ -0,0 +1,41 @@
+import csv
+import io
+import json
+
+from app.services.market.market_service import EXPORT_CSV_FIELDS
+from market_data import baseline_order
+
+QUERY = {'sort_by': "market_cap", 'sort_order': "desc", 'category': "all", 'user_favorites': []}
+
+def updated_ids(catalog, since):
+    by_id = {stat['coingecko_id']: stat for stat in catalog.stats}
+    return [token_id for token_id in baseline_order(catalog, QUERY) if by_id[token_id]['updated_at'] >= since]
+
+def test_ndjson_export_matches_list_order(client, catalog):
+    response = client.get('/market/tokens/export')
+    assert response.status_code == 200
+    assert response.headers['X-Catalog-Version'] == str(catalog.version)
+
+    lines = [json.loads(line) for line in response.content.decode().splitlines()]
+    assert [token['id'] for token in lines] == baseline_order(catalog, QUERY)
+    assert response.headers['X-Total-Count'] == str(len(lines))
+    assert all(token['is_favorite'] is False and 'sparkline_in_7d' in token for token in lines)
+
+def test_ndjson_export_updated_since(client, catalog):
+    response = client.get('/market/tokens/export', params={'updated_since': '2024-03-15T00:00:00'})
+    ids = [json.loads(line)['id'] for line in response.content.decode().splitlines()]
+
+    expected = updated_ids(catalog, '2024-03-15T00:00:00')
+    assert 0 < len(expected) < len(catalog.stats)
+    assert ids == expected
+
+def test_csv_export_updated_since_with_timezone(client, catalog):
+    # 03:00 по +03:00 - то же, что 00:00 UTC
+    response = client.get('/market/tokens/export', params={'format': 'csv', 'updated_since': '2024-03-15T03:00:00+03:00'})
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/csv')
+
+    rows = list(csv.DictReader(io.StringIO(response.content.decode())))
+    assert list(rows[0]) == EXPORT_CSV_FIELDS
+    assert [row['id'] for row in rows] == updated_ids(catalog, '2024-03-15T00:00:00')
+    assert response.headers['X-Total-Count'] == str(len(rows))
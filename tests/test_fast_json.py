@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from app.services.market.catalog import fast_json
+from app.services.market.catalog.token_catalog import TokenCatalogSnapshot
+from app.services.market.market_service import MarketDataService
+from market_data import make_tokens
+
+orjson = pytest.importorskip("orjson")
+
+VALUES = [
+    None, True, 0, -7, 2 ** 53, 0.1, 1e20, -0.0, "", "Привет → 世界 \"\\\n\t", [], {},
+    {'price': float('nan'), 'change': float('inf'), 'low': float('-inf'), 'ok': 1.5},
+    {'nested': [{'a': [1, 2.5, None, float('nan')]}, ('tuple', 1)], 'flag': False},
+]
+
+def fallback_dumps(monkeypatch, value):
+    monkeypatch.setattr(fast_json, 'orjson', None)
+    return fast_json.dumps(value)
+
+@pytest.mark.parametrize('value', VALUES)
+def test_fallback_matches_orjson(monkeypatch, value):
+    expected = orjson.dumps(value)
+    fallback = fallback_dumps(monkeypatch, value)
+    assert json.loads(fallback) == json.loads(expected)
+    assert b'NaN' not in fallback and b'Infinity' not in fallback
+
+def test_fallback_token_fragments_match(monkeypatch, catalog):
+    stats = [dict(stat) for stat in catalog.stats[:50]]
+    stats[0].update(price='nan', price_change_7d='inf', approved=True)
+    snapshot = TokenCatalogSnapshot(catalog.version + 1, stats, make_tokens(stats))
+
+    service = MarketDataService()
+    fragments = []
+    for position in range(len(snapshot.stats)):
+        service._token_fragment(snapshot, position)
+        token_dict, fragment = snapshot.fragment_cache((None, None))[position]
+        assert json.loads(fallback_dumps(monkeypatch, token_dict)) == json.loads(fragment + b'}')
+        fragments.append(fragment)
+    assert any(b'"current_price":null' in fragment for fragment in fragments)
@@ -0,0 +1,36 @@
+import pytest
+
+from app.schemas.market import ExchangeResponse, TokenResponse
+from app.services.market.catalog.exchange_catalog import ExchangeCatalogSnapshot, exchange_catalog
+from app.services.market.catalog.fields import InvalidFieldsError, parse_fields
+
+def test_parse_fields():
+    assert parse_fields(None, TokenResponse) is None
+    assert parse_fields(" , ", TokenResponse) is None
+    assert parse_fields(" symbol,current_price,,symbol ", TokenResponse) == ('current_price', 'id', 'symbol')
+    assert parse_fields("id", TokenResponse) == ('id',)
+    assert parse_fields("rank", ExchangeResponse, always=()) == ('rank',)
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(InvalidFieldsError) as error:
+        parse_fields("symbol,zeta,alpha", TokenResponse)
+    assert str(error.value).endswith("alpha, zeta")
+
+    # Поля другой модели тоже неизвестны
+    with pytest.raises(InvalidFieldsError):
+        parse_fields("trust_score", TokenResponse)
+
+def test_routes_return_400_for_unknown_fields(client, catalog):
+    response = client.get('/market/tokens/', params={'fields': 'symbol,bogus'})
+    assert response.status_code == 400 and 'bogus' in response.json()['detail']
+
+    assert client.get('/market/tokens/search', params={'q': 't1', 'fields': 'bogus'}).status_code == 400
+    assert client.get('/market/exchanges/', params={'fields': 'bogus'}).status_code == 400
+
+def test_exchange_list_fields(client, monkeypatch):
+    stats = [{'name': 'Binance', 'coingecko_id': 'binance', 'trust_score': 10}]
+    monkeypatch.setattr(exchange_catalog, '_snapshot', ExchangeCatalogSnapshot(1, stats, []))
+
+    response = client.get('/market/exchanges/', params={'fields': 'trust_score'})
+    assert response.status_code == 200
+    assert response.json() == {'data': [{'id': 'binance', 'trust_score': 10}]}
@@ -0,0 +1,147 @@
+import re
+
+import pytest
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from app.core.database.table_schemas import find_index_for_field
+
+def items(count):
+    return [{'id': str(i), 'value': i, 'group': 'even' if i % 2 == 0 else 'odd'} for i in range(count)]
+
+def test_scan_iter_follows_last_evaluated_key(fake_repo):
+    repo, table, _ = fake_repo(items(95), page_size=10)
+    result = list(repo.scan_iter(repo.table_name))
+
+    assert [item['value'] for item in result] == list(range(95))
+    assert len(table.calls) == 10
+    assert [params.get('ExclusiveStartKey') for _, params in table.calls[:2]] == [None, {'offset': 10}]
+
+def test_scan_iter_with_filter_and_limits(fake_repo):
+    repo, table, _ = fake_repo(items(95), page_size=10)
+    # Фильтр применяется после чтения страницы - пустые страницы не обрывают пагинацию
+    odd = list(repo.scan_iter(repo.table_name, filter_expression=Attr('group').eq('odd'), page_size=4))
+    assert [item['value'] for item in odd] == list(range(1, 95, 2))
+    assert all(params['Limit'] == 4 for _, params in table.calls)
+
+    table.calls.clear()
+    assert len(repo.scan_items(repo.table_name, limit=25)) == 25
+    # max_items без page_size - Limit страницы, лишние страницы не читаются
+    assert len(table.calls) == 3
+
+def test_scan_iter_error_mid_pagination(fake_repo):
+    repo, table, _ = fake_repo(items(50), page_size=10)
+    table.fail(3, ClientError({'Error': {'Code': 'ValidationException'}}, 'Scan'))
+    assert len(list(repo.scan_iter(repo.table_name))) == 20
+
+    table.calls.clear()
+    with pytest.raises(ClientError):
+        list(repo.scan_iter(repo.table_name, strict=True))
+
+def test_query_iter_paginates(fake_repo):
+    repo, table, _ = fake_repo(items(60), page_size=7)
+    result = repo.query_items(repo.table_name, Key('group').eq('even'))
+    assert [item['value'] for item in result] == list(range(0, 60, 2))
+    assert len(table.calls) == 5
+
+def test_count_total_sums_all_pages(fake_repo):
+    repo, table, _ = fake_repo(items(123), page_size=10)
+    assert repo.count_total() == 123
+    assert len(table.calls) == 13
+    assert all(params['Select'] == 'COUNT' for _, params in table.calls)
+
+def test_get_many_chunks_by_100_and_keeps_order(fake_repo):
+    repo, _, resource = fake_repo(items(300))
+    ids = [str(i) for i in range(249, -1, -1)] + ['5', '', None, 'missing']
+    result = repo.get_many(ids)
+
+    assert [item['id'] for item in result] == [str(i) for i in range(249, -1, -1)]
+    assert [len(request['TestItems']['Keys']) for _, request in resource.calls] == [100, 100, 51]
+
+def test_get_many_retries_unprocessed_keys(fake_repo):
+    repo, _, resource = fake_repo(items(300), unprocessed_rounds=3)
+    result = repo.get_many([str(i) for i in range(40)])
+
+    assert len(result) == 40
+    # 40 -> 20 повтор -> 10 -> 5 -> без остатка
+    assert [len(request['TestItems']['Keys']) for _, request in resource.calls] == [40, 20, 10, 5]
+
+def test_batch_get_gives_up_after_max_retries(fake_repo):
+    repo, _, resource = fake_repo(items(300), unprocessed_rounds=100)
+    result = repo.batch_get_items(repo.table_name, [{'id': str(i)} for i in range(16)], max_retries=2)
+
+    # 16 -> 8 + 8 -> 4 + 4 -> 2 + 2 не получено
+    assert len(result) == 14
+    assert len(resource.calls) == 3
+
+def test_get_many_projection_always_includes_id(fake_repo):
+    repo, _, resource = fake_repo(items(10))
+    repo.get_many(['1', '2'], attributes=['value'])
+    request = resource.calls[0][1]['TestItems']
+    assert sorted(request['ExpressionAttributeNames'].values()) == ['id', 'value']
+    assert not repo.get_many([])
+    assert len(resource.calls) == 1
+
+TOKENS_TABLE = "LiberandumAggregationToken"
+
+def tokens(count):
+    return [{'id': str(i), 'symbol': f'T{i % 5}', 'coingecko_id': f'token-{i}', 'name': f'Token {i % 3}'} for i in range(count)]
+
+def test_find_index_for_field():
+    assert find_index_for_field(TOKENS_TABLE, 'symbol') == 'symbol-index'
+    assert find_index_for_field(TOKENS_TABLE, 'coingecko_id') == 'coingecko-index'
+    assert find_index_for_field(TOKENS_TABLE, 'name') is None
+    assert find_index_for_field('UnknownTable', 'symbol') is None
+
+def test_find_by_field_queries_gsi(fake_repo):
+    repo, table, _ = fake_repo(tokens(40), table_name=TOKENS_TABLE)
+    result = repo.find_by_field('symbol', 'T3')
+
+    assert sorted(int(item['id']) for item in result) == list(range(3, 40, 5))
+    assert {operation for operation, _ in table.calls} == {'query'}
+    assert all(params['IndexName'] == 'symbol-index' for _, params in table.calls)
+    assert not repo.scan_fallbacks
+
+def test_find_by_field_without_gsi_falls_back_to_scan(fake_repo):
+    repo, table, _ = fake_repo(tokens(40), table_name=TOKENS_TABLE)
+    assert len(repo.find_by_field('name', 'Token 1')) == 13
+    assert len(repo.find_by_field('name', 'Token 2')) == 13
+
+    assert {operation for operation, _ in table.calls} == {'scan'}
+    assert repo.scan_fallbacks == {'name': 2}
+
+def test_find_by_multiple_fields_queries_indexed_field(fake_repo):
+    repo, table, _ = fake_repo(tokens(40), table_name=TOKENS_TABLE)
+    result = repo.find_by_multiple_fields({'name': 'Token 0', 'symbol': 'T0'})
+
+    # Query по symbol-index, name - в фильтре
+    assert sorted(int(item['id']) for item in result) == [0, 15, 30]
+    assert {params['IndexName'] for _, params in table.calls} == {'symbol-index'}
+    assert all('FilterExpression' in params for _, params in table.calls)
+
+def test_projection_placeholders(fake_repo):
+    repo, _, _ = fake_repo([])
+    expression, names = repo._build_projection_expression(['name', 'price-change', 'stats.24h', 'name', 'status'])
+
+    assert expression == '#p0, #p1, #p2, #p3'
+    assert names == {'#p0': 'name', '#p1': 'price-change', '#p2': 'stats.24h', '#p3': 'status'}
+    assert all(re.fullmatch(r'#[A-Za-z0-9_]+', placeholder) for placeholder in names)
+
+    assert repo._apply_projection({'Key': {'id': '1'}}) == {'Key': {'id': '1'}}
+    assert repo._apply_projection({}, []) == {}
+
+def test_projection_is_applied_to_reads(fake_repo):
+    repo, table, _ = fake_repo([
+        {'id': str(i), 'name': f'n{i}', 'price-change': i, 'secret': 'x'} for i in range(12)
+    ])
+    attributes = ['id', 'name', 'price-change']
+
+    repo.get_by_id('3', attributes)
+    operation, params = table.calls.pop()
+    assert operation == 'get_item' and sorted(params['ExpressionAttributeNames'].values()) == sorted(attributes)
+    scanned = list(repo.scan_iter(repo.table_name, attributes=attributes))
+    assert len(scanned) == 12 and all(set(item) == set(attributes) for item in scanned)
+
+    # Каждая страница получает свою копию ExpressionAttributeNames - boto3 дописывает туда плейсхолдеры фильтра
+    pages = [params for operation, params in table.calls if operation == 'scan']
+    assert len(pages) == 2 and pages[0]['ExpressionAttributeNames'] is not pages[1]['ExpressionAttributeNames']
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.database.metrics import DynamoDBMetrics, call_with_metrics, current_scope, db_metrics
+
+def scope(method, path):
+    return {'method': method, 'route': SimpleNamespace(path=path)}
+
+def scan_response(count, scanned, units, table_name='Tokens'):
+    return {'Count': count, 'ScannedCount': scanned, 'ConsumedCapacity': {'TableName': table_name, 'CapacityUnits': units}}
+
+def test_aggregates_by_table_operation_and_route():
+    metrics = DynamoDBMetrics()
+    metrics.record('Tokens', 'scan', 0.004, scan_response(2, 10, 1.5))
+    metrics.record('Tokens', 'scan', 0.3, scan_response(3, 10, 2.5))
+
+    token = current_scope.set(scope('GET', '/market/tokens/'))
+    try:
+        metrics.record('Tokens', 'scan', 0.02, scan_response(1, 5, 0.5))
+        metrics.record('Tokens', 'put_item', 0.01, {'ConsumedCapacity': {'TableName': 'Tokens', 'CapacityUnits': 1.0}})
+        metrics.record('Users', 'get_item', 0.01, {'Item': {'id': '1'}})
+        metrics.record('Users', 'get_item', 7.0, error=True)
+    finally:
+        current_scope.reset(token)
+
+    snapshot = metrics.snapshot()
+    rows = {(row['table'], row['operation'], row['route']): row for row in snapshot['operations']}
+    assert set(rows) == {
+        ('Tokens', 'scan', '-'), ('Tokens', 'scan', 'GET /market/tokens/'),
+        ('Tokens', 'put_item', 'GET /market/tokens/'), ('Users', 'get_item', 'GET /market/tokens/')
+    }
+
+    background = rows[('Tokens', 'scan', '-')]
+    assert background['calls'] == 2 and background['errors'] == 0
+    assert (background['items_scanned'], background['items_returned']) == (20, 5)
+    assert background['scan_efficiency'] == 0.25
+    assert background['rcu'] == 4.0 and background['wcu'] == 0.0
+    assert background['latency_histogram']['le_5ms'] == 1 and background['latency_histogram']['le_500ms'] == 1
+    assert background['latency_max_ms'] == 300.0
+
+    assert rows[('Tokens', 'put_item', 'GET /market/tokens/')]['wcu'] == 1.0
+    users = rows[('Users', 'get_item', 'GET /market/tokens/')]
+    assert users['calls'] == 2 and users['errors'] == 1 and users['latency_histogram']['inf'] == 1
+
+    assert snapshot['tables']['Tokens'] == {'calls': 4, 'rcu': 4.5, 'wcu': 1.0}
+    # Самые дорогие операции первыми
+    assert snapshot['operations'][0]['route'] == '-'
+
+    metrics.reset()
+    assert metrics.snapshot()['operations'] == []
+
+def test_unmatched_route():
+    metrics = DynamoDBMetrics()
+    token = current_scope.set({'method': 'GET'})
+    try:
+        metrics.record('Tokens', 'get_item', 0.001)
+    finally:
+        current_scope.reset(token)
+    assert metrics.snapshot()['operations'][0]['route'] == 'GET <unmatched>'
+
+def test_call_with_metrics_requests_capacity_and_records_errors():
+    db_metrics.reset()
+    requests = []
+
+    def request(**params):
+        requests.append(params)
+        return scan_response(1, 1, 0.5, 'MetricsTable')
+    call_with_metrics('MetricsTable', 'scan', request, Limit=1)
+    assert requests[0] == {'Limit': 1, 'ReturnConsumedCapacity': 'TOTAL'}
+
+    def failing(**params):
+        raise RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        call_with_metrics('MetricsTable', 'scan', failing)
+
+    row = db_metrics.snapshot()['operations'][0]
+    assert (row['calls'], row['errors'], row['rcu']) == (2, 1, 0.5)
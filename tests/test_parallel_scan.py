@@ -0,0 +1,68 @@
+import itertools
+import threading
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.core.security.config import settings
+
+def items(count):
+    return [{'id': str(i), 'value': i} for i in range(count)]
+
+def wait(seconds):
+    threading.Event().wait(seconds)
+
+def test_all_segments_are_read(fake_repo):
+    repo, table, _ = fake_repo(items(137), page_size=7, scan_segments=4)
+    result = repo.list_all()
+
+    assert sorted(int(item['id']) for item in result) == list(range(137))
+    segments = {params['Segment'] for _, params in table.calls}
+    assert segments == {0, 1, 2, 3}
+    assert all(params['TotalSegments'] == 4 for _, params in table.calls)
+
+def test_max_items(fake_repo):
+    repo, _, _ = fake_repo(items(100), page_size=5, scan_segments=4)
+    assert len(repo.list_all(limit=12)) == 12
+
+def test_segment_error_reaches_reader(fake_repo):
+    repo, table, _ = fake_repo(items(200), page_size=5, scan_segments=4)
+    table.fail(6, ClientError({'Error': {'Code': 'ValidationException'}}, 'Scan'))
+
+    with pytest.raises(ClientError):
+        repo.list_all()
+
+def test_single_segment_error_reaches_reader(fake_repo):
+    repo, table, _ = fake_repo(items(50), page_size=5, scan_segments=1)
+    table.fail(3, ClientError({'Error': {'Code': 'ValidationException'}}, 'Scan'))
+
+    with pytest.raises(ClientError):
+        repo.list_all()
+
+def test_early_exit_stops_workers(fake_repo):
+    repo, table, _ = fake_repo(items(5000), page_size=5, scan_segments=4)
+    iterator = repo.iter_all()
+    assert len(list(itertools.islice(iterator, 3))) == 3
+    iterator.close()
+
+    # Воркеры видят stop не позже таймаута put (0.5s) и перестают читать страницы
+    wait(1.0)
+    calls = len(table.calls)
+    wait(1.0)
+    assert len(table.calls) == calls
+    assert calls < 1000 / 2
+
+def test_early_exit_releases_shared_pool(fake_repo):
+    repo, _, _ = fake_repo(items(2000), page_size=5, scan_segments=4)
+    # Брошенных сканов больше, чем потоков в общем пуле: зависшие воркеры заняли бы его целиком
+    for _ in range(settings.DYNAMODB_SCAN_WORKERS):
+        iterator = repo.iter_all()
+        next(iterator)
+        iterator.close()
+
+    result = []
+    reader = threading.Thread(target=lambda: result.extend(repo.iter_all()), daemon=True)
+    reader.start()
+    reader.join(timeout=10)
+    assert not reader.is_alive()
+    assert len(result) == 2000
@@ -0,0 +1,40 @@
+import asyncio
+import json
+
+from app.services.market.catalog.token_catalog import MAX_FRAGMENT_VARIANTS
+from app.services.market.market_service import MarketDataService
+
+def render(service, **params):
+    page = asyncio.run(service.get_tokens_list_page(limit=20, **params))
+    return json.loads(service.render_page(page))
+
+def test_fields_are_projected_from_full_token(catalog):
+    service = MarketDataService()
+    full = render(service)
+    sparse = render(service, fields=('id', 'is_favorite', 'market_cap'))
+
+    assert [token['id'] for token in sparse['data']] == [token['id'] for token in full['data']]
+    for full_token, sparse_token in zip(full['data'], sparse['data']):
+        assert sparse_token == {name: full_token[name] for name in ('id', 'market_cap', 'is_favorite')}
+
+def test_fields_do_not_take_cache_slots(catalog):
+    service = MarketDataService()
+    render(service)
+    default_entries = catalog.fragment_cache((None, None))
+    for index in range(MAX_FRAGMENT_VARIANTS * 3):
+        render(service, fields=('id', f'{"name" if index % 2 else "symbol"}'))
+
+    assert catalog.fragment_cache((None, None)) is default_entries
+    assert len(default_entries) == 20
+
+def test_sparkline_variants_evicted_lru(catalog):
+    service = MarketDataService()
+    render(service)
+    for points in range(2, MAX_FRAGMENT_VARIANTS + 4):
+        render(service, sparkline_points=points)
+        # Основной вариант используется постоянно - не вытесняется
+        render(service)
+
+    assert len(catalog._fragments) == MAX_FRAGMENT_VARIANTS
+    assert (None, None) in catalog._fragments
+    assert (2, None) not in catalog._fragments
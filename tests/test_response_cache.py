@@ -0,0 +1,60 @@
+from app.services.market.catalog.response_cache import ResponseCache, token_response_cache
+from app.services.market.catalog.token_catalog import TokenCatalogSnapshot, token_catalog
+
+def test_lru_eviction_by_bytes():
+    cache = ResponseCache(max_bytes=100)
+    first = cache.make_key("tokens", 1, page=1)
+    second = cache.make_key("tokens", 1, page=2)
+    third = cache.make_key("tokens", 1, page=3)
+
+    cache.put(first, b'a' * 40, [])
+    cache.put(second, b'b' * 40, [])
+    assert cache.get(first) is not None
+    cache.put(third, b'c' * 40, [])
+
+    # Вытеснена запись, к которой дольше всего не обращались
+    assert cache.get(second) is None
+    assert cache.get(first).body == b'a' * 40
+    assert cache.get(third).body == b'c' * 40
+    assert cache.stats()['bytes'] == 80
+
+def test_oversized_body_not_stored():
+    cache = ResponseCache(max_bytes=10)
+    key = cache.make_key("tokens", 1)
+    entry = cache.put(key, b'x' * 20, [])
+    assert entry.etag and cache.get(key) is None
+
+def test_key_ignores_none_and_normalizes_order():
+    assert ResponseCache.make_key("tokens", 3, a=1, b=None, c=2) == ResponseCache.make_key("tokens", 3, c=2, a=1)
+    assert ResponseCache.make_key("tokens", 3, a=1) != ResponseCache.make_key("tokens", 4, a=1)
+
+def test_if_none_match_returns_304(client, catalog):
+    token_response_cache._entries.clear()
+    first = client.get('/market/tokens/?limit=5&sort_by=price')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and etag.startswith(f'"v{catalog.version}-')
+
+    cached = client.get('/market/tokens/?limit=5&sort_by=price')
+    assert cached.headers['ETag'] == etag and cached.content == first.content
+
+    not_modified = client.get('/market/tokens/?limit=5&sort_by=price', headers={'If-None-Match': f'"other", {etag}'})
+    assert not_modified.status_code == 304
+    assert not_modified.headers['ETag'] == etag
+    assert not_modified.content == b''
+
+    other = client.get('/market/tokens/?limit=5&sort_by=volume', headers={'If-None-Match': etag})
+    assert other.status_code == 200 and other.headers['ETag'] != etag
+
+def test_body_and_etag_from_same_snapshot(client, catalog, monkeypatch):
+    token_response_cache._entries.clear()
+    newer = TokenCatalogSnapshot(catalog.version + 1, catalog.stats[:3], [])
+    snapshots = [catalog, newer]
+
+    # Пересборка каталога между чтениями снимка: второе чтение видит новую версию
+    async def get_snapshot():
+        return snapshots.pop(0) if len(snapshots) > 1 else snapshots[0]
+    monkeypatch.setattr(token_catalog, 'get_snapshot', get_snapshot)
+
+    response = client.get('/market/tokens/?limit=5')
+    assert response.headers['ETag'].startswith(f'"v{catalog.version}-')
+    assert len(response.json()['data']) == 5
@@ -0,0 +1,60 @@
+import random
+
+from app.services.market.catalog.search_index import SearchIndex
+
+ROWS = [
+    {'symbol': 'ETH', 'coin_name': 'Ethereum', 'coingecko_id': 'ethereum', 'market_cap': '400000000000'},
+    {'symbol': 'ETHFI', 'coin_name': 'Ether.fi', 'coingecko_id': 'ether-fi', 'market_cap': '1000000'},
+    {'symbol': 'SETH', 'coin_name': 'Staked Ether', 'coingecko_id': 'seth', 'market_cap': '5000'},
+    {'symbol': 'BTC', 'coin_name': 'Bitcoin', 'coingecko_id': 'bitcoin', 'market_cap': '900000000000'},
+    {'symbol': 'WBTC', 'coin_name': 'Wrapped Bitcoin', 'coingecko_id': 'wrapped-bitcoin', 'market_cap': 'x'},
+]
+
+def positions(index, query):
+    return [position for position, _ in index.search(query)]
+
+def test_exact_symbol_then_prefix_then_substring():
+    index = SearchIndex(ROWS)
+    assert positions(index, "eth")[:3] == [0, 1, 2]
+    assert positions(index, "ETH ")[0] == 0
+
+def test_exact_name_and_word_prefix():
+    index = SearchIndex(ROWS)
+    assert positions(index, "bitcoin")[0] == 3
+    # Префикс слова в названии ("Wrapped Bitcoin" -> "bitcoin")
+    assert 4 in positions(index, "bitc")
+
+def test_market_cap_breaks_ties_within_level():
+    index = SearchIndex(ROWS)
+    assert positions(index, "b")[:2] == [3, 4]
+
+def test_fuzzy_match_on_typo():
+    index = SearchIndex(ROWS)
+    assert positions(index, "bitcoim")[0] == 3
+    assert positions(index, "etherium")[0] == 0
+
+def test_empty_query():
+    assert SearchIndex(ROWS).search("  ") == []
+
+def test_finds_every_substring_match():
+    rng = random.Random(3)
+    alphabet = "abcdexyz"
+    rows = [
+        {'symbol': ''.join(rng.choice(alphabet) for _ in range(rng.randint(2, 5))),
+         'coin_name': ' '.join(''.join(rng.choice(alphabet) for _ in range(rng.randint(3, 8))) for _ in range(2)),
+         'coingecko_id': f'coin-{i}', 'market_cap': str(rng.randint(0, 10 ** 9))}
+        for i in range(300)
+    ]
+    index = SearchIndex(rows)
+
+    for _ in range(200):
+        query = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+        expected = {
+            position for position, row in enumerate(rows)
+            if any(query in str(row[field]).lower() for field in ('symbol', 'coin_name', 'coingecko_id'))
+            and (len(query) >= 3 or any(
+                term.startswith(query)
+                for term in [row['symbol'].lower(), row['coin_name'], row['coingecko_id']] + row['coin_name'].split()
+            ))
+        }
+        assert expected <= set(positions(index, query)), query
@@ -0,0 +1,49 @@
+import math
+import random
+
+from app.services.market.catalog.sparkline import DELTA_LEVELS, build_sparkline, delta_encode, lttb
+
+def decode(encoded):
+    values, level = [], 0
+    for delta in encoded['values']:
+        level += delta
+        values.append(encoded['base'] + encoded['step'] * level)
+    return values
+
+def test_lttb_keeps_endpoints_and_size():
+    rng = random.Random(5)
+    values = [rng.uniform(1, 100) for _ in range(500)]
+    sampled = lttb(values, 50)
+    assert len(sampled) == 50
+    assert sampled[0] == values[0] and sampled[-1] == values[-1]
+    assert all(value in values for value in sampled)
+
+def test_lttb_keeps_spike():
+    values = [1.0] * 200
+    values[123] = 50.0
+    assert 50.0 in lttb(values, 20)
+
+def test_lttb_short_series():
+    assert lttb([1.0, 2.0, 3.0], 10) == [1.0, 2.0, 3.0]
+    assert lttb([1.0, 2.0, 3.0, 4.0], 2) == [1.0, 4.0]
+
+def test_delta_round_trip_error_bounded():
+    rng = random.Random(9)
+    values = [rng.uniform(0.001, 0.002) for _ in range(168)]
+    encoded = delta_encode(values)
+    step = (max(values) - min(values)) / DELTA_LEVELS
+    for original, restored in zip(values, decode(encoded)):
+        assert abs(original - restored) <= step / 2 + 1e-12
+
+def test_delta_flat_and_empty():
+    assert delta_encode([]) is None
+    encoded = delta_encode([3.0, 3.0, 3.0])
+    assert encoded == {'base': 3.0, 'step': 0.0, 'values': [0, 0, 0]}
+
+def test_build_sparkline():
+    prices = [float(i) for i in range(100)]
+    assert build_sparkline(prices) == {'price': prices}
+    assert len(build_sparkline(prices, points=10)['price']) == 10
+    delta = build_sparkline(prices, points=10, encoding="delta")
+    assert delta['price'] == [] and len(delta['delta']['values']) == 10
+    assert math.isclose(decode(delta['delta'])[-1], 99.0)
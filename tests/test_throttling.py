@@ -0,0 +1,117 @@
+import time
+
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+from app.core.database import throttling
+from app.core.database.throttling import DynamoDBThrottledError, TokenBucket, call_with_throttling
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Управляемые часы: sleep сдвигает monotonic, тест не ждет по-настоящему
+    state = {'now': 0.0, 'slept': []}
+
+    def sleep(seconds):
+        state['slept'].append(seconds)
+        state['now'] += seconds
+
+    monkeypatch.setattr(time, 'monotonic', lambda: state['now'])
+    monkeypatch.setattr(time, 'sleep', sleep)
+    return state
+
+def test_acquire_within_burst(clock):
+    bucket = TokenBucket(rate=10, burst_seconds=1)
+    for _ in range(10):
+        assert bucket.acquire(1) == 0.0
+    assert clock['slept'] == []
+
+def test_acquire_waits_for_refill(clock):
+    bucket = TokenBucket(rate=10, burst_seconds=1)
+    bucket.acquire(10)
+    assert bucket.acquire(5) == 0.0
+    assert clock['slept'] == [pytest.approx(0.5)]
+
+def test_acquire_over_max_wait_takes_nothing(clock):
+    bucket = TokenBucket(rate=10, burst_seconds=1)
+    bucket.acquire(10)
+    assert bucket.acquire(5, max_wait=0.1) == pytest.approx(0.5)
+    assert clock['slept'] == []
+    assert bucket.tokens == pytest.approx(0.0)
+
+def test_settle_charges_real_consumption(clock):
+    bucket = TokenBucket(rate=10, burst_seconds=1)
+    bucket.acquire(1)
+    # Оценили 1 RCU, таблица списала 15 - долг гасится ожиданием следующего вызова
+    bucket.settle(estimated=1, consumed=15)
+    assert bucket.tokens == pytest.approx(-5.0)
+    assert bucket.acquire(1) == 0.0
+    assert clock['slept'] == [pytest.approx(0.6)]
+
+def test_settle_refunds_overestimate(clock):
+    bucket = TokenBucket(rate=10, burst_seconds=1)
+    bucket.acquire(8)
+    bucket.settle(estimated=8, consumed=0.5)
+    assert bucket.tokens == pytest.approx(9.5)
+
+def test_adaptive_rate(clock):
+    bucket = TokenBucket(rate=10, burst_seconds=1)
+    bucket.on_throttle()
+    assert bucket.rate == 5.0 and bucket.tokens == 0.0
+    for _ in range(3):
+        bucket.on_throttle()
+    assert bucket.rate == 1.0
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == 10.0
+
+def client_error(code, status=400):
+    return ClientError({'Error': {'Code': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}, 'GetItem')
+
+def failing(*errors, response=None):
+    calls = []
+
+    def request(**params):
+        calls.append(params)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return response or {'Item': {'id': '1'}}
+    return request, calls
+
+@pytest.fixture
+def bucket(clock, monkeypatch):
+    bucket = TokenBucket(rate=10, burst_seconds=1)
+    monkeypatch.setattr(throttling, 'get_bucket', lambda table_name, operation: bucket)
+    return bucket
+
+def test_transient_errors_are_retried(bucket):
+    request, calls = failing(
+        client_error('InternalServerError', 500),
+        client_error('ServiceUnavailable', 503),
+        ReadTimeoutError(endpoint_url='https://dynamodb'),
+    )
+    assert call_with_throttling('T', 'get_item', request, Key={'id': '1'}) == {'Item': {'id': '1'}}
+    assert len(calls) == 4
+    # Временная ошибка не снижает скорость, оценка возвращается в bucket
+    assert bucket.rate == 10.0
+    assert bucket.tokens == pytest.approx(9.0)
+
+def test_transient_error_raised_after_last_attempt(bucket, monkeypatch):
+    monkeypatch.setattr(type(throttling.settings), 'DYNAMODB_THROTTLE_RETRIES', property(lambda self: 2))
+    request, calls = failing(*[client_error('InternalServerError', 500)] * 3)
+    with pytest.raises(ClientError):
+        call_with_throttling('T', 'get_item', request)
+    assert len(calls) == 3
+
+def test_throttling_retried_then_reported(bucket, monkeypatch):
+    monkeypatch.setattr(type(throttling.settings), 'DYNAMODB_THROTTLE_RETRIES', property(lambda self: 2))
+    request, calls = failing(*[client_error('ProvisionedThroughputExceededException')] * 3)
+    with pytest.raises(DynamoDBThrottledError):
+        call_with_throttling('T', 'get_item', request)
+    assert len(calls) == 3
+    assert bucket.rate < 10.0
+
+def test_client_errors_are_not_retried(bucket):
+    request, calls = failing(client_error('ValidationException'))
+    with pytest.raises(ClientError):
+        call_with_throttling('T', 'get_item', request)
+    assert len(calls) == 1
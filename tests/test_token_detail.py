@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from app.routes.data import tokens
+from app.schemas.market import RelatedPerson
+from app.services.market.catalog.token_catalog import TokenCatalogSnapshot, token_catalog
+
+STATS = [
+    {'id': 's1', 'symbol': 'AAA', 'coin_name': 'Alpha', 'coingecko_id': 'alpha', 'approved': True, 'market_cap': '10'},
+    {'id': 's2', 'symbol': 'BBB', 'coin_name': 'Beta', 'coingecko_id': 'beta', 'approved': True, 'market_cap': '5'},
+]
+TOKENS = [
+    {'id': 't1', 'symbol': 'AAA', 'related_people': ['p1'], 'related_wallets_data': ['w1'], 'security_audits': ['a1']},
+    {'id': 't2', 'symbol': 'BBB', 'related_people': ['p1', 'p2'], 'related_wallets_data': ['w2']},
+]
+
+@pytest.fixture
+def related(monkeypatch):
+    """
+    Связанные сущности: люди отдаются сразу, кошельки не успевают к дедлайну, аудиты падают.
+    """
+    state = {'cancelled': 0}
+    snapshot = TokenCatalogSnapshot(1, STATS, TOKENS)
+    monkeypatch.setattr(token_catalog, '_snapshot', snapshot)
+    monkeypatch.setattr(type(tokens.settings), 'TOKEN_DETAIL_DEADLINE_SECONDS', property(lambda self: 0.2))
+
+    async def people(ids):
+        return [RelatedPerson(id=person_id, full_name=person_id) for person_id in ids]
+
+    async def slow_wallets(ids):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state['cancelled'] += 1
+            raise
+        return []
+
+    async def nothing(ids):
+        return []
+
+    async def failing_audits(ids):
+        if ids:
+            raise RuntimeError("audits table unavailable")
+        return []
+
+    monkeypatch.setattr(tokens, '_get_people_data_for_token', people)
+    monkeypatch.setattr(tokens, '_get_wallets_data_for_token', slow_wallets)
+    monkeypatch.setattr(tokens, '_get_conductors_data_for_token', nothing)
+    monkeypatch.setattr(tokens, '_get_security_audits_data_for_token', failing_audits)
+    return state
+
+def test_detail_partial_content(client, related):
+    response = client.get('/market/tokens/alpha')
+
+    assert response.status_code == 200
+    assert response.headers['X-Partial-Content'].split(',') == ['related_wallets_data', 'related_security_audits_data']
+    body = response.json()
+    assert [person['id'] for person in body['related_people_data']] == ['p1']
+    assert body['related_wallets_data'] == [] and body['related_security_audits_data'] == []
+    # Незавершенная загрузка отменяется, а не продолжает работать после ответа
+    assert related['cancelled'] == 1
+
+def test_batch_detail_partial_content(client, related):
+    response = client.get('/market/tokens/batch?ids=alpha,beta,AAA&detail=true')
+
+    assert response.status_code == 200
+    assert 'related_wallets_data' in response.headers['X-Partial-Content']
+    body = response.json()
+    assert [token['id'] for token in body['data']] == ['alpha', 'beta']
+    assert [person['id'] for person in body['data'][1]['related_people_data']] == ['p1', 'p2']
+
+def test_detail_complete_without_header(client, related, monkeypatch):
+    async def nothing(ids):
+        return []
+    monkeypatch.setattr(tokens, '_get_wallets_data_for_token', nothing)
+    monkeypatch.setattr(tokens, '_get_security_audits_data_for_token', nothing)
+
+    response = client.get('/market/tokens/beta')
+    assert response.status_code == 200
+    assert 'X-Partial-Content' not in response.headers
+
+def test_gather_until():
+    async def value():
+        return 1
+
+    async def never():
+        await asyncio.sleep(10)
+
+    async def broken():
+        raise ValueError("boom")
+
+    results, missing = asyncio.run(tokens._gather_until({'a': value(), 'b': never(), 'c': broken()}, 0.05))
+    assert results == {'a': 1}
+    assert missing == ['b', 'c']
@@ -0,0 +1,23 @@
+import asyncio
+import random
+
+from app.services.market.market_service import MarketDataService
+from market_data import baseline_order, random_query
+
+def test_list_matches_baseline_ordering_and_totals(catalog):
+    rng = random.Random(11)
+    service = MarketDataService()
+    favorites = [f'token-{i}' for i in range(1, 400, 7)]
+
+    for _ in range(1200):
+        query = random_query(rng, favorites)
+        limit = rng.choice([1, 7, 20, 100])
+        page = rng.randint(1, 6)
+        expected = baseline_order(catalog, query)
+
+        result = asyncio.run(service.get_tokens_list_page(page=page, limit=limit, **query))
+
+        start = (page - 1) * limit
+        assert result.ids == expected[start:start + limit], query
+        assert result.pagination['total_items'] == len(expected), query
+        assert result.pagination['total_pages'] == (len(expected) + limit - 1) // limit